@@ -3,10 +3,69 @@ import uuid
 
 # Create your models here.
 
-class BaseModel(models.Model):
+class TrackedFieldsMixin:
+    """
+    Remembers the values of `tracked_fields` as they were loaded from the database, so
+    save handlers can diff in memory (has_changed / previous) instead of re-fetching the row.
+    Only fields a model lists are tracked; new instances and deferred fields have no snapshot.
+    """
+    tracked_fields = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._snapshot_tracked_fields()
+        return instance
+
+    def _snapshot_tracked_fields(self):
+        loaded = self.__dict__
+        self._loaded_values = {}
+        for name in self.tracked_fields:
+            attname = self._meta.get_field(name).attname
+            if attname in loaded:
+                self._loaded_values[name] = loaded[attname]
+
+    def previous(self, field):
+        """The field's value when the instance was loaded (or last saved), None if unknown."""
+        return getattr(self, "_loaded_values", {}).get(field)
+
+    def has_changed(self, field):
+        snapshot = getattr(self, "_loaded_values", {})
+        if field not in snapshot:
+            return False
+        return getattr(self, self._meta.get_field(field).attname) != snapshot[field]
+
+    def may_have_changed(self, field):
+        """Like has_changed, but True when there is no snapshot to compare against."""
+        return field not in getattr(self, "_loaded_values", {}) or self.has_changed(field)
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # The saved values are the new baseline
+        self._snapshot_tracked_fields()
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self._snapshot_tracked_fields()
+
+
+class BaseModel(TrackedFieldsMixin, models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Columns only moved by atomic F() updates (utils/counters.py): a full save of an instance
+    # loaded earlier must not write its stale values back over concurrent changes
+    counter_fields = ()
+
     class Meta:
-        abstract = True
\ No newline at end of file
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        if self.counter_fields and not self._state.adding and not args and kwargs.get("update_fields") is None:
+            deferred = self.get_deferred_fields()
+            kwargs["update_fields"] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.counter_fields and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
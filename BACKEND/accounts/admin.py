@@ -8,7 +8,7 @@ from django.conf import settings
 from django import forms
 from django.contrib.auth.forms import ReadOnlyPasswordHashField
 from django.core.exceptions import ValidationError
-from utils.email_utils import send_branded_email
+from utils.email_utils import queue_branded_email
 
 admin.site.register(User)
 admin.site.register(PasswordResetOTP)
@@ -100,8 +100,9 @@ class CommunityAdmin(admin.ModelAdmin):
                 "button_text": "Login to HCKonnect",
                 "button_url": "http://localhost:5173/login"
             
-        }
-        send_branded_email(subject, user.email, branding_context)
+            }
+            # queued inside the admin's save transaction
+            queue_branded_email(subject, user.email, branding_context, sensitive=True)
           
 
             
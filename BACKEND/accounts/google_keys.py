@@ -0,0 +1,120 @@
+import logging
+import re
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+
+"""
+    Google's ID token signing certificates, cached in process.
+    A login only downloads them when the cached copy has expired (Cache-Control max-age);
+    shortly before that, the first login starts a background refresh and keeps using the
+    current copy. A token signed with a key id the copy does not have (Google rotated its keys)
+    refetches once, at most every REFETCH_INTERVAL seconds. Every call to Google goes through
+    one pooled HTTP session.
+"""
+
+GOOGLE_CERTS_URL = "https://www.googleapis.com/oauth2/v1/certs"
+GOOGLE_USERINFO_URL = "https://www.googleapis.com/oauth2/v3/userinfo"
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+
+HTTP_TIMEOUT = 10
+DEFAULT_MAX_AGE = 3600  # when Google sends no max-age
+REFRESH_AHEAD = 300
+REFETCH_INTERVAL = 30
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_http_session():
+    """The pooled session for calls to Google's endpoints."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=20, max_retries=2))
+                _session = session
+    return _session
+
+
+def parse_max_age(cache_control):
+    match = re.search(r"max-age=(\d+)", cache_control or "")
+    return int(match.group(1)) if match else None
+
+
+def fetch_google_certs():
+    """Returns ({key id: PEM certificate}, max-age in seconds or None)."""
+    response = get_http_session().get(GOOGLE_CERTS_URL, timeout=HTTP_TIMEOUT)
+    response.raise_for_status()
+    return response.json(), parse_max_age(response.headers.get("Cache-Control"))
+
+
+class CertificateCache:
+    """
+    `fetcher` returns (certificates, max-age or None); tests pass one serving a local key set.
+    `clock` is a monotonic clock in seconds.
+    """
+
+    def __init__(self, fetcher=fetch_google_certs, clock=time.monotonic):
+        self.fetcher = fetcher
+        self.clock = clock
+        self._certs = None
+        self._expires_at = 0
+        self._fetched_at = None
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self.refresh_thread = None
+
+    def get(self):
+        now = self.clock()
+        if self._certs is None or now >= self._expires_at:
+            try:
+                return self.refresh()
+            except Exception:
+                if self._certs is None:
+                    raise
+                # Google keeps retired keys valid for a while: an expired copy beats failing every login
+                logger.warning("Refreshing Google certificates failed, using the expired copy", exc_info=True)
+                return self._certs
+        if now >= self._expires_at - REFRESH_AHEAD:
+            self._refresh_in_background()
+        return self._certs
+
+    def get_for_key(self, key_id):
+        certs = self.get()
+        if key_id not in certs and self.clock() - self._fetched_at >= REFETCH_INTERVAL:
+            certs = self.refresh(force=True)
+        return certs
+
+    def refresh(self, force=False):
+        # One fetch at a time: logins arriving meanwhile wait for it instead of fetching too
+        with self._lock:
+            if not force and self._certs is not None and self.clock() < self._expires_at:
+                return self._certs
+            certs, max_age = self.fetcher()
+            self._fetched_at = self.clock()
+            self._expires_at = self._fetched_at + (max_age if max_age is not None else DEFAULT_MAX_AGE)
+            self._certs = certs
+            return certs
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                self.refresh(force=True)
+            except Exception:
+                logger.warning("Background refresh of Google certificates failed", exc_info=True)
+            finally:
+                self._refreshing = False
+
+        self.refresh_thread = threading.Thread(target=run, name="google-certs-refresh", daemon=True)
+        self.refresh_thread.start()
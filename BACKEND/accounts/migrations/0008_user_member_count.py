@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 14:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_user_theme'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='member_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.8 on 2026-10-18 15:08
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_unread_counts(apps, schema_editor):
+    User = apps.get_model('accounts', 'User')
+    Notification = apps.get_model('notifications', 'Notification')
+    unread = Notification.objects.filter(recipient=OuterRef('pk'), is_read=False, is_deleted=False).order_by().values('recipient').annotate(total=Count('pk')).values('total')
+    User.objects.update(unread_notification_count=Coalesce(Subquery(unread, output_field=IntegerField()), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0008_user_member_count'),
+        ('notifications', '0005_notification_inbox_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='unread_notification_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_unread_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-18 15:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0009_user_unread_notification_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='community_logo_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='profile_image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
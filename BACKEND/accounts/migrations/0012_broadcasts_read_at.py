@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 16:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0011_token_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='broadcasts_read_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -64,6 +64,7 @@ class User(AbstractUser, BaseModel):
 
     #extra info for students
     profile_image = models.ImageField(upload_to='profile_images/', null=True, blank=True)
+    profile_image_variants = models.JSONField(default=dict, blank=True, editable=False)  # utils/images.py
     linkedin_link = models.URLField(null=True, blank=True)
     github_link = models.URLField(null=True, blank=True)
     course = models.CharField(max_length=20, choices=course_choices, null=True, blank=True)
@@ -75,9 +76,29 @@ class User(AbstractUser, BaseModel):
     community_name = models.CharField(max_length=255, null=True, blank=True,unique=True)
     community_description = models.TextField(null=True, blank=True)
     community_logo = models.ImageField(upload_to='community_logos/', null=True, blank=True)
+    community_logo_variants = models.JSONField(default=dict, blank=True, editable=False)  # utils/images.py
     community_tag = models.CharField(max_length=255, null=True, blank=True)
+    # Denormalized counter, maintained by utils/counters.py
+    member_count = models.PositiveIntegerField(default=0)
+    # Unread personal notifications, maintained by notifications.services.NotificationService
+    unread_notification_count = models.PositiveIntegerField(default=0)
+    # Broadcasts sent up to this moment count as read ("mark all read"), without a receipt each
+    broadcasts_read_at = models.DateTimeField(null=True, blank=True, editable=False)
 
     must_change_password = models.BooleanField(default=True)
+    # Bumped whenever the claims signed into the user's tokens go stale (accounts/tokens.py)
+    token_version = models.PositiveIntegerField(default=0, editable=False)
+
+    # Moved only by queryset updates (token_version through accounts.tokens.bump_token_version): full
+    # saves of an instance loaded earlier, e.g. a profile edit, leave them alone (BaseModel.save)
+    counter_fields = ("token_version", "member_count", "unread_notification_count", "broadcasts_read_at")
+
+    # Diffed by notifications.signals.notify_role_change and accounts.signals
+    tracked_fields = (
+        "role", "status", "is_active",
+        # Shown on feed cards (contents/signals.py)
+        "username", "first_name", "last_name", "community_name", "profile_image", "community_logo",
+    )
     
     #credentials
     USERNAME_FIELD = 'email'
@@ -87,6 +108,21 @@ class User(AbstractUser, BaseModel):
         return f"{self.username} ({self.role})   - {self.email}"
 
 
+class ClaimsUser(User):
+    """
+    A user built from its token's claims (accounts/tokens.py), without a query. The first
+    access to any other field loads all of them at once.
+    """
+    class Meta:
+        proxy = True
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        deferred = self.get_deferred_fields()
+        if fields is not None and deferred.issuperset(fields):
+            fields = deferred
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+
+
 class CommunityUser(User):
     class Meta:
         proxy = True
@@ -1,14 +1,15 @@
 from .models import User, PasswordResetOTP, ContactUsMessage
 from django.contrib.auth import authenticate
-from rest_framework_simplejwt.tokens import RefreshToken
 from .utils import generate_auto_password, generate_otp
+from .tokens import get_tokens_for_user
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from datetime import timedelta
 from rest_framework.serializers import ModelSerializer, ValidationError, Serializer, EmailField, CharField, ChoiceField
-from utils.email_utils import send_branded_email
+from utils.email_utils import queue_branded_email
+from notifications.models import EmailOutbox
 from rest_framework import serializers
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
 
 
 class RegisterSerializer(ModelSerializer):
@@ -70,8 +71,20 @@ class RegisterSerializer(ModelSerializer):
 
         user.set_password(auto_password)#hashing the password
 
+        subject = "Welcome to HCKonnect - Your Account Details"
+        branding_context = {
+            "name": user.first_name,
+            "message": f"Welcome to HCKonnect! <br><br>Your account has been successfully created. Here are your login credentials:<br><br><b>Password:</b> {auto_password}<br><br>Please log in and change your password immediately.",
+            "button_text": "Login to HCKonnect",
+            "button_url": "http://localhost:5173/login"
+            
+        }
+
         try:
-            user.save()#creating user obj, user is actually created
+            # the welcome email is queued with the user, so neither exists without the other
+            with transaction.atomic():
+                user.save()#creating user obj, user is actually created
+                queue_branded_email(subject, user.email, branding_context, sensitive=True)
         except IntegrityError:
             duplicate_errors = {}
 
@@ -86,17 +99,6 @@ class RegisterSerializer(ModelSerializer):
 
             raise
 
-
-        subject = "Welcome to HCKonnect - Your Account Details"
-        branding_context = {
-            "name": user.first_name,
-            "message": f"Welcome to HCKonnect! <br><br>Your account has been successfully created. Here are your login credentials:<br><br><b>Password:</b> {auto_password}<br><br>Please log in and change your password immediately.",
-            "button_text": "Login to HCKonnect",
-            "button_url": "http://localhost:5173/login"
-            
-        }
-        send_branded_email(subject, user.email, branding_context)
-
         return user 
 
 
@@ -114,7 +116,7 @@ class LoginSerializer(Serializer):
         return data
 
     def get_jwt_token(self, user):
-        refresh = RefreshToken.for_user(user)
+        refresh = get_tokens_for_user(user)
         return {
             'msg': 'Login successful',
             'data': {
@@ -174,8 +176,6 @@ class ForgotPasswordSerializer(Serializer):
         # Generate OTP
         otp = generate_otp()
 
-        PasswordResetOTP.objects.create(user=user,otp=otp,otp_type=req_type)
-
         # send through email
         subject = (
             "Your OTP Has Been Resent"
@@ -183,15 +183,16 @@ class ForgotPasswordSerializer(Serializer):
             else "OTP for HCKonnect Password Reset"
         )
 
-        from utils.email_utils import send_branded_email
-        
         branding_context = {
             "name": user.first_name,
             "message": f"You have requested to reset your password. Use the OTP below to proceed.<br><br><span style='font-size: 24px; font-weight: bold; letter-spacing: 2px; color: #0d1f14;'>{otp}</span><br><br>This OTP is valid for <b>2 minutes</b>.",
             "button_text": "Verify OTP"
         }
-        
-        send_branded_email(subject, user.email, branding_context)
+
+        # the OTP only lives for 2 minutes, so its email jumps the outbox queue
+        with transaction.atomic():
+            PasswordResetOTP.objects.create(user=user,otp=otp,otp_type=req_type)
+            queue_branded_email(subject, user.email, branding_context, priority=EmailOutbox.PRIORITY_URGENT, sensitive=True)
 
         return {"message": "OTP sent successfully"}
 
@@ -363,8 +364,8 @@ class UserProfileDetailSerializer(ModelSerializer):
                 "created_at": d.created_at,
                 **author_data,
                 "visibility": d.visibility,
-                "reply_count": d.replies.count(),
-                "reaction_count": d.reactions.count(),
+                "reply_count": d.reply_count,
+                "reaction_count": d.reaction_count,
                 "community": {
                     "id": str(d.community.id) if d.community else None,
                     "name": d.community.community_name if d.community else "General",
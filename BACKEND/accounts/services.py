@@ -1,11 +1,13 @@
 from django.conf import settings
-from google.oauth2 import id_token
-from google.auth.transport import requests
+from google.auth import jwt as google_jwt
 from rest_framework import exceptions
 from .models import User
-import requests as http_requests
+from .google_keys import CertificateCache, GOOGLE_ISSUERS, GOOGLE_USERINFO_URL, HTTP_TIMEOUT, get_http_session
 
 class GoogleAuthService:
+    # Signing certificates, shared by every login of the process
+    certificates = CertificateCache()
+
     @staticmethod
     def _validate_google_profile(profile):
         if not profile.get('email_verified'):
@@ -20,11 +22,11 @@ class GoogleAuthService:
     @staticmethod
     def verify_google_id_token(token):
         try:
-            id_info = id_token.verify_oauth2_token(
-                token, 
-                requests.Request(), 
-                settings.GOOGLE_CLIENT_ID
-            )
+            key_id = google_jwt.decode_header(token).get('kid')
+            certs = GoogleAuthService.certificates.get_for_key(key_id)
+            id_info = google_jwt.decode(token, certs=certs, audience=settings.GOOGLE_CLIENT_ID)
+            if id_info.get('iss') not in GOOGLE_ISSUERS:
+                raise ValueError("Wrong issuer.")
             return GoogleAuthService._validate_google_profile(id_info)
 
         except ValueError:
@@ -37,10 +39,10 @@ class GoogleAuthService:
     @staticmethod
     def verify_google_access_token(token):
         try:
-            response = http_requests.get(
-                'https://www.googleapis.com/oauth2/v3/userinfo',
+            response = get_http_session().get(
+                GOOGLE_USERINFO_URL,
                 headers={'Authorization': f'Bearer {token}'},
-                timeout=10,
+                timeout=HTTP_TIMEOUT,
             )
             if response.status_code != 200:
                 raise exceptions.AuthenticationFailed("Invalid Google access token.")
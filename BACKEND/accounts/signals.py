@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .tokens import bump_token_version
+
+# User fields signed into tokens (the membership ones are handled below)
+CLAIMED_USER_FIELDS = ("role", "status", "is_active")
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def expire_claims_on_user_change(sender, instance, created, **kwargs):
+    if not created and any(instance.has_changed(field) for field in CLAIMED_USER_FIELDS):
+        # Keep the instance in step, so a later full save does not write the old version back
+        instance.token_version = bump_token_version(instance.pk)
+
+
+@receiver(post_save, sender='communities.CommunityMembership')
+@receiver(post_delete, sender='communities.CommunityMembership')
+def expire_claims_on_membership_change(sender, instance, **kwargs):
+    bump_token_version(instance.user_id)
@@ -1,3 +1,192 @@
-from django.test import TestCase
+from django.db import connection
+import time
+from unittest import mock
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from google.auth import crypt, jwt as google_jwt
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from communities.models import CommunityMembership, CommunityVacancy, VacancyApplication
+from .google_keys import CertificateCache, REFETCH_INTERVAL, parse_max_age
+from .services import GoogleAuthService
+from .tokens import check_claims_cache, get_tokens_for_user
 
-# Create your tests here.
+User = get_user_model()
+
+
+class PrincipalAuthenticationTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.community = User.objects.create_user(
+            email="comm@test.com", username="testcomm", password="password123",
+            role="community", community_name="Test Community"
+        )
+        self.rep = User.objects.create_user(email="rep@test.com", username="rep", password="password123", role="student")
+        CommunityMembership.objects.create(user=self.rep, community=self.community, role="representative")
+        self.student = User.objects.create_user(email="student@test.com", username="student", password="password123", role="student")
+        vacancy = CommunityVacancy.objects.create(community=self.community, title="Designer", description="Design things")
+        VacancyApplication.objects.create(vacancy=vacancy, user=self.student)
+
+    def _get(self, user, url):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        return response, [q["sql"] for q in queries.captured_queries]
+
+    def test_user_membership_and_community_load_in_one_query(self):
+        response, queries = self._get(self.rep, "/communities/vacancies/applications/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["count"], 1)
+        # The authentication query joins the membership; permission and filter reuse it
+        self.assertIn('"communities_communitymembership"', queries[0])
+        self.assertFalse([q for q in queries[1:] if 'FROM "communities_communitymembership"' in q])
+
+    def test_plain_members_are_refused(self):
+        response, _ = self._get(self.student, "/communities/vacancies/applications/")
+        self.assertEqual(response.status_code, 403)
+
+
+@override_settings(JWT_CLAIMS_AUTH={"ENABLED": True})
+class ClaimsAuthenticationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.community = User.objects.create_user(
+            email="comm@test.com", username="testcomm", password="password123",
+            role="community", community_name="Test Community"
+        )
+        self.rep = User.objects.create_user(email="rep@test.com", username="rep", password="password123", role="student")
+        self.membership = CommunityMembership.objects.create(user=self.rep, community=self.community, role="representative")
+        self.rep.refresh_from_db()
+        student = User.objects.create_user(email="student@test.com", username="student", password="password123", role="student")
+        vacancy = CommunityVacancy.objects.create(community=self.community, title="Designer", description="Design things")
+        VacancyApplication.objects.create(vacancy=vacancy, user=student)
+        self.url = "/communities/vacancies/applications/"
+
+    def _request(self, method, token):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(self.url)
+        return response, [q["sql"] for q in queries.captured_queries]
+
+    def _user_lookups(self, queries):
+        """The authentication query: the user joined with its membership."""
+        return [q for q in queries if 'FROM "accounts_user" LEFT OUTER JOIN "communities_communitymembership"' in q]
+
+    def test_reads_are_authorized_from_the_claims(self):
+        token = get_tokens_for_user(self.rep).access_token
+        self._request("get", token)  # caches the token version
+        response, queries = self._request("get", token)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["count"], 1)
+        # No authentication query: the first one is the view's own
+        self.assertNotIn("accounts_user", queries[0])
+        self.assertFalse(self._user_lookups(queries))
+
+        # Writes always load the user
+        _, queries = self._request("post", token)
+        self.assertEqual(len(self._user_lookups(queries)), 1)
+
+    def test_membership_changes_expire_the_claims(self):
+        token = get_tokens_for_user(self.rep).access_token
+        self.assertEqual(self._request("get", token)[0].status_code, 200)
+
+        self.membership.role = "member"
+        self.membership.save()
+        # The representative claim is no longer trusted: the request is authorized from the database
+        response, queries = self._request("get", token)
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(len(self._user_lookups(queries)), 1)
+
+        # So does a role change
+        token = get_tokens_for_user(self.rep).access_token
+        self.assertEqual(self._request("get", token)[0].status_code, 403)
+        self.rep.role = "community"
+        self.rep.save()
+        self.assertEqual(self.rep.token_version, User.objects.get(pk=self.rep.pk).token_version)
+        response, queries = self._request("get", token)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(self._user_lookups(queries)), 1)
+
+        # Saving an instance loaded before a bump keeps the newer version
+        stale = User.objects.get(pk=self.rep.pk)
+        self.membership.delete()
+        stale.bio = "Hello"
+        stale.save()
+        self.assertEqual(User.objects.get(pk=self.rep.pk).token_version, stale.token_version + 1)
+
+    def test_claims_mode_refuses_a_per_process_cache(self):
+        local = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+        shared = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": "redis://cache:6379"}}
+        with override_settings(CACHES=local), self.assertRaises(ImproperlyConfigured):
+            check_claims_cache()
+        with override_settings(CACHES=shared):
+            check_claims_cache()
+        with override_settings(CACHES=local, JWT_CLAIMS_AUTH={"ENABLED": False}):
+            check_claims_cache()
+
+
+def make_signing_key(key_id):
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption())
+    public_pem = key.public_key().public_bytes(serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo)
+    return crypt.RSASigner.from_string(private_pem, key_id=key_id), public_pem.decode()
+
+
+@override_settings(GOOGLE_CLIENT_ID="client-id")
+class GoogleCertificateCacheTest(TestCase):
+    def setUp(self):
+        self.signer, public_pem = make_signing_key("key-1")
+        self.key_set = {"key-1": public_pem}
+        self.fetches = 0
+        self.now = 1000.0
+        self.certificates = CertificateCache(fetcher=self._fetch, clock=lambda: self.now)
+        patcher = mock.patch.object(GoogleAuthService, "certificates", self.certificates)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _fetch(self):
+        self.fetches += 1
+        return dict(self.key_set), 3600
+
+    def _token(self, signer=None, **claims):
+        now = int(time.time())
+        payload = {
+            "iss": "https://accounts.google.com", "aud": "client-id", "iat": now, "exp": now + 600,
+            "email": "student@heraldcollege.edu.np", "email_verified": True, **claims,
+        }
+        return google_jwt.encode(signer or self.signer, payload).decode()
+
+    def test_certificates_are_fetched_once_per_max_age(self):
+        for _ in range(5):
+            self.assertEqual(GoogleAuthService.verify_google_id_token(self._token())["email"], "student@heraldcollege.edu.np")
+        self.assertEqual(self.fetches, 1)
+
+        # Close to expiry a login refreshes in the background and is served the current copy
+        self.now += 3600 - 60
+        GoogleAuthService.verify_google_id_token(self._token())
+        self.certificates.refresh_thread.join()
+        self.assertEqual(self.fetches, 2)
+        self.now += 3600 - 300 - 1
+        GoogleAuthService.verify_google_id_token(self._token())
+        self.assertEqual(self.fetches, 2)
+
+        self.assertEqual(parse_max_age("public, max-age=19937, must-revalidate, no-transform"), 19937)
+
+    def test_rotated_keys_are_picked_up_and_bad_tokens_refused(self):
+        GoogleAuthService.verify_google_id_token(self._token())
+        new_signer, new_pem = make_signing_key("key-2")
+        self.key_set["key-2"] = new_pem
+        self.now += REFETCH_INTERVAL
+        GoogleAuthService.verify_google_id_token(self._token(new_signer))
+        self.assertEqual(self.fetches, 2)
+
+        for token in (self._token(aud="someone-else"), self._token(iss="https://evil.example"), "not-a-token"):
+            with self.assertRaises(AuthenticationFailed):
+                GoogleAuthService.verify_google_id_token(token)
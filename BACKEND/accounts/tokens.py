@@ -0,0 +1,105 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.db import transaction
+from django.db.models import F
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from utils.cache import is_process_local
+from utils.principal import Principal
+from .models import ClaimsUser
+
+
+"""
+    Signed authorization claims, for the opt-in claims mode of PrincipalJWTAuthentication.
+    Every token carries the user's role, status, membership role, community and token version:
+        {"role": "student", "status": "active", "membership_role": "representative",
+         "community_id": "<uuid>", "ver": 3}
+    With settings.JWT_CLAIMS_AUTH["ENABLED"], read-only requests are authorized from these claims
+    without loading the user. Changing a user's role, status or membership bumps their
+    token_version (accounts.signals). Claims of an older version are never trusted again: those
+    requests load the user from the database as in the default mode.
+    The current version is cached per user in the default cache, which must be shared between
+    workers: only the worker that bumps a version drops its entry, a per-process cache would keep
+    trusting stale claims for VERSION_CACHE_SECONDS. Startup fails otherwise (check_claims_cache).
+"""
+
+TOKEN_VERSION_CLAIM = "ver"
+CLAIM_FIELDS = ("role", "status", "membership_role", "community_id")
+
+
+def get_claims_settings():
+    return {"ENABLED": False, "VERSION_CACHE_SECONDS": 300, **getattr(settings, "JWT_CLAIMS_AUTH", {})}
+
+
+def check_claims_cache():
+    """Called at startup (AccountsConfig.ready): claims mode needs a cache every worker shares."""
+    if get_claims_settings()["ENABLED"] and is_process_local():
+        raise ImproperlyConfigured(
+            "JWT_CLAIMS_AUTH needs a cache shared between workers to revoke claims: "
+            "set CACHE_BACKEND/CACHE_LOCATION (e.g. RedisCache), or turn claims mode off."
+        )
+
+
+def _version_key(user_id):
+    return f"accounts:token_version:{user_id}"
+
+
+def get_tokens_for_user(user):
+    """A refresh token (and, through it, its access token) carrying the user's claims."""
+    membership = getattr(user, "membership", None)
+    refresh = RefreshToken.for_user(user)
+    refresh["role"] = user.role
+    refresh["status"] = user.status
+    refresh["membership_role"] = membership.role if membership else None
+    refresh["community_id"] = str(membership.community_id) if membership else None
+    refresh[TOKEN_VERSION_CLAIM] = user.token_version
+    return refresh
+
+
+def current_token_version(user_id):
+    """The user's token version, cached; None for unknown users."""
+    key = _version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = get_user_model().objects.filter(pk=user_id).values_list("token_version", flat=True).first()
+        if version is not None:
+            cache.set(key, version, get_claims_settings()["VERSION_CACHE_SECONDS"])
+    return version
+
+
+def bump_token_version(user_id):
+    """Makes the claims of every token issued to the user stale. Returns the new version."""
+    User = get_user_model()
+    User.objects.filter(pk=user_id).update(token_version=F("token_version") + 1)
+    key = _version_key(user_id)
+    cache.delete(key)
+    # Again once committed, in case a concurrent request cached the old version meanwhile
+    transaction.on_commit(lambda: cache.delete(key))
+    return User.objects.filter(pk=user_id).values_list("token_version", flat=True).first()
+
+
+def get_claims_principal(validated_token):
+    """The Principal signed into a token, or None when claims mode is off or the claims are stale."""
+    if not get_claims_settings()["ENABLED"]:
+        return None
+    if TOKEN_VERSION_CLAIM not in validated_token or any(claim not in validated_token for claim in CLAIM_FIELDS):
+        return None  # issued before claims mode
+    try:
+        user_id = ClaimsUser._meta.pk.to_python(validated_token[api_settings.USER_ID_CLAIM])
+    except ValidationError:
+        return None
+    if validated_token[TOKEN_VERSION_CLAIM] != current_token_version(user_id):
+        return None
+
+    user = ClaimsUser.from_db(
+        None,
+        ["id", "role", "status", "token_version"],
+        [user_id, validated_token["role"], validated_token["status"], validated_token[TOKEN_VERSION_CLAIM]],
+    )
+    return Principal(
+        user, validated_token["role"], validated_token["status"],
+        membership_role=validated_token["membership_role"],
+        membership_community_id=validated_token["community_id"],
+    )
@@ -12,7 +12,7 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.generics import RetrieveUpdateAPIView, RetrieveAPIView
 from .models import User
 from .services import GoogleAuthService
-from rest_framework_simplejwt.tokens import RefreshToken
+from .tokens import get_tokens_for_user
 from django.contrib.auth.models import update_last_login
 
 
@@ -198,7 +198,7 @@ class GoogleAuthView(APIView):
             
             user = GoogleAuthService.get_or_create_user(id_info)
 
-            refresh = RefreshToken.for_user(user)
+            refresh = get_tokens_for_user(user)
             update_last_login(None, user) # Update for Google Auth as well
             
             return Response({
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class CommunitiesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'communities'
+
+    def ready(self):
+        from .stats import connect_daily_stats
+        connect_daily_stats()
@@ -0,0 +1,82 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import Count
+from django.utils.html import escape
+from notifications.models import EmailOutbox
+from notifications.outbox import build_email
+from utils.email_utils import render_branded_email
+
+User = get_user_model()
+
+
+"""
+    Community-wide email (POST /communities/email-broadcasts/).
+    The branded template is rendered once per broadcast with a placeholder where the
+    recipient's name goes; each member's copy is then a plain string replace. Members are
+    streamed from CommunityMembership in chunks and written to the email outbox under the
+    broadcast's id, so the request only does inserts: `manage.py send_outbox` sends them over
+    one connection per batch, and progress and failures are read back from the outbox rows.
+"""
+
+CHUNK_SIZE = 500
+# Stands in for the recipient's name in the once-rendered template; never escaped by it
+RECIPIENT_NAME = "HCKONNECT_RECIPIENT_NAME"
+
+
+def render_broadcast(broadcast):
+    """The broadcast's (html, text) bodies with RECIPIENT_NAME left to fill in."""
+    community = broadcast.community
+    message = escape(broadcast.message).replace("\n", "<br>")
+    return render_branded_email({
+        "name": RECIPIENT_NAME,
+        "message": f"A message from <b>{escape(community.community_name or community.username)}</b>:<br><br>{message}",
+        "button_text": "View Community",
+        "button_url": f"{settings.FRONTEND_URL}/community/{community.id}/dashboard"
+    })
+
+
+def queue_broadcast(broadcast, chunk_size=CHUNK_SIZE):
+    """Queues one personalised outbox row per member. Call it inside the broadcast's transaction."""
+    html, text = render_broadcast(broadcast)
+    members = User.objects.filter(membership__community_id=broadcast.community_id).order_by('pk').values_list('email', 'first_name')
+
+    chunk, total = [], 0
+    for email, first_name in members.iterator(chunk_size=chunk_size):
+        name = first_name or "there"
+        chunk.append(build_email(
+            email, broadcast.subject,
+            text.replace(RECIPIENT_NAME, name),
+            html.replace(RECIPIENT_NAME, escape(name)),
+            priority=EmailOutbox.PRIORITY_BULK,
+            batch_id=broadcast.id
+        ))
+        if len(chunk) == chunk_size:
+            EmailOutbox.objects.bulk_create(chunk)
+            total += len(chunk)
+            chunk = []
+    if chunk:
+        EmailOutbox.objects.bulk_create(chunk)
+        total += len(chunk)
+
+    broadcast.recipient_count = total
+    broadcast.save(update_fields=['recipient_count', 'updated_at'])
+    return total
+
+
+def broadcast_progress(broadcast, failure_limit=100):
+    """Delivery counts by outbox status, plus the recipients whose last attempt failed."""
+    rows = EmailOutbox.objects.filter(batch_id=broadcast.id)
+    counts = dict(rows.values('status').annotate(total=Count('pk')).values_list('status', 'total'))
+    progress = {status: counts.get(status, 0) for status, _ in EmailOutbox.STATUS_CHOICES}
+
+    failures = [
+        {
+            "email": row.to_email,
+            "status": row.status,
+            "attempts": row.attempts,
+            "error": row.last_error.strip().splitlines()[-1],
+            "next_attempt_at": row.next_attempt_at if row.status == EmailOutbox.STATUS_PENDING else None,
+        }
+        for row in rows.exclude(last_error='').exclude(status=EmailOutbox.STATUS_SENT).order_by('to_email')[:failure_limit]
+    ]
+    return progress, failures
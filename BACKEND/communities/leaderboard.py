@@ -0,0 +1,66 @@
+from datetime import timedelta
+from django.apps import apps as django_apps
+from django.db import IntegrityError, transaction
+from django.db.models import Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+
+"""
+    Community leaderboard for the analytics "comparison" block.
+    The score (announcements + events + discussions) is summed from the daily rollup
+    into a ranked snapshot table, so a dashboard view reads the top entries and its own
+    rank in one indexed lookup. `manage.py refresh_leaderboard` refreshes it on a schedule,
+    and a read that finds it older than SNAPSHOT_MAX_AGE refreshes it on the spot.
+"""
+
+LEADERBOARD_METRICS = ("announcements", "events", "discussions")
+LEADERBOARD_SIZE = 5
+SNAPSHOT_MAX_AGE = timedelta(minutes=15)
+
+
+def refresh_leaderboard(apps=django_apps):
+    """Re-ranks every active community. Returns the number of ranked communities."""
+    User = apps.get_model("accounts.User")
+    CommunityLeaderboardEntry = apps.get_model("communities.CommunityLeaderboardEntry")
+
+    scores = User.objects.filter(role="community", status="active").annotate(
+        score=Coalesce(Sum("daily_stats__count", filter=Q(daily_stats__metric__in=LEADERBOARD_METRICS)), 0)
+    ).order_by("-score", "created_at").values_list("id", "score")
+
+    refreshed_at = timezone.now()
+    entries = [
+        CommunityLeaderboardEntry(community_id=community_id, rank=rank, score=score, refreshed_at=refreshed_at)
+        for rank, (community_id, score) in enumerate(scores, start=1)
+    ]
+    with transaction.atomic():
+        CommunityLeaderboardEntry.objects.all().delete()
+        CommunityLeaderboardEntry.objects.bulk_create(entries)
+    return len(entries)
+
+
+def get_leaderboard(community_id):
+    """
+    The top LEADERBOARD_SIZE entries plus the given community's own entry (if it is ranked),
+    ordered by rank, and when the snapshot was taken.
+    """
+    CommunityLeaderboardEntry = django_apps.get_model("communities.CommunityLeaderboardEntry")
+
+    def read():
+        return list(
+            CommunityLeaderboardEntry.objects.filter(Q(rank__lte=LEADERBOARD_SIZE) | Q(community_id=community_id))
+            .select_related("community")
+            .order_by("rank")
+        )
+
+    entries = read()
+    refreshed_at = entries[0].refreshed_at if entries else None
+    if refreshed_at is None or timezone.now() - refreshed_at > SNAPSHOT_MAX_AGE:
+        try:
+            refresh_leaderboard()
+        except IntegrityError:
+            # A concurrent request refreshed it at the same time
+            pass
+        entries = read()
+        refreshed_at = entries[0].refreshed_at if entries else None
+    return entries, refreshed_at
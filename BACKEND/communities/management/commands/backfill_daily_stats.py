@@ -0,0 +1,22 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from communities.stats import rebuild_daily_stats
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the CommunityDailyStats rollup from the source tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, help="Only rebuild the last N days (default: everything).")
+
+    def handle(self, *args, **options):
+        since = None
+        if options["days"] is not None:
+            if options["days"] < 1:
+                raise CommandError("--days must be at least 1.")
+            since = timezone.localdate() - timedelta(days=options["days"] - 1)
+
+        written = rebuild_daily_stats(since=since)
+        scope = f"since {since}" if since else "for every day"
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} daily stats rows {scope}."))
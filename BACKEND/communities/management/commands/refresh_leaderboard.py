@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from communities.leaderboard import refresh_leaderboard
+
+
+class Command(BaseCommand):
+    help = "Refreshes the ranked community leaderboard snapshot (run it on a schedule, e.g. every few minutes)."
+
+    def handle(self, *args, **options):
+        ranked = refresh_leaderboard()
+        self.stdout.write(self.style.SUCCESS(f"Ranked {ranked} communities."))
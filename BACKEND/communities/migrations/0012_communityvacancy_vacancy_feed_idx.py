@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-18 14:52
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('communities', '0011_communityvacancy_status'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='communityvacancy',
+            index=models.Index(fields=['-created_at', '-id'], name='vacancy_feed_idx'),
+        ),
+    ]
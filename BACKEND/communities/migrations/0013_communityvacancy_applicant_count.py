@@ -0,0 +1,25 @@
+# Generated by Django 5.2.8 on 2026-10-18 14:58
+
+from django.db import migrations, models
+
+
+def backfill_counters(apps, schema_editor):
+    from utils.counters import recount
+    recount(apps, models=['communities.CommunityVacancy', 'accounts.User'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0008_user_member_count'),
+        ('communities', '0012_communityvacancy_vacancy_feed_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='communityvacancy',
+            name='applicant_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.8 on 2026-10-18 15:01
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_daily_stats(apps, schema_editor):
+    from communities.stats import rebuild_daily_stats
+    rebuild_daily_stats(apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('communities', '0013_communityvacancy_applicant_count'),
+        ('contents', '0006_post_comment_count_post_reaction_count_and_more'),
+        ('discussion', '0004_discussionpanel_reaction_count_and_more'),
+        ('events', '0005_event_registered_count'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CommunityDailyStats',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('day', models.DateField()),
+                ('metric', models.CharField(choices=[('announcements', 'Announcements'), ('events', 'Events'), ('discussions', 'Discussions'), ('posts', 'Posts'), ('post_comments', 'Post Comments'), ('discussion_replies', 'Discussion Replies'), ('post_reactions', 'Post Reactions'), ('discussion_reactions', 'Discussion Reactions')], max_length=30)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('community', models.ForeignKey(limit_choices_to={'role': 'community'}, on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Community Daily Stats',
+                'verbose_name_plural': 'Community Daily Stats',
+                'unique_together': {('community', 'day', 'metric')},
+            },
+        ),
+        migrations.RunPython(backfill_daily_stats, migrations.RunPython.noop),
+    ]
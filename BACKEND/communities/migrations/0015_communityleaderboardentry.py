@@ -0,0 +1,34 @@
+# Generated by Django 5.2.8 on 2026-10-18 15:03
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('communities', '0014_communitydailystats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CommunityLeaderboardEntry',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('rank', models.PositiveIntegerField()),
+                ('score', models.PositiveIntegerField(default=0)),
+                ('refreshed_at', models.DateTimeField()),
+                ('community', models.OneToOneField(limit_choices_to={'role': 'community'}, on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entry', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Community Leaderboard Entry',
+                'verbose_name_plural': 'Community Leaderboard',
+                'indexes': [models.Index(fields=['rank'], name='leaderboard_rank_idx')],
+            },
+        ),
+    ]
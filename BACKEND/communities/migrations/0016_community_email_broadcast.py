@@ -0,0 +1,36 @@
+# Generated by Django 5.2.8 on 2026-10-18 15:16
+
+import Base.models
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('communities', '0015_communityleaderboardentry'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CommunityEmailBroadcast',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('subject', models.CharField(max_length=200)),
+                ('message', models.TextField()),
+                ('recipient_count', models.PositiveIntegerField(default=0)),
+                ('community', models.ForeignKey(limit_choices_to={'role': 'community'}, on_delete=django.db.models.deletion.CASCADE, related_name='email_broadcasts', to=settings.AUTH_USER_MODEL)),
+                ('sent_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='sent_email_broadcasts', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Community Email Broadcast',
+                'ordering': ['-created_at'],
+            },
+            bases=(Base.models.TrackedFieldsMixin, models.Model),
+        ),
+    ]
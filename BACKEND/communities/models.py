@@ -39,6 +39,16 @@ class CommunityVacancy(BaseModel):
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_OPEN)
     is_open = models.BooleanField(default=True)
 
+    # Denormalized counter, maintained by utils/counters.py
+    applicant_count = models.PositiveIntegerField(default=0)
+    counter_fields = ("applicant_count",)
+
+    # Diffed by notifications.signals.notify_vacancy_closed
+    tracked_fields = ("status",)
+
+    class Meta:
+        indexes = [models.Index(fields=["-created_at", "-id"], name="vacancy_feed_idx")]
+
     def save(self, *args, **kwargs):
         self.is_open = self.status == self.STATUS_OPEN
         super().save(*args, **kwargs)
@@ -59,10 +69,62 @@ class VacancyApplication(BaseModel):
     def __str__(self):
         return f"{self.user.username} → {self.vacancy.title}"
 
-        
 
+class CommunityDailyStats(BaseModel):
+    """Activity rollup for the analytics dashboard: one row per community, day and metric."""
+    METRIC_CHOICES = [
+        ("announcements", "Announcements"),
+        ("events", "Events"),
+        ("discussions", "Discussions"),
+        ("posts", "Posts"),
+        ("post_comments", "Post Comments"),
+        ("discussion_replies", "Discussion Replies"),
+        ("post_reactions", "Post Reactions"),
+        ("discussion_reactions", "Discussion Reactions"),
+    ]
+
+    community = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, limit_choices_to={"role": "community"}, related_name="daily_stats")
+    day = models.DateField()
+    metric = models.CharField(max_length=30, choices=METRIC_CHOICES)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Community Daily Stats"
+        verbose_name_plural = "Community Daily Stats"
+        # Also serves the (community, day range) reads of the analytics view
+        unique_together = ("community", "day", "metric")
+
+    def __str__(self):
+        return f"{self.community_id} {self.day} {self.metric}: {self.count}"
 
 
+class CommunityLeaderboardEntry(BaseModel):
+    """Ranked snapshot of the active communities, refreshed by communities/leaderboard.py."""
+    community = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, limit_choices_to={"role": "community"}, related_name="leaderboard_entry")
+    rank = models.PositiveIntegerField()
+    score = models.PositiveIntegerField(default=0)
+    refreshed_at = models.DateTimeField()
 
+    class Meta:
+        verbose_name = "Community Leaderboard Entry"
+        verbose_name_plural = "Community Leaderboard"
+        indexes = [models.Index(fields=["rank"], name="leaderboard_rank_idx")]
+
+    def __str__(self):
+        return f"#{self.rank} {self.community_id} ({self.score})"
 
 
+class CommunityEmailBroadcast(BaseModel):
+    """An email to every member of a community; its id is the batch_id of the queued EmailOutbox rows."""
+    community = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, limit_choices_to={"role": "community"}, related_name="email_broadcasts")
+    sent_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name="sent_email_broadcasts")
+    subject = models.CharField(max_length=200)
+    message = models.TextField()
+    recipient_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Community Email Broadcast"
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.subject} ({self.recipient_count} recipients)"
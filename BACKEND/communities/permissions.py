@@ -1,5 +1,6 @@
 from rest_framework import permissions
 from rest_framework.permissions import BasePermission
+from utils.principal import get_principal
 
 class IsCommunityAccount(BasePermission):
     message = "Only community accounts can perform this action."
@@ -54,7 +55,8 @@ class IsCommunityRepresentativeOrReadOnly(permissions.BasePermission):
         
         # For write methods (POST, PUT, DELETE), user must be authenticated
         # and a representative of a community.
-        return request.user and request.user.is_authenticated and hasattr(request.user, 'membership') and request.user.membership.role == 'representative'
+        principal = get_principal(request)
+        return principal is not None and principal.is_representative
 
     def has_object_permission(self, request, view, obj):
         # Read permissions are allowed to any request.
@@ -63,15 +65,13 @@ class IsCommunityRepresentativeOrReadOnly(permissions.BasePermission):
 
         # Write permissions are only allowed to the representative of the specific community
         # that owns the event.
-        if not (request.user and request.user.is_authenticated and hasattr(request.user, 'membership')):
+        principal = get_principal(request)
+        if principal is None or not principal.is_representative:
             return False
-            
+
         # Check if the user is a representative of the community associated with the event.
         # The 'obj' here is the Event instance.
-        return (
-            request.user.membership.role == 'representative' and
-            str(request.user.membership.community.id) == str(obj.community.id)
-        )
+        return principal.manages(obj.community_id)
 
 class CanManageVacancy(BasePermission):
     """
@@ -79,17 +79,6 @@ class CanManageVacancy(BasePermission):
     Only the community that owns it or its representative can manage it.
     """
     def has_object_permission(self, request, view, obj):
-        user = request.user
-        if not user.is_authenticated:
-            return False
-
-        # Community owner
-        if user.role == "community" and obj.community == user:
-            return True
-
-        # Representative
-        membership = getattr(user, "membership", None)
-        if membership and membership.role == "representative" and membership.community == obj.community:
-            return True
-
-        return False
+        principal = get_principal(request)
+        # The community owner or its representative
+        return principal is not None and principal.manages(obj.community_id)
@@ -1,17 +1,19 @@
 from rest_framework.serializers import ModelSerializer, PrimaryKeyRelatedField, ValidationError, CharField, EmailField, ImageField, IntegerField, SerializerMethodField, DateTimeField, UUIDField
 from django.contrib.auth import get_user_model
-from .models import CommunityMembership,CommunityVacancy,VacancyApplication
+from .models import CommunityMembership,CommunityVacancy,VacancyApplication,CommunityEmailBroadcast
 from datetime import timedelta
 from django.utils import timezone
+from utils.viewer import ViewerFlagsListSerializer, get_viewer_context
 User = get_user_model()
 
 class CommunityVacancySerializer(ModelSerializer):
     community_id = UUIDField(source="community.id", read_only=True)
     community_name = CharField(source="community.community_name", read_only=True)
     has_applied = SerializerMethodField()
-    applicant_count = IntegerField(source="applications.count", read_only=True)
+    applicant_count = IntegerField(read_only=True)
     created_at = DateTimeField(read_only=True)
     updated_at = DateTimeField(read_only=True)
+    viewer_flags = {"vacancy_application": "pk"}
 
     class Meta:
         model = CommunityVacancy
@@ -30,6 +32,7 @@ class CommunityVacancySerializer(ModelSerializer):
             "updated_at",
         ]
         read_only_fields = ["id", "community_id", "community_name", "has_applied", "applicant_count", "created_at", "updated_at"]
+        list_serializer_class = ViewerFlagsListSerializer
 
     def to_internal_value(self, data):
         mutable_data = data.copy()
@@ -44,10 +47,7 @@ class CommunityVacancySerializer(ModelSerializer):
         return super().to_internal_value(mutable_data)
 
     def get_has_applied(self, obj):
-        request = self.context.get('request')
-        if not (request and request.user.is_authenticated):
-            return False
-        return obj.applications.filter(user=request.user).exists()
+        return get_viewer_context(self.context).has("vacancy_application", obj.pk)
 
     def validate(self, data):
         user = self.context["request"].user
@@ -205,7 +205,7 @@ class StudentListSerializer(ModelSerializer):
         fields = ["id", "username", "email", "first_name", "last_name"]
 # list of communities
 class CommunityListSerializer(ModelSerializer):
-    member_count = IntegerField(source="members.count", read_only=True)
+    member_count = IntegerField(read_only=True)
 
     class Meta:
         model = User
@@ -213,7 +213,7 @@ class CommunityListSerializer(ModelSerializer):
         
 # community account dashboard
 class CommunityDashboardSerializer(ModelSerializer):
-    member_count = IntegerField(source="members.count", read_only=True)
+    member_count = IntegerField(read_only=True)
     is_community_owner = SerializerMethodField()
     new_members_this_month = SerializerMethodField()
     recent_activity = SerializerMethodField()
@@ -335,8 +335,8 @@ class CommunityDashboardSerializer(ModelSerializer):
                 "author_role": author_data["author_role"],
                 "author_image": author_data["author_image"],
                 "visibility": d.visibility,
-                "reply_count": d.replies.count(),
-                "reaction_count": d.reactions.count(),
+                "reply_count": d.reply_count,
+                "reaction_count": d.reaction_count,
                 "community": {
                     "id": str(d.community.id) if d.community else None,
                     "name": d.community.community_name if d.community else "General",
@@ -371,3 +371,16 @@ class CommunityDashboardSerializer(ModelSerializer):
         content.sort(key=lambda x: x.get('created_at') or x.get('createdAt'), reverse=True)
         return content[:10]
 
+
+
+class CommunityEmailBroadcastSerializer(ModelSerializer):
+    class Meta:
+        model = CommunityEmailBroadcast
+        fields = ["id", "subject", "message", "recipient_count", "created_at"]
+        read_only_fields = ["recipient_count", "created_at"]
+
+    def validate_subject(self, value):
+        # Header values cannot span lines
+        if "\n" in value or "\r" in value:
+            raise ValidationError("Subject must be a single line.")
+        return value
@@ -0,0 +1,140 @@
+from django.apps import apps as django_apps
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, F, When
+from django.db.models.functions import Greatest, TruncDate
+from django.db.models.signals import post_save, post_delete
+from django.utils import timezone
+
+
+"""
+    Daily activity rollup (CommunityDailyStats) behind the community analytics dashboard.
+    Every created or deleted row moves its (community, day, metric) count by one, so the
+    dashboard reads a few rollup rows instead of grouping the raw tables by date.
+    A student's activity counts for the community they were a member of when it was created:
+    rows older than their current membership belong to no community we still know of, so
+    neither a delete nor the rebuild moves the current community's counts for them.
+    `manage.py backfill_daily_stats` rebuilds the rollup from the source tables.
+"""
+
+# metric: (source model, field giving the community, "community" if it is the community FK
+# or "author" if it is a user whose community is the one counted)
+DAILY_METRICS = {
+    "announcements": ("contents.Announcement", "community", "community"),
+    "events": ("events.Event", "community", "community"),
+    "discussions": ("discussion.DiscussionPanel", "community", "community"),
+    "posts": ("contents.Post", "author", "author"),
+    "post_comments": ("contents.PostComment", "author", "author"),
+    "discussion_replies": ("discussion.DiscussionReply", "created_by", "author"),
+    "post_reactions": ("contents.PostReaction", "user", "author"),
+    "discussion_reactions": ("discussion.Reaction", "user", "author"),
+}
+# The metrics shown as all-time totals in the engagement block
+ENGAGEMENT_METRICS = ("announcements", "events", "posts", "discussions")
+BATCH_SIZE = 1000
+
+
+def community_for_user(user_id, at, apps=django_apps):
+    """
+    A community account counts for itself, a student for the community they were a member of
+    at `at`: their current one, unless they joined it after that.
+    """
+    if user_id is None:
+        return None
+    User = apps.get_model("accounts.User")
+    row = User.objects.filter(pk=user_id).values_list("role", "membership__community_id", "membership__created_at").first()
+    if row is None:
+        return None
+    role, community_id, joined_at = row
+    if role == "community":
+        return user_id
+    return community_id if joined_at is not None and joined_at <= at else None
+
+
+def bump_daily_stat(community_id, day, metric, delta):
+    """Atomically moves one rollup count by delta, creating the row on its first hit."""
+    if community_id is None:
+        return
+    CommunityDailyStats = django_apps.get_model("communities.CommunityDailyStats")
+    stats = CommunityDailyStats.objects.filter(community_id=community_id, day=day, metric=metric)
+    if delta < 0:
+        stats.update(count=Greatest(F("count") + delta, 0))
+        return
+    if stats.update(count=F("count") + delta):
+        return
+    try:
+        with transaction.atomic():
+            CommunityDailyStats.objects.create(community_id=community_id, day=day, metric=metric, count=delta)
+    except IntegrityError:
+        # Another request created the row first
+        stats.update(count=F("count") + delta)
+
+
+def _make_receivers(metric, field, attribution):
+    attname = f"{field}_id"
+
+    def community_of(instance):
+        value = getattr(instance, attname)
+        return value if attribution == "community" else community_for_user(value, instance.created_at)
+
+    def on_save(sender, instance, created, **kwargs):
+        if created:
+            bump_daily_stat(community_of(instance), timezone.localdate(instance.created_at), metric, 1)
+
+    def on_delete(sender, instance, **kwargs):
+        bump_daily_stat(community_of(instance), timezone.localdate(instance.created_at), metric, -1)
+
+    return on_save, on_delete
+
+
+def connect_daily_stats():
+    for metric, (model_label, field, attribution) in DAILY_METRICS.items():
+        model = django_apps.get_model(model_label)
+        on_save, on_delete = _make_receivers(metric, field, attribution)
+        uid = f"daily_stats:{metric}"
+        post_save.connect(on_save, sender=model, weak=False, dispatch_uid=uid)
+        post_delete.connect(on_delete, sender=model, weak=False, dispatch_uid=uid)
+
+
+def rebuild_daily_stats(apps=django_apps, since=None):
+    """
+    Recomputes the rollup from the source tables, for every day or only from `since` on.
+    Returns the number of rollup rows written. `apps` can be a migration's historical registry.
+    """
+    CommunityDailyStats = apps.get_model("communities.CommunityDailyStats")
+    counts = {}
+    for metric, (model_label, field, attribution) in DAILY_METRICS.items():
+        model = apps.get_model(model_label)
+        if attribution == "community":
+            community = F(f"{field}_id")
+        else:
+            community = Case(
+                When(**{f"{field}__role": "community"}, then=F(f"{field}_id")),
+                When(
+                    **{f"{field}__membership__created_at__lte": F("created_at")},
+                    then=F(f"{field}__membership__community_id"),
+                ),
+            )
+        rows = model.objects.all()
+        if since:
+            rows = rows.filter(created_at__date__gte=since)
+        rows = (
+            rows.annotate(stat_community=community, stat_day=TruncDate("created_at"))
+            .filter(stat_community__isnull=False)
+            .order_by()
+            .values_list("stat_community", "stat_day")
+            .annotate(total=Count("pk"))
+        )
+        for community_id, day, total in rows:
+            counts[(community_id, day, metric)] = total
+
+    with transaction.atomic():
+        existing = CommunityDailyStats.objects.all()
+        if since:
+            existing = existing.filter(day__gte=since)
+        existing.delete()
+        stats = [
+            CommunityDailyStats(community_id=community_id, day=day, metric=metric, count=total)
+            for (community_id, day, metric), total in counts.items()
+        ]
+        CommunityDailyStats.objects.bulk_create(stats, batch_size=BATCH_SIZE)
+    return len(stats)
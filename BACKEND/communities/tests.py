@@ -1,3 +1,244 @@
-from django.test import TestCase
+import threading
+import time
+from io import StringIO
+from datetime import timedelta
+from django.test import TestCase, override_settings
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.contrib.auth import get_user_model
+from accounts.models import CommunityUser
+from django.utils import timezone
+from rest_framework.test import APIClient
+from contents.models import Announcement, Post, PostComment, PostReaction
+from discussion.models import DiscussionPanel
+from notifications.models import EmailOutbox
+from notifications.outbox import send_pending
+from utils.cache import cache_stats, get_cache_settings, read_through, reset_cache_stats
+from .models import CommunityMembership, CommunityDailyStats, CommunityLeaderboardEntry
 
-# Create your tests here.
+User = get_user_model()
+
+
+class CommunityAnalyticsRollupTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.community = User.objects.create_user(
+            email="comm@test.com", username="testcomm", password="password123",
+            role="community", community_name="Test Community"
+        )
+        self.member = User.objects.create_user(
+            email="member@test.com", username="member", password="password123", role="student"
+        )
+        self.outsider = User.objects.create_user(
+            email="outsider@test.com", username="outsider", password="password123", role="student"
+        )
+        CommunityMembership.objects.create(user=self.member, community=self.community)
+
+        Announcement.objects.create(title="Notice", description="desc", community=self.community)
+        DiscussionPanel.objects.create(topic="Topic", created_by=self.member, community=self.community)
+        post = Post.objects.create(author=self.member, content="Member post")
+        PostComment.objects.create(post=post, author=self.member, content="Comment")
+        PostReaction.objects.create(post=post, user=self.member)
+        Post.objects.create(author=self.outsider, content="Not counted")
+        self.client.force_authenticate(user=self.community)
+
+    def _analytics(self, **params):
+        return self.client.get(f"/communities/analytics/{self.community.id}/", params)
+
+    def test_rollup_is_updated_as_content_is_created(self):
+        today = timezone.localdate()
+        stats = dict(CommunityDailyStats.objects.filter(community=self.community, day=today).values_list("metric", "count"))
+        self.assertEqual(stats, {
+            "announcements": 1, "discussions": 1, "posts": 1,
+            "post_comments": 1, "post_reactions": 1,
+        })
+
+        PostReaction.objects.filter(user=self.member).delete()
+        self.assertFalse(CommunityDailyStats.objects.get(community=self.community, day=today, metric="post_reactions").count)
+
+    def test_analytics_window(self):
+        # An old post, outside the 7 day window but inside the 30 day one
+        old_post = Post.objects.create(author=self.community, content="Old post")
+        Post.objects.filter(pk=old_post.pk).update(created_at=timezone.now() - timedelta(days=20))
+        call_command("backfill_daily_stats", stdout=StringIO())
+
+        response = self._analytics()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["engagement"], {"announcements": 1, "events": 0, "posts": 2, "discussions": 1})
+        self.assertEqual(len(response.data["activity_trend"]), 7)
+        self.assertEqual(response.data["total_engagements"], 5)
+
+        response = self._analytics(window=30)
+        self.assertEqual(len(response.data["activity_trend"]), 30)
+        self.assertEqual(len(response.data["posts_last_7_days"]), 7)
+        self.assertEqual(response.data["total_engagements"], 6)
+
+        self.assertEqual(self._analytics(window=14).status_code, 400)
+
+    def test_backfill_matches_incremental_rollup(self):
+        expected = set(CommunityDailyStats.objects.values_list("community_id", "day", "metric", "count"))
+        CommunityDailyStats.objects.all().delete()
+        call_command("backfill_daily_stats", stdout=StringIO())
+        self.assertEqual(set(CommunityDailyStats.objects.values_list("community_id", "day", "metric", "count")), expected)
+
+    def test_deletes_count_against_the_community_at_creation(self):
+        rival = User.objects.create_user(
+            email="rival@test.com", username="rival", password="password123",
+            role="community", community_name="Rival Community"
+        )
+        old_post = Post.objects.get(author=self.member)
+        CommunityMembership.objects.filter(user=self.member).delete()
+        CommunityMembership.objects.create(user=self.member, community=rival)
+        Post.objects.create(author=self.member, content="Rival post")
+
+        old_post.delete()
+        today = timezone.localdate()
+        self.assertEqual(CommunityDailyStats.objects.get(community=rival, day=today, metric="posts").count, 1)
+
+        call_command("backfill_daily_stats", stdout=StringIO())
+        self.assertEqual(CommunityDailyStats.objects.get(community=rival, day=today, metric="posts").count, 1)
+
+    def test_comparison_reads_leaderboard_snapshot(self):
+        rival = User.objects.create_user(
+            email="rival@test.com", username="rival", password="password123",
+            role="community", community_name="Rival Community"
+        )
+        for i in range(3):
+            Announcement.objects.create(title=f"Rival {i}", description="desc", community=rival)
+
+        response = self._analytics()
+        comparison = response.data["comparison"]
+        self.assertEqual([(c["name"], c["rank"], c["score"]) for c in comparison], [
+            ("Rival Community", 1, 3), ("Test Community", 2, 2),
+        ])
+        self.assertEqual(response.data["comparison_age_seconds"], 0)
+
+        # The snapshot is reused until it goes stale
+        Announcement.objects.create(title="New", description="desc", community=self.community)
+        Announcement.objects.create(title="Newer", description="desc", community=self.community)
+        self.assertEqual(self._analytics().data["comparison"][0]["name"], "Rival Community")
+
+        CommunityLeaderboardEntry.objects.update(refreshed_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(self._analytics().data["comparison"][0]["name"], "Test Community")
+
+
+class CommunityEmailBroadcastTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.community = User.objects.create_user(
+            email="comm@test.com", username="testcomm", password="password123",
+            role="community", community_name="Test Community"
+        )
+        self.members = [
+            User.objects.create_user(email=f"m{i}@test.com", username=f"member{i}", password="password123", role="student", first_name=name)
+            for i, name in enumerate(["Asha", "<Bikash>", ""])
+        ]
+        for member in self.members:
+            CommunityMembership.objects.create(user=member, community=self.community)
+        self.members[0].membership.role = "representative"
+        self.members[0].membership.save()
+
+    def test_representative_broadcast_is_queued_then_reports_progress(self):
+        self.client.force_authenticate(user=self.members[0])
+        response = self.client.post("/communities/email-broadcasts/", {"subject": "Meetup", "message": "See you\nat <5pm>"})
+        self.assertEqual(response.status_code, 202, response.data)
+        self.assertEqual(response.data["recipient_count"], 3)
+        self.assertEqual(mail.outbox, [])
+
+        # One render, personalised per member (and escaped like the template would)
+        rows = {row.to_email: row for row in EmailOutbox.objects.filter(batch_id=response.data["id"])}
+        self.assertIn("Hello Asha,", rows["m0@test.com"].body_html)
+        self.assertIn("Hello &lt;Bikash&gt;,", rows["m1@test.com"].body_html)
+        self.assertIn("Hello there,", rows["m2@test.com"].body_html)
+        self.assertIn("See you<br>at &lt;5pm&gt;", rows["m0@test.com"].body_html)
+
+        EmailOutbox.objects.filter(to_email="m2@test.com").update(subject="Broken\nheader")
+        self.assertEqual(send_pending(), (2, 1))
+        progress = self.client.get(response.data["progress_url"]).data
+        self.assertEqual(progress["progress"], {"pending": 1, "sending": 0, "sent": 2, "failed": 0})
+        self.assertFalse(progress["is_complete"])
+        self.assertEqual([f["email"] for f in progress["failures"]], ["m2@test.com"])
+        self.assertIn("BadHeaderError", progress["failures"][0]["error"])
+
+    def test_only_managers_can_broadcast(self):
+        self.client.force_authenticate(user=self.members[1])
+        response = self.client.post("/communities/email-broadcasts/", {"subject": "Hi", "message": "Hello"})
+        self.assertEqual(response.status_code, 403)
+
+        self.client.force_authenticate(user=self.community)
+        response = self.client.post("/communities/email-broadcasts/", {"subject": "Two\nlines", "message": "Hello"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.get("/communities/email-broadcasts/").data, [])
+
+
+# Local memory is per process, so the cache has to be turned on explicitly
+@override_settings(READ_CACHE={"ENABLED": True})
+class ReadCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        reset_cache_stats()
+        self.client = APIClient()
+        self.community = User.objects.create_user(
+            email="comm@test.com", username="testcomm", password="password123",
+            role="community", community_name="Test Community"
+        )
+        self.student = User.objects.create_user(email="s@test.com", username="student", password="password123", role="student")
+
+    def test_reads_are_cached_until_a_change_bumps_the_namespace(self):
+        first = self.client.get("/communities/communities-list/")
+        cached = self.client.get("/communities/communities-list/")
+        self.assertEqual(cached.request_metrics.queries, 0)
+        self.assertEqual(cached.request_metrics.cache, {"hits": 1})
+        self.assertEqual(cached.data, first.data)
+
+        # The membership signal bumps the community and the list, so the new member count shows
+        CommunityMembership.objects.create(user=self.student, community=self.community)
+        self.assertEqual(self.client.get("/communities/communities-list/").data[0]["member_count"], 1)
+        self.client.force_authenticate(user=self.community)
+        members = self.client.get(f"/communities/{self.community.pk}/members/")
+        self.assertEqual([m["username"] for m in members.data], ["student"])
+
+        self.assertEqual(self.client.get("/contents/announcements/stats/").data["total_announcements"], 0)
+        Announcement.objects.create(community=self.community, title="News", description="Text")
+        self.assertEqual(self.client.get("/contents/announcements/stats/").data["total_announcements"], 1)
+
+        # The admin saves communities through a proxy model
+        community = CommunityUser.objects.get(pk=self.community.pk)
+        community.community_name = "Renamed"
+        community.save()
+        self.client.force_authenticate(user=None)
+        self.assertEqual(self.client.get("/communities/communities-list/").data[0]["community_name"], "Renamed")
+
+    def test_off_by_default_on_a_per_process_cache(self):
+        shared = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": "redis://cache:6379"}}
+        with override_settings(READ_CACHE={}):
+            self.assertFalse(get_cache_settings()["ENABLED"])
+            with override_settings(CACHES=shared):
+                self.assertTrue(get_cache_settings()["ENABLED"])
+
+    def test_dashboard_is_shared_but_the_owner_flag_is_per_viewer(self):
+        self.client.force_authenticate(user=self.community)
+        self.assertTrue(self.client.get(f"/communities/dashboard/{self.community.pk}/").data["is_community_owner"])
+        self.client.force_authenticate(user=self.student)
+        response = self.client.get(f"/communities/dashboard/{self.community.pk}/")
+        self.assertEqual(response.request_metrics.cache, {"hits": 1})
+        self.assertFalse(response.data["is_community_owner"])
+
+    def test_concurrent_misses_compute_once(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return "value"
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(read_through("test", ["test:ns"], compute))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, ["value"] * 5)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cache_stats()["test"], {"hits": 0, "misses": 5, "waits": 4})
@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import CommunityListView, CreateCommunityVacancyView, ManageCommunityVacancyView, ApplyVacancyView,AddCommunityMemberView, CommunityDashboardView,RemoveCommunityMemberView, StudentListView, ListCommunityMembersView, ListCommunityVacanciesView, ListVacancyApplicationsView, UpdateCommunityMemberRoleView, CommunityAnalyticsView, SendCommunityMessageView
+from .views import CommunityListView, CreateCommunityVacancyView, ManageCommunityVacancyView, ApplyVacancyView,AddCommunityMemberView, CommunityDashboardView,RemoveCommunityMemberView, StudentListView, ListCommunityMembersView, ListCommunityVacanciesView, ListVacancyApplicationsView, UpdateCommunityMemberRoleView, CommunityAnalyticsView, SendCommunityMessageView, CommunityEmailBroadcastView, CommunityEmailBroadcastProgressView
 
 
 
@@ -56,7 +56,11 @@ urlpatterns = [
     path('<uuid:community_id>/members/', ListCommunityMembersView.as_view(), name='community-members'),
     
     path("students/", StudentListView.as_view(), name="students-list"),
-    path("send-message/", SendCommunityMessageView.as_view(), name="send-community-message")
+    path("send-message/", SendCommunityMessageView.as_view(), name="send-community-message"),
+
+    # Email every member of the caller's community (community account or representative)
+    path("email-broadcasts/", CommunityEmailBroadcastView.as_view(), name="community-email-broadcasts"),
+    path("email-broadcasts/<uuid:pk>/", CommunityEmailBroadcastProgressView.as_view(), name="community-email-broadcast-progress")
 
 
 ]
@@ -1,25 +1,29 @@
 from rest_framework import status
 from rest_framework.generics import CreateAPIView, ListAPIView, RetrieveAPIView, RetrieveUpdateDestroyAPIView
 from rest_framework.permissions import IsAuthenticated, AllowAny
-from .models import CommunityMembership,CommunityVacancy,VacancyApplication
-from .serializers import CommunityMembershipCreateSerializer, CommunityMemberListSerializer, CommunityListSerializer,CommunityVacancySerializer,CommunityDashboardSerializer, StudentListSerializer,VacancyApplicationSerializer
+from .models import CommunityMembership,CommunityVacancy,VacancyApplication,CommunityDailyStats,CommunityEmailBroadcast
+from .email_broadcast import queue_broadcast, broadcast_progress
+from .stats import ENGAGEMENT_METRICS
+from .leaderboard import get_leaderboard
+from .serializers import CommunityMembershipCreateSerializer, CommunityMemberListSerializer, CommunityListSerializer,CommunityVacancySerializer,CommunityDashboardSerializer, StudentListSerializer,VacancyApplicationSerializer,CommunityEmailBroadcastSerializer
 from rest_framework.exceptions import NotFound, PermissionDenied
 from django.contrib.auth import get_user_model
 from contents.permissions import CanCreateCommunityContent
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from django.db.models import Q, Count, Sum, F
+from django.db import transaction
+from django.db.models import Q, Count, Sum
 from .permissions import IsCommunityAccount, CanManageVacancy
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from datetime import timedelta
-from contents.models import Announcement, Post, PostComment, PostReaction
-from events.models import Event
-from discussion.models import DiscussionPanel, DiscussionReply, Reaction as DiscussionReaction
-from utils.email_utils import send_branded_email
-from notifications.models import Notification
+from utils.email_utils import queue_branded_email
+from notifications.services import NotificationService
+from notifications.models import EmailOutbox
 from django.conf import settings
 from utils.pagination import StandardPagination
+from utils.principal import get_principal
+from utils.cache import COMMUNITIES, community_namespace, read_through, request_key
 
 User = get_user_model()
 
@@ -73,14 +77,14 @@ class ListCommunityVacanciesView(ListAPIView):
             queryset = queryset.filter(community_id=community_id)
         # If no community_id, apply role-based filtering
         elif self.request.user.is_authenticated:
-            if self.request.user.role == "student":
+            principal = get_principal(self.request)
+            if principal.role == "student":
                 pass # Students can see all public vacancies
-            elif self.request.user.role == "community":
-                queryset = queryset.filter(community=self.request.user)
+            elif principal.is_community:
+                queryset = queryset.filter(community_id=principal.user_id)
             else: # e.g., representatives
-                membership = getattr(self.request.user, "membership", None)
-                if membership:
-                    queryset = queryset.filter(community=membership.community)
+                if principal.membership_community_id:
+                    queryset = queryset.filter(community_id=principal.membership_community_id)
                 else:
                     return CommunityVacancy.objects.none()
         else:
@@ -118,19 +122,18 @@ class ListVacancyApplicationsView(ListAPIView):
     pagination_class = StandardPagination
 
     def get_queryset(self):
-        user = self.request.user
         vacancy_id = self.request.query_params.get('vacancy_id')
         
         # Determine which community's data to look at
-        membership = getattr(user, 'membership', None)
-        if user.role == "community":
-            target_community = user
-        elif membership and membership.role == "representative":
-            target_community = membership.community
-        else:
+        target_community_id = get_principal(self.request).managed_community_id
+        if target_community_id is None:
             return VacancyApplication.objects.none()
 
-        queryset = VacancyApplication.objects.filter(vacancy__community=target_community)
+        queryset = (
+            VacancyApplication.objects.filter(vacancy__community_id=target_community_id)
+            .select_related("user", "vacancy__community")
+            .order_by("-applied_at")
+        )
 
         # If they asked for a specific vacancy, filter it down
         if vacancy_id:
@@ -148,24 +151,39 @@ class ListCommunityMembersView(ListAPIView):
     serializer_class = CommunityMemberListSerializer
     # permission_classes = [IsAuthenticated]
 
-    def get_queryset(self):
+    def get_community_id(self):
         # Used for URLs like: /members/?community_id=5
         # Or captured from the path if using: /<int:community_id>/members/
         community_id = self.request.query_params.get('community_id') or self.kwargs.get('community_id')
-        
         if community_id:
             # PUBLIC VIEW: Anyone logged in can see members of a specific community 
             # if they provide that community's ID.
-            # .select_related('user') here to join the Student profile data in ONE query.
-            return CommunityMembership.objects.filter(community_id=community_id).select_related('user')
-        
+            return community_id
+
         # If no specific ID is requested, we check if the logged-in user is a Community account.
+        # If so, show them ONLY their own members.
         if self.request.user.role == "community":
-            # If so, show them ONLY their own members.
-            return CommunityMembership.objects.filter(community=self.request.user).select_related('user')
-        
+            return self.request.user.pk
+        return None
+
+    def get_queryset(self):
+        community_id = self.get_community_id()
+        if community_id:
+            # .select_related('user') here to join the Student profile data in ONE query.
+            return CommunityMembership.objects.filter(community_id=community_id).select_related('user')
         return CommunityMembership.objects.none()
 
+    def list(self, request, *args, **kwargs):
+        community_id = self.get_community_id()
+        if not community_id:
+            return Response([])
+        data = read_through(
+            "community-members", [community_namespace(community_id)],
+            lambda: self.get_serializer(self.get_queryset(), many=True).data,
+            parts=[request_key(request)],
+        )
+        return Response(data)
+
 
 class AddCommunityMemberView(CreateAPIView):
     serializer_class = CommunityMembershipCreateSerializer
@@ -221,6 +239,14 @@ class CommunityListView(ListAPIView):
     def get_queryset(self):
         return User.objects.filter(role="community",status="active").order_by("community_name")
 
+    def list(self, request, *args, **kwargs):
+        data = read_through(
+            "community-list", [COMMUNITIES],
+            lambda: self.get_serializer(self.get_queryset(), many=True).data,
+            parts=[request_key(request)],
+        )
+        return Response(data)
+
 class CommunityDashboardView(RetrieveAPIView):
     """
     API to fetch community dashboard data.
@@ -238,38 +264,53 @@ class CommunityDashboardView(RetrieveAPIView):
             raise NotFound("Community not found.")
         return user
 
+    def retrieve(self, request, *args, **kwargs):
+        # Cached without the viewer: the owner flag is the only per-viewer field
+        community_id = self.kwargs.get("pk")
+        data = read_through(
+            "community-dashboard", [community_namespace(community_id)],
+            lambda: self.get_serializer(self.get_object()).data,
+            parts=[request_key(request), timezone.localdate()],
+        )
+        principal = get_principal(request)
+        return Response({**data, "is_community_owner": bool(principal and principal.manages(community_id))})
+
+
+ANALYTICS_WINDOWS = ("7", "30", "90", "365")
+
 
 class CommunityAnalyticsView(APIView):
     """
     Optimized API to fetch analytics for the community dashboard.
     Returns engagement metrics, member activity, and activity trends.
+    Content metrics are read from the CommunityDailyStats rollup; ?window=7|30|90|365 picks the trend length.
     """
     permission_classes = [IsCommunityAccount]
 
     def get(self, request, pk):
         community = get_object_or_404(User, id=pk, role="community")
+        window = request.query_params.get("window", "7")
+        if window not in ANALYTICS_WINDOWS:
+            return Response({"error": f"window must be one of {', '.join(ANALYTICS_WINDOWS)}."}, status=400)
+        window = int(window)
+
         now = timezone.now()
-        start_date = (now - timedelta(days=6)).date()
-        last_7_days = [start_date + timedelta(days=i) for i in range(7)]
+        start_date = timezone.localdate(now) - timedelta(days=window - 1)
+        trend_days = [start_date + timedelta(days=i) for i in range(window)]
 
-        # 1. Engagement counts (Announcements, Events, Discussions)
-        # Using a single query with subqueries or simple counts
+        # 1. Engagement counts (Announcements, Events, Posts, Discussions)
+        # All-time totals, summed from the daily rollup in a single query
         community_id = community.id
-        
-        announcements_count = Announcement.objects.filter(community_id=community_id).count()
-        events_count = Event.objects.filter(community_id=community_id).count()
-        discussions_count = DiscussionPanel.objects.filter(community_id=community_id).count()
-
-        # Member IDs for this community
-        member_ids = list(CommunityMembership.objects.filter(community_id=community_id).values_list('user_id', flat=True))
-        all_eligible_authors = member_ids + [community_id]
+        daily_stats = CommunityDailyStats.objects.filter(community_id=community_id).order_by()
 
-        # Total Posts
-        posts_count = Post.objects.filter(author_id__in=all_eligible_authors).count()
+        engagement = dict.fromkeys(ENGAGEMENT_METRICS, 0)
+        engagement.update(
+            daily_stats.filter(metric__in=ENGAGEMENT_METRICS).values_list('metric').annotate(total=Sum('count'))
+        )
+        announcements_count = engagement["announcements"]
+        events_count = engagement["events"]
+        discussions_count = engagement["discussions"]
 
-        # 1.5 Member Interactions (Comments and Reactions)
-        # Using separate queries for cleanliness and adding to trend later
-        
         # 2. Member activity (Mutually Exclusive) - Now including the community owner
         daily_limit = now - timedelta(hours=24)
         weekly_limit = now - timedelta(days=7)
@@ -283,59 +324,41 @@ class CommunityAnalyticsView(APIView):
             rare=Count('id', filter=Q(last_login__lt=weekly_limit) | Q(last_login__isnull=True))
         )
 
-        # 3. Comprehensive Performance Trend (Last 7 Days)
+        # 3. Comprehensive Performance Trend (Selected window)
         # Includes: Announcements, Events, Posts, Discussions, Comments, Reactions
-        
-        # Fetching all activity by date
-        daily_posts = Post.objects.filter(author_id__in=all_eligible_authors, created_at__date__gte=start_date).values('created_at__date').annotate(count=Count('id'))
-        daily_discussions = DiscussionPanel.objects.filter(community_id=community_id, created_at__date__gte=start_date).values('created_at__date').annotate(count=Count('id'))
-        daily_announcements = Announcement.objects.filter(community_id=community_id, created_at__date__gte=start_date).values('created_at__date').annotate(count=Count('id'))
-        daily_events = Event.objects.filter(community_id=community_id, created_at__date__gte=start_date).values('created_at__date').annotate(count=Count('id'))
-        
-        # Comments across all content
-        daily_p_comments = PostComment.objects.filter(author_id__in=all_eligible_authors, created_at__date__gte=start_date).values('created_at__date').annotate(count=Count('id'))
-        daily_d_replies = DiscussionReply.objects.filter(created_by_id__in=all_eligible_authors, created_at__date__gte=start_date).values('created_at__date').annotate(count=Count('id'))
-        
-        # Reactions across all content
-        daily_p_reactions = PostReaction.objects.filter(user_id__in=all_eligible_authors, created_at__date__gte=start_date).values('created_at__date').annotate(count=Count('id'))
-        daily_d_reactions = DiscussionReaction.objects.filter(user_id__in=all_eligible_authors, created_at__date__gte=start_date).values('created_at__date').annotate(count=Count('id'))
-
-        # Merge counts into trend array
-        trend_map = {date: 0 for date in last_7_days}
-        for qs in [daily_posts, daily_discussions, daily_announcements, daily_events, 
-                   daily_p_comments, daily_d_replies, daily_p_reactions, daily_d_reactions]:
-            for entry in qs:
-                trend_map[entry['created_at__date']] += entry['count']
-
-        posts_last_7_days = [
-            {"date": d.strftime("%Y-%m-%d"), "count": trend_map[d]} 
-            for d in last_7_days
+        # One rollup row per day and metric, so this costs the same for 7 or 365 days
+        trend_map = {day: 0 for day in trend_days}
+        trend_map.update(daily_stats.filter(day__gte=start_date).values_list('day').annotate(total=Sum('count')))
+
+        activity_trend = [
+            {"date": d.strftime("%Y-%m-%d"), "count": trend_map[d]}
+            for d in trend_days
         ]
 
-        # 4. Total Engagements (Sync with Trend Chart - Last 7 Days)
+        # 4. Total Engagements (Sync with Trend Chart)
         total_engagements = sum(trend_map.values())
 
         # 5. Global Community Comparison (Top 5 + Current)
-        # Aggregating base activity: Announcements + Events + Discussions
-        comparison = User.objects.filter(role='community', status='active').annotate(
-            a_count=Count('community_announcements', distinct=True),
-            e_count=Count('events', distinct=True),
-            d_count=Count('community_discussions', distinct=True)
-        ).annotate(
-            score=F('a_count') + F('e_count') + F('d_count')
-        ).order_by('-score')[:5]
+        # Read from the ranked leaderboard snapshot: Announcements + Events + Discussions
+        leaderboard, leaderboard_refreshed_at = get_leaderboard(community_id)
+        leaderboard_age = max(int((now - leaderboard_refreshed_at).total_seconds()), 0) if leaderboard_refreshed_at else None
 
         comparison_data = [
-            {"name": c.community_name or c.username, "score": c.score, "isCurrent": c.id == community.id}
-            for c in comparison
+            {
+                "name": entry.community.community_name or entry.community.username,
+                "score": entry.score,
+                "rank": entry.rank,
+                "isCurrent": entry.community_id == community.id
+            } for entry in leaderboard
         ]
-        
-        # Ensure current community is in the list if not in top 5
+
+        # Ensure current community is in the list even if it is not ranked yet
         if not any(c['isCurrent'] for c in comparison_data):
             current_score = announcements_count + events_count + discussions_count
             comparison_data.append({
                 "name": community.community_name or community.username,
                 "score": current_score,
+                "rank": None,
                 "isCurrent": True
             })
             # Re-sort to keep it looking nice
@@ -359,17 +382,16 @@ class CommunityAnalyticsView(APIView):
         ]
 
         return Response({
-            "engagement": {
-                "announcements": announcements_count,
-                "events": events_count,
-                "posts": posts_count,
-                "discussions": discussions_count
-            },
+            "engagement": engagement,
             "member_activity": member_activity,
             "top_members": top_members_data,
-            "posts_last_7_days": posts_last_7_days,
+            "window": window,
+            "activity_trend": activity_trend,
+            "posts_last_7_days": activity_trend[-7:],
             "total_engagements": total_engagements,
-            "comparison": comparison_data
+            "comparison": comparison_data,
+            "comparison_refreshed_at": leaderboard_refreshed_at,
+            "comparison_age_seconds": leaderboard_age
         })
 
 
@@ -395,15 +417,16 @@ class SendCommunityMessageView(APIView):
             "button_url": f"{settings.FRONTEND_URL}/community/{community.id}/dashboard"
         }
         
-        success = send_branded_email(
-            subject=f"[HCKonnect] {subject}",
-            to_email=community.email,
-            context=context
-        )
+        # The email and the notification are committed together; the outbox worker delivers the email
+        with transaction.atomic():
+            queue_branded_email(
+                subject=f"[HCKonnect] {subject}",
+                to_email=community.email,
+                context=context
+            )
 
-        if success:
             # Create a system notification for the community
-            Notification.objects.create(
+            NotificationService.create_notification(
                 recipient=community,
                 actor=request.user,
                 type='message',
@@ -415,5 +438,45 @@ class SendCommunityMessageView(APIView):
                     "subject": subject
                 }
             )
-            return Response({"message": "Message sent successfully."}, status=200)
-        return Response({"error": "Failed to send message."}, status=500)
+        return Response({"message": "Message sent successfully."}, status=200)
+
+
+class CommunityEmailBroadcastView(APIView):
+    """
+    POST queues an email to every member of the caller's community and returns at once (202);
+    the outbox worker sends it. GET lists the community's broadcasts.
+    """
+    permission_classes = [IsAuthenticated, CanCreateCommunityContent]
+
+    def get(self, request):
+        broadcasts = CommunityEmailBroadcast.objects.filter(community_id=get_principal(request).managed_community_id)
+        return Response(CommunityEmailBroadcastSerializer(broadcasts[:50], many=True).data)
+
+    def post(self, request):
+        serializer = CommunityEmailBroadcastSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        with transaction.atomic():
+            broadcast = serializer.save(community_id=get_principal(request).managed_community_id, sent_by=request.user)
+            queue_broadcast(broadcast)
+
+        return Response(
+            {**CommunityEmailBroadcastSerializer(broadcast).data, "progress_url": f"/communities/email-broadcasts/{broadcast.id}/"},
+            status=status.HTTP_202_ACCEPTED
+        )
+
+
+class CommunityEmailBroadcastProgressView(APIView):
+    """Delivery progress of a broadcast and the members it has failed for so far."""
+    permission_classes = [IsAuthenticated, CanCreateCommunityContent]
+
+    def get(self, request, pk):
+        broadcast = get_object_or_404(CommunityEmailBroadcast, pk=pk, community_id=get_principal(request).managed_community_id)
+        progress, failures = broadcast_progress(broadcast)
+        done = progress[EmailOutbox.STATUS_SENT] + progress[EmailOutbox.STATUS_FAILED]
+        return Response({
+            **CommunityEmailBroadcastSerializer(broadcast).data,
+            "progress": progress,
+            "is_complete": done == broadcast.recipient_count,
+            "failures": failures
+        })
@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class ContentsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'contents'
+
+    def ready(self):
+        from utils.counters import connect_counters
+        from utils.images import connect_image_derivatives
+        from utils.cache import connect_cache_invalidation
+        # Counters first: the feed receivers re-render cards that show them
+        connect_counters()
+        connect_image_derivatives()
+        connect_cache_invalidation()
+        import contents.signals
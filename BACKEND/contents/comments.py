@@ -0,0 +1,110 @@
+from collections import defaultdict
+from django.db.models import F, Q, Window
+from django.db.models.functions import RowNumber
+from .models import PostComment
+from utils.pagination import encode_cursor
+
+
+"""
+    Comment trees for a page of posts, loaded with one query.
+    A window per parent fetches only what a level can show, plus one row telling whether it
+    continues (with the author's membership and community for the card), however long the
+    threads are; the tree is built in memory and attached to the instances:
+        post.comment_tree / post.comments_next_cursor      newest top-level comments first
+        comment.reply_tree / comment.replies_next_cursor   replies, oldest first, on every level
+    Each level is capped; its *_next_cursor resumes it through
+    GET /contents/post/comments/list/?post_id=<post> (or ?parent_id=<comment>)&cursor=<cursor>.
+"""
+
+TOP_LEVEL_LIMIT = 10
+REPLY_LIMIT = 3
+
+COMMENT_RELATED = ("author__membership__community",)
+
+
+def _page_cursor(items, limit):
+    """Cursor after the last shown item, or None when the level fits in the limit."""
+    if len(items) <= limit:
+        return None
+    last = items[limit - 1]
+    return encode_cursor(last.created_at, last.pk)
+
+
+def _attach_replies(comment, children, reply_limit):
+    replies = children.get(comment.pk, [])
+    comment.reply_tree = replies[:reply_limit]
+    comment.replies_next_cursor = _page_cursor(replies, reply_limit)
+    for reply in comment.reply_tree:
+        _attach_replies(reply, children, reply_limit)
+
+
+def _fetch(post_ids, top_level_limit, reply_limit):
+    """
+    The posts' newest top_level_limit + 1 top-level comments and the oldest reply_limit + 1
+    replies of every comment, grouped by parent in (created_at, id) order.
+    """
+    parent = [F("post_id"), F("parent_comment_id")]
+    comments = (
+        PostComment.objects.filter(post_id__in=post_ids)
+        .annotate(
+            newest_rank=Window(RowNumber(), partition_by=parent, order_by=[F("created_at").desc(), F("id").desc()]),
+            oldest_rank=Window(RowNumber(), partition_by=parent, order_by=[F("created_at").asc(), F("id").asc()]),
+        )
+        .filter(
+            Q(parent_comment__isnull=True, newest_rank__lte=top_level_limit + 1)
+            | Q(parent_comment__isnull=False, oldest_rank__lte=reply_limit + 1)
+        )
+        .select_related(*COMMENT_RELATED)
+    )
+    children = defaultdict(list)
+    for comment in comments.order_by("created_at", "id"):
+        children[comment.parent_comment_id].append(comment)
+    return children
+
+
+def _fetch_replies(parent_ids, reply_limit):
+    """The oldest reply_limit + 1 replies of each of the given comments, grouped by parent in (created_at, id) order."""
+    replies = (
+        PostComment.objects.filter(parent_comment_id__in=parent_ids)
+        .annotate(oldest_rank=Window(RowNumber(), partition_by=[F("parent_comment_id")], order_by=[F("created_at").asc(), F("id").asc()]))
+        .filter(oldest_rank__lte=reply_limit + 1)
+        .select_related(*COMMENT_RELATED)
+    )
+    children = defaultdict(list)
+    for reply in replies.order_by("created_at", "id"):
+        children[reply.parent_comment_id].append(reply)
+    return children
+
+
+def load_comment_trees(posts, top_level_limit=TOP_LEVEL_LIMIT, reply_limit=REPLY_LIMIT):
+    """Attaches capped comment trees to every post that has none yet, in one query."""
+    posts = [post for post in posts if not hasattr(post, "comment_tree")]
+    if not posts:
+        return
+    children = _fetch([post.pk for post in posts], top_level_limit, reply_limit)
+
+    top_level = defaultdict(list)
+    for comment in reversed(children.pop(None, [])):
+        top_level[comment.post_id].append(comment)
+    for post in posts:
+        comments = top_level.get(post.pk, [])
+        post.comment_tree = comments[:top_level_limit]
+        post.comments_next_cursor = _page_cursor(comments, top_level_limit)
+        for comment in post.comment_tree:
+            _attach_replies(comment, children, reply_limit)
+
+
+def attach_reply_trees(comments, reply_limit=REPLY_LIMIT):
+    """
+    Attaches capped reply trees under already loaded comments (e.g. a "load more" page), one query
+    per shown level: only replies of the comments on the page and of their shown replies are read,
+    never the rest of the post's threads.
+    """
+    level = [comment for comment in comments if not hasattr(comment, "reply_tree")]
+    while level:
+        children = _fetch_replies([comment.pk for comment in level], reply_limit)
+        for comment in level:
+            replies = children.get(comment.pk, [])
+            comment.reply_tree = replies[:reply_limit]
+            comment.replies_next_cursor = _page_cursor(replies, reply_limit)
+        level = [reply for comment in level for reply in comment.reply_tree]
@@ -0,0 +1,337 @@
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.timesince import timesince
+
+from .models import Announcement, Post, FeedItem
+from .serializers import AnnouncementReadSerializer, PostReadSerializer, time_since_posted
+from discussion.models import DiscussionPanel
+from discussion.serializers import DiscussionReadSerializer
+from events.models import Event
+from events.serializers import EventSerializer
+from communities.models import CommunityMembership, CommunityVacancy
+from communities.serializers import CommunityVacancySerializer
+from utils.viewer import ViewerContext
+from utils.principal import get_principal
+from utils.pagination import encode_cursor, decode_cursor, after_cursor, get_cursor_page_size, cursor_page
+
+
+"""
+    Materialized feed.
+    Every object that shows up in the feed has one FeedItem row holding its card payload.
+    The rows are kept in sync by contents/signals.py, so a feed page is a single indexed
+    range scan over FeedItem after a (created_at, object_id) cursor.
+    Cards copy the names, images and communities of the people on them; saving a user or a
+    membership re-renders the cards that show that user (resync_feed_items_for_user).
+"""
+
+FEED_ORDERING = ("-created_at", "-object_id")
+DEFAULT_PAGE_SIZE = 20
+# User fields some card shows; saving other fields leaves the feed alone
+FEED_USER_FIELDS = ("username", "first_name", "last_name", "role", "community_name", "profile_image", "community_logo")
+MAX_PAGE_SIZE = 100
+
+# Relative to "now", so they are stored blank and recomputed on every read.
+RELATIVE_TIME_FIELDS = ("time_ago", "time_since_posted")
+
+
+# -----------------------
+# SOURCES
+# -----------------------
+class FeedSource:
+    """Describes how one content type is projected into FeedItem rows."""
+    type = None
+    model = None
+    serializer_class = None
+
+    def get_queryset(self):
+        return self.model.objects.all()
+
+    def is_visible(self, obj):
+        return True
+
+    def get_community_id(self, obj):
+        return getattr(obj, "community_id", None)
+
+    def get_visibility(self, obj):
+        return getattr(obj, "visibility", "public")
+
+
+class AnnouncementSource(FeedSource):
+    type = "announcement"
+    model = Announcement
+    serializer_class = AnnouncementReadSerializer
+
+    def get_queryset(self):
+        return Announcement.objects.select_related("community", "created_by_user__membership")
+
+
+class PostSource(FeedSource):
+    type = "post"
+    model = Post
+    serializer_class = PostReadSerializer
+
+    def get_queryset(self):
+        return Post.objects.select_related("author__membership__community")
+
+    def get_community_id(self, obj):
+        return None
+
+
+class DiscussionSource(FeedSource):
+    type = "discussion"
+    model = DiscussionPanel
+    serializer_class = DiscussionReadSerializer
+
+    def get_queryset(self):
+        return DiscussionPanel.objects.select_related("created_by", "community")
+
+
+class EventSource(FeedSource):
+    type = "event"
+    model = Event
+    serializer_class = EventSerializer
+
+    def get_queryset(self):
+        return Event.objects.select_related("community")
+
+
+class VacancySource(FeedSource):
+    type = "vacancy"
+    model = CommunityVacancy
+    serializer_class = CommunityVacancySerializer
+
+    def get_queryset(self):
+        return CommunityVacancy.objects.select_related("community")
+
+    def is_visible(self, obj):
+        # Only open vacancies are advertised in the feed
+        return obj.status == CommunityVacancy.STATUS_OPEN
+
+
+FEED_SOURCES = [AnnouncementSource(), PostSource(), DiscussionSource(), EventSource(), VacancySource()]
+SOURCES_BY_TYPE = {source.type: source for source in FEED_SOURCES}
+SOURCES_BY_MODEL = {source.model: source for source in FEED_SOURCES}
+
+
+# -----------------------
+# WRITE SIDE
+# -----------------------
+def _blank_relative_times(node):
+    if isinstance(node, list):
+        for child in node:
+            _blank_relative_times(child)
+    elif isinstance(node, dict):
+        for field in RELATIVE_TIME_FIELDS:
+            if field in node:
+                node[field] = None
+        for child in node.values():
+            _blank_relative_times(child)
+    return node
+
+
+def render_payload(source, obj):
+    """Viewer-neutral card for obj, normalized the same way JSONField stores it."""
+    data = source.serializer_class(obj, context={}).data
+    return _blank_relative_times(json.loads(json.dumps(data, cls=DjangoJSONEncoder)))
+
+
+def build_feed_item(source, obj):
+    return FeedItem(
+        content_type=source.type,
+        object_id=obj.pk,
+        community_id=source.get_community_id(obj),
+        visibility=source.get_visibility(obj),
+        created_at=obj.created_at,
+        payload=render_payload(source, obj),
+    )
+
+
+def sync_feed_item(instance):
+    """Creates, updates or removes the FeedItem for a saved source object."""
+    source = SOURCES_BY_MODEL[type(instance)]
+    if not source.is_visible(instance):
+        remove_feed_item(instance)
+        return
+
+    # Re-read through the source queryset so the payload sees fresh related rows
+    obj = source.get_queryset().filter(pk=instance.pk).first()
+    if obj is None:
+        remove_feed_item(instance)
+        return
+
+    item = build_feed_item(source, obj)
+    FeedItem.objects.update_or_create(
+        content_type=source.type,
+        object_id=obj.pk,
+        defaults={
+            "community_id": item.community_id,
+            "visibility": item.visibility,
+            "created_at": item.created_at,
+            "payload": item.payload,
+        },
+    )
+
+
+def refresh_feed_item(type, object_id):
+    """Re-renders an existing card after its comments, reactions, registrations etc. change."""
+    source = SOURCES_BY_TYPE[type]
+    obj = source.model.objects.filter(pk=object_id).first()
+    if obj is None:
+        FeedItem.objects.filter(content_type=type, object_id=object_id).delete()
+        return
+    sync_feed_item(obj)
+
+
+def remove_feed_item(instance):
+    source = SOURCES_BY_MODEL[type(instance)]
+    FeedItem.objects.filter(content_type=source.type, object_id=instance.pk).delete()
+
+
+def feed_objects_showing_user(user_id):
+    """
+    {type: object ids} of the stored cards that show the user: as author, commenter or
+    replier, as the uploader of an announcement, or, for a community, as the owner of the
+    object or the community of its authors.
+    """
+    authors = [user_id, *CommunityMembership.objects.filter(community_id=user_id).values_list("user_id", flat=True)]
+    showing = {
+        "post": Post.objects.filter(Q(author_id__in=authors) | Q(comments__author_id__in=authors)),
+        "announcement": Announcement.objects.filter(Q(community_id=user_id) | Q(created_by_user_id=user_id)),
+        "discussion": DiscussionPanel.objects.filter(
+            Q(created_by_id__in=authors) | Q(community_id=user_id) | Q(replies__created_by_id__in=authors)
+        ),
+        "event": Event.objects.filter(community_id=user_id),
+        "vacancy": CommunityVacancy.objects.filter(community_id=user_id),
+    }
+    return {
+        type: list(
+            FeedItem.objects.filter(content_type=type, object_id__in=objects.values("pk"))
+            .values_list("object_id", flat=True)
+        )
+        for type, objects in showing.items()
+    }
+
+
+def resync_feed_items(object_ids_by_type, batch_size=200):
+    """Re-renders the payload of existing cards; their visibility and position do not depend on who is shown."""
+    for type, object_ids in object_ids_by_type.items():
+        if not object_ids:
+            continue
+        source = SOURCES_BY_TYPE[type]
+        for obj in source.get_queryset().filter(pk__in=object_ids).iterator(chunk_size=batch_size):
+            FeedItem.objects.filter(content_type=type, object_id=obj.pk).update(payload=render_payload(source, obj))
+
+
+def resync_feed_items_for_user(user_id):
+    resync_feed_items(feed_objects_showing_user(user_id))
+
+
+# -----------------------
+# READ SIDE
+# -----------------------
+def get_feed_queryset(principal, content_type="all"):
+    visibility_filter = Q(visibility="public")
+    community_id = principal.community_id if principal else None
+    if community_id:
+        visibility_filter |= Q(community_id=community_id)
+
+    qs = FeedItem.objects.filter(visibility_filter)
+    if content_type != "all":
+        qs = qs.filter(content_type=content_type)
+    return qs
+
+
+def _fill_relative_times(node):
+    if isinstance(node, list):
+        for child in node:
+            _fill_relative_times(child)
+    elif isinstance(node, dict):
+        created_at = node.get("created_at")
+        created_at = parse_datetime(created_at) if isinstance(created_at, str) else None
+        if created_at:
+            if "time_ago" in node:
+                node["time_ago"] = timesince(created_at) + " ago"
+            if "time_since_posted" in node:
+                node["time_since_posted"] = time_since_posted(created_at)
+        for child in node.values():
+            if isinstance(child, (list, dict)):
+                _fill_relative_times(child)
+
+
+# type: (flag field on the card, top-level flag kind, nested list key, nested flag kind)
+FEED_VIEWER_FLAGS = {
+    "post": ("user_has_liked", "post_like", "comments", "comment_like"),
+    "discussion": ("user_has_liked", "topic_like", "replies", "reply_like"),
+    "event": ("is_registered", "event_registration", None, None),
+    "vacancy": ("has_applied", "vacancy_application", None, None),
+}
+
+
+def apply_viewer_state(items, user):
+    """Fills in the per-viewer flags for a whole page with one query per flag kind."""
+    viewer = ViewerContext(user)
+    if viewer.user is None:
+        return items
+
+    for type, (flag, kind, nested_key, nested_kind) in FEED_VIEWER_FLAGS.items():
+        ids = [item["id"] for item in items if item["type"] == type]
+        viewer.prime(kind, ids)
+        if nested_kind:
+            viewer.prime(nested_kind, ids)
+
+    for item in items:
+        if item["type"] not in FEED_VIEWER_FLAGS:
+            continue
+        flag, kind, nested_key, nested_kind = FEED_VIEWER_FLAGS[item["type"]]
+        item[flag] = viewer.has(kind, item["id"])
+        if not nested_key:
+            continue
+        # Comments nest their replies one level deep; discussion replies are flat
+        stack = list(item.get(nested_key) or [])
+        while stack:
+            child = stack.pop()
+            child["user_has_liked"] = viewer.has(nested_kind, child["id"], scope_id=item["id"])
+            stack.extend(child.get("replies") or [])
+    return items
+
+
+def _render_backfilled(rows):
+    """Renders, once, the empty cards of content that predates the feed (migration contents.0009)."""
+    for row in rows:
+        if row.payload:
+            continue
+        source = SOURCES_BY_TYPE[row.content_type]
+        obj = source.get_queryset().filter(pk=row.object_id).first()
+        if obj is None:
+            continue
+        row.payload = render_payload(source, obj)
+        FeedItem.objects.filter(pk=row.pk).update(payload=row.payload)
+
+
+def paginate_feed(request, content_type="all"):
+    cursor = decode_cursor(request.query_params.get("cursor"))
+    page_size = get_cursor_page_size(request, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+
+    qs = get_feed_queryset(get_principal(request), content_type)
+    if cursor:
+        qs = qs.filter(after_cursor(cursor, "object_id"))
+    rows = list(qs.order_by(*FEED_ORDERING)[:page_size + 1])
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    _render_backfilled(rows)
+
+    items = []
+    for row in rows:
+        if not row.payload:
+            continue
+        item = dict(row.payload)
+        item["type"] = row.content_type
+        items.append(item)
+    _fill_relative_times(items)
+    apply_viewer_state(items, request.user)
+
+    next_cursor = encode_cursor(rows[-1].created_at, rows[-1].object_id) if has_more else None
+    return cursor_page(request, items, next_cursor)
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from contents.models import Resource
+
+
+class Command(BaseCommand):
+    help = "Records size, extension, MIME type and content hash for resources uploaded before they were stored as columns."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="Recompute every resource with a file, not only the missing ones.")
+
+    def handle(self, *args, **options):
+        resources = Resource.objects.exclude(file="").exclude(file__isnull=True)
+        if not options["all"]:
+            resources = resources.filter(size_bytes__isnull=True)
+
+        updated = failed = 0
+        for resource in resources.order_by("pk").iterator(chunk_size=100):
+            try:
+                # One download per file, once; the read path never touches storage again
+                with resource.file.open("rb") as file:
+                    resource.set_file_metadata(file)
+            except Exception as e:
+                failed += 1
+                self.stderr.write(f"{resource.pk} ({resource.file.name}): {e}")
+                continue
+            resource.save(update_fields=["size_bytes", "extension", "mime_type", "content_hash", "updated_at"])
+            updated += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Recorded metadata for {updated} resources ({failed} failed)."))
@@ -0,0 +1,89 @@
+import json
+import logging
+import platform
+from pathlib import Path
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+from utils import benchmark
+
+BENCHMARK_DIR = Path(settings.BASE_DIR) / "benchmarks"
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks the hot endpoints for every viewer role against the seeded database, writes the "
+        "results to JSON and fails on regressions against the stored baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument("--warmup", type=int, default=3)
+        parser.add_argument("--endpoint", action="append", dest="endpoints", help="URL name to run (repeatable), default all.")
+        parser.add_argument("--role", action="append", dest="roles", choices=benchmark.ROLES, help="Viewer role to run (repeatable), default all.")
+        parser.add_argument("--output", type=Path, default=BENCHMARK_DIR / "latest.json")
+        parser.add_argument("--baseline", type=Path, default=BENCHMARK_DIR / "baseline.json")
+        parser.add_argument("--update-baseline", action="store_true", help="Store this run as the new baseline instead of comparing.")
+        parser.add_argument("--tolerance", type=float, default=benchmark.DEFAULT_TOLERANCE, help="Allowed relative slowdown and memory growth.")
+
+    def handle(self, *args, **options):
+        names = {name for name, _, _ in benchmark.ENDPOINTS}
+        unknown = set(options["endpoints"] or []) - names
+        if unknown:
+            raise CommandError(f"Unknown endpoints: {', '.join(sorted(unknown))}. Choose from {', '.join(sorted(names))}.")
+
+        targets = benchmark.find_viewers()
+        missing = [role for role, user in targets.items() if role != "anonymous" and user is None]
+        if missing:
+            raise CommandError(f"No account for {', '.join(missing)}. Load a dataset first with `manage.py seed_scale`.")
+
+        # Anonymous 401s and role 403s are expected; keep django.request from logging each one
+        request_logger = logging.getLogger("django.request")
+        level = request_logger.level
+        request_logger.setLevel(logging.ERROR)
+        try:
+            results = benchmark.run(targets, options["iterations"], options["warmup"], options["endpoints"], options["roles"])
+        finally:
+            request_logger.setLevel(level)
+        report = {
+            "meta": {
+                "created_at": timezone.now().isoformat(),
+                "iterations": options["iterations"],
+                "database": connection.vendor,
+                "python": platform.python_version(),
+                "debug": settings.DEBUG,
+                "dataset": benchmark.dataset_summary(),
+            },
+            "results": results,
+        }
+        self.print_table(results)
+        self.write(options["output"], report)
+
+        if options["update_baseline"]:
+            self.write(options["baseline"], report)
+            self.stdout.write(self.style.SUCCESS(f"Baseline updated: {options['baseline']}"))
+            return
+        if not options["baseline"].exists():
+            raise CommandError(f"No baseline at {options['baseline']}. Record one with --update-baseline.")
+
+        baseline = json.loads(options["baseline"].read_text())
+        if baseline["meta"]["dataset"] != report["meta"]["dataset"]:
+            self.stdout.write(self.style.WARNING("The baseline was recorded on a different dataset; timings may not compare."))
+        regressions = benchmark.compare(results, baseline["results"], options["tolerance"])
+        if regressions:
+            raise CommandError("Performance regressions:\n  " + "\n  ".join(regressions))
+        self.stdout.write(self.style.SUCCESS("No regressions against the baseline."))
+
+    def write(self, path, report):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n")
+
+    def print_table(self, results):
+        self.stdout.write(f"{'endpoint':<22}{'role':<16}{'status':>7}{'queries':>9}{'p50 ms':>10}{'p95 ms':>10}{'peak KiB':>10}")
+        for name, roles in results.items():
+            for role, row in roles.items():
+                self.stdout.write(
+                    f"{name:<22}{role:<16}{row['status']:>7}{row['queries']:>9}"
+                    f"{row['p50_ms']:>10.2f}{row['p95_ms']:>10.2f}{row['peak_kib']:>10.1f}"
+                )
@@ -0,0 +1,21 @@
+import time
+from django.core.management.base import BaseCommand
+from utils.images import generate_pending
+
+
+class Command(BaseCommand):
+    help = "Writes thumbnails, responsive sizes and WebP variants of uploaded images. Polls until stopped, or runs once with --once."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Process every pending image, then exit.")
+        parser.add_argument("--interval", type=float, default=10.0, help="Seconds to wait when nothing is pending.")
+
+    def handle(self, *args, **options):
+        while True:
+            generated, failed = generate_pending()
+            if generated or failed:
+                self.stdout.write(f"Generated variants for {generated} images, {failed} failed.")
+            if options["once"]:
+                break
+            time.sleep(options["interval"])
+        self.stdout.write(self.style.SUCCESS("No images pending."))
@@ -0,0 +1,71 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from contents.feed import FEED_SOURCES, build_feed_item
+from contents.models import FeedItem
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the materialized FeedItem table from the source tables, or checks it for drift with --check."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--check", action="store_true", help="Only report drift, do not write anything.")
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def expected_items(self, batch_size):
+        for source in FEED_SOURCES:
+            for obj in source.get_queryset().iterator(chunk_size=batch_size):
+                if source.is_visible(obj):
+                    yield build_feed_item(source, obj)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        if options["check"]:
+            self.check_drift(batch_size)
+        else:
+            self.rebuild(batch_size)
+
+    def rebuild(self, batch_size):
+        created = 0
+        with transaction.atomic():
+            FeedItem.objects.all().delete()
+            batch = []
+            for item in self.expected_items(batch_size):
+                batch.append(item)
+                if len(batch) >= batch_size:
+                    FeedItem.objects.bulk_create(batch)
+                    created += len(batch)
+                    batch = []
+            FeedItem.objects.bulk_create(batch)
+            created += len(batch)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt feed with {created} items."))
+
+    def check_drift(self, batch_size):
+        stored = {
+            (item.content_type, item.object_id): item
+            for item in FeedItem.objects.all().iterator(chunk_size=batch_size)
+        }
+        missing, stale = [], []
+        for expected in self.expected_items(batch_size):
+            key = (expected.content_type, expected.object_id)
+            current = stored.pop(key, None)
+            if current is None:
+                missing.append(key)
+            elif (
+                current.community_id != expected.community_id
+                or current.visibility != expected.visibility
+                or current.created_at != expected.created_at
+                or current.payload != expected.payload
+            ):
+                stale.append(key)
+        orphaned = list(stored)
+
+        for label, keys in (("missing", missing), ("stale", stale), ("orphaned", orphaned)):
+            for content_type, object_id in keys:
+                self.stdout.write(f"{label}: {content_type} {object_id}")
+
+        if missing or stale or orphaned:
+            raise CommandError(
+                f"Feed drift found: {len(missing)} missing, {len(stale)} stale, {len(orphaned)} orphaned. "
+                "Run `manage.py rebuild_feed` to repair."
+            )
+        self.stdout.write(self.style.SUCCESS("Feed is in sync with the source tables."))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+from utils.counters import recount
+
+
+class Command(BaseCommand):
+    help = "Recomputes the denormalized engagement counters from the source tables, or checks them with --check."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--check", action="store_true", help="Only report drift, do not write anything.")
+
+    def handle(self, *args, **options):
+        fix = not options["check"]
+        drift = recount(fix=fix)
+
+        for counter, rows in drift.items():
+            if rows:
+                action = "repaired" if fix else "drifted"
+                self.stdout.write(f"{counter}: {rows} rows {action}")
+
+        total = sum(drift.values())
+        if total and not fix:
+            raise CommandError(f"Counter drift found in {total} rows. Run `manage.py recount` to repair.")
+        self.stdout.write(self.style.SUCCESS("Counters are in sync." if not total else f"Repaired {total} rows."))
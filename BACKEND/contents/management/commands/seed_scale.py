@@ -0,0 +1,474 @@
+import random
+import uuid
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from itertools import accumulate
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from communities.leaderboard import refresh_leaderboard
+from communities.models import CommunityMembership, CommunityVacancy, VacancyApplication
+from communities.stats import rebuild_daily_stats
+from contents.models import Post, PostComment, PostReaction
+from discussion.models import MAX_REPLY_DEPTH, DiscussionPanel, DiscussionReply, Reaction, reply_path_segment
+from events.models import Event, EventRegistration
+from notifications.models import Notification
+from utils.counters import recount
+
+User = get_user_model()
+
+
+"""
+    Production-shaped synthetic data for load testing.
+    Every table gets its own Random seeded from (--seed, table), so the same seed and --end
+    produce the same ids, rows and timestamps, and changing one volume leaves the other tables alone.
+    Activity is Zipf-skewed: a few communities hold most members, a few users write most posts,
+    a few posts draw most comments and reactions. Rows go in with bulk_create, so the counters,
+    feed, daily stats, leaderboard and unread badges are rebuilt by the repo's repair tools at the end.
+"""
+
+WORDS = (
+    "campus club workshop meetup project deadline lab exam notes study group hackathon design "
+    "python django react security network cloud data startup pitch career internship mentor "
+    "session volunteer event weekend library seminar research team build launch review demo"
+).split()
+FIRST_NAMES = ["Aryush", "Sita", "Ram", "Anita", "Bikash", "Priya", "Nabin", "Sujata", "Rohan", "Maya", "Kiran", "Asha"]
+LAST_NAMES = ["Khatri", "Shrestha", "Sharma", "Gurung", "Thapa", "Rai", "Karki", "Adhikari", "Tamang", "Joshi"]
+EMAIL_DOMAIN = "seed.hckonnect.test"
+
+
+def zipf_weights(count, skew):
+    """Cumulative weights where rank r gets 1 / r**skew."""
+    return list(accumulate(1 / (rank + 1) ** skew for rank in range(count)))
+
+
+@contextmanager
+def keep_timestamps(*models):
+    """bulk_create would stamp every row with now(); keep the generated timestamps instead."""
+    fields = [
+        field for model in models for field in model._meta.concrete_fields
+        if getattr(field, "auto_now", False) or getattr(field, "auto_now_add", False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Generator:
+    """One table's source of randomness: ids, skewed picks and timestamps."""
+
+    def __init__(self, seed, table, start, end):
+        self.rng = random.Random(f"{seed}:{table}")
+        self.start, self.end = start, end
+
+    def id(self):
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    def ranked(self, items, skew):
+        """The items in a random popularity order, with their cumulative Zipf weights."""
+        items = list(items)
+        self.rng.shuffle(items)
+        return items, zipf_weights(len(items), skew)
+
+    def pick(self, ranked):
+        items, weights = ranked
+        return self.rng.choices(items, cum_weights=weights)[0]
+
+    def moment(self, after=None):
+        """A time between `after` (or the window start) and the end, biased towards recent activity."""
+        after = max(after or self.start, self.start)
+        return self.end - (self.end - after) * self.rng.random() ** 2
+
+    def soon_after(self, after):
+        """Follow-ups (comments, replies, registrations) cluster right after what they follow."""
+        return after + (self.end - after) * self.rng.random() ** 4
+
+    def text(self, low, high):
+        return " ".join(self.rng.choices(WORDS, k=self.rng.randint(low, high))).capitalize() + "."
+
+
+class Command(BaseCommand):
+    help = "Generates a deterministic, production-sized synthetic dataset for load testing."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--end", type=date.fromisoformat, default=None, help="Last day of generated activity (YYYY-MM-DD), default today.")
+        parser.add_argument("--days", type=int, default=365, help="How far back activity goes.")
+        parser.add_argument("--students", type=int, default=20000)
+        parser.add_argument("--communities", type=int, default=60)
+        parser.add_argument("--membership-rate", type=float, default=0.6, help="Share of students that join a community.")
+        parser.add_argument("--posts", type=int, default=50000)
+        parser.add_argument("--comments", type=int, default=200000)
+        parser.add_argument("--reactions", type=int, default=500000)
+        parser.add_argument("--discussions", type=int, default=10000)
+        parser.add_argument("--replies", type=int, default=100000)
+        parser.add_argument("--discussion-reactions", type=int, default=100000)
+        parser.add_argument("--events", type=int, default=2000)
+        parser.add_argument("--registrations", type=int, default=100000)
+        parser.add_argument("--vacancies", type=int, default=500)
+        parser.add_argument("--applications", type=int, default=20000)
+        parser.add_argument("--notifications", type=int, default=2000000)
+        parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent of every popularity distribution.")
+        parser.add_argument("--password", default="password123", help="Password of every generated account.")
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.seed = options["seed"]
+        self.skew = options["skew"]
+        self.batch_size = options["batch_size"]
+        end_day = options["end"] or datetime.now(dt_timezone.utc).date()
+        self.end = datetime.combine(end_day, time.max, tzinfo=dt_timezone.utc)
+        self.start = self.end - timedelta(days=options["days"])
+        self.prefix = f"seed{self.seed}_"
+
+        if User.objects.filter(username__startswith=self.prefix).exists():
+            raise CommandError(f"Seed {self.seed} is already loaded. Use another --seed or drop its users first.")
+
+        models = (
+            User, CommunityMembership, Post, PostComment, PostReaction, DiscussionPanel, DiscussionReply,
+            Reaction, Event, EventRegistration, CommunityVacancy, VacancyApplication, Notification,
+        )
+        with transaction.atomic(), keep_timestamps(*models):
+            self.seed_users()
+            self.seed_memberships()
+            self.seed_posts()
+            self.seed_discussions()
+            self.seed_events()
+            self.seed_vacancies()
+            self.seed_notifications()
+
+        self.stdout.write("Rebuilding derived tables...")
+        recount()
+        call_command("rebuild_feed", batch_size=self.batch_size, stdout=self.stdout)
+        rebuild_daily_stats()
+        refresh_leaderboard()
+        self.stdout.write(self.style.SUCCESS(f"Seed {self.seed} loaded."))
+
+    def generator(self, table):
+        return Generator(self.seed, table, self.start, self.end)
+
+    def insert(self, model, rows):
+        """bulk_create in batches from any iterable, so the big tables never sit in memory."""
+        created, batch = 0, []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                model.objects.bulk_create(batch)
+                created += len(batch)
+                batch = []
+        model.objects.bulk_create(batch)
+        created += len(batch)
+        self.stdout.write(f"{model._meta.label}: {created}")
+        return created
+
+    def unique_pairs(self, gen, count, left, right):
+        """Up to `count` distinct (left, right) picks; hot items repeat, so stop after a bounded number of misses."""
+        pairs = set()
+        misses = 0
+        while len(pairs) < count and misses < count * 5 + 100:
+            pair = (gen.pick(left), gen.pick(right))
+            if pair in pairs:
+                misses += 1
+            else:
+                pairs.add(pair)
+        return sorted(pairs, key=lambda pair: (str(pair[0]), str(pair[1])))
+
+    # accounts and memberships
+
+    def seed_users(self):
+        gen = self.generator("users")
+        password = make_password(self.options["password"])
+        courses = [value for value, _ in User.course_choices]
+        interests = [value for value, _ in User.interest_choices]
+        joined_from = self.start - timedelta(days=180)
+        self.students, self.communities = [], []
+
+        def users():
+            for i in range(self.options["communities"]):
+                joined = joined_from + (self.start - joined_from) * gen.rng.random()
+                user = User(
+                    id=gen.id(), username=f"{self.prefix}community{i}", email=f"{self.prefix}community{i}@{EMAIL_DOMAIN}",
+                    password=password, role="community", community_name=f"Seed {self.seed} Community {i}",
+                    community_description=gen.text(8, 30), community_tag=gen.rng.choice(WORDS),
+                    must_change_password=False, date_joined=joined, created_at=joined, updated_at=joined,
+                )
+                self.communities.append(user)
+                yield user
+            for i in range(self.options["students"]):
+                joined = joined_from + (self.end - joined_from) * gen.rng.random()
+                user = User(
+                    id=gen.id(), username=f"{self.prefix}student{i}", email=f"{self.prefix}student{i}@{EMAIL_DOMAIN}",
+                    password=password, role="student", first_name=gen.rng.choice(FIRST_NAMES), last_name=gen.rng.choice(LAST_NAMES),
+                    status="blocked" if gen.rng.random() < 0.01 else "active",
+                    course=gen.rng.choice(courses), interests=gen.rng.sample(interests, gen.rng.randint(1, 4)),
+                    university_id=f"{self.seed:03d}{i:07d}", must_change_password=False,
+                    date_joined=joined, created_at=joined, updated_at=joined,
+                )
+                self.students.append(user)
+                yield user
+
+        self.insert(User, users())
+        self.student_ids = [user.id for user in self.students]
+        self.community_ids = {user.id for user in self.communities}
+        self.everyone_ids = self.student_ids + [user.id for user in self.communities]
+        self.active_students = gen.ranked(self.student_ids, self.skew)
+        self.active_users = gen.ranked(self.everyone_ids, self.skew)
+        self.popular_communities = gen.ranked([user.id for user in self.communities], self.skew)
+
+    def seed_memberships(self):
+        gen = self.generator("memberships")
+        self.members = defaultdict(list)
+        self.community_of = {}
+        if not self.communities:
+            return
+
+        def memberships():
+            for user in self.students:
+                if gen.rng.random() >= self.options["membership_rate"]:
+                    continue
+                community_id = gen.pick(self.popular_communities)
+                members = self.members[community_id]
+                # The first two to join each community run it
+                role = "representative" if len(members) < 2 else "member"
+                members.append(user.id)
+                self.community_of[user.id] = community_id
+                joined = gen.moment(user.created_at)
+                yield CommunityMembership(id=gen.id(), user_id=user.id, community_id=community_id, role=role, created_at=joined, updated_at=joined)
+
+        self.insert(CommunityMembership, memberships())
+
+    # posts, comments and reactions
+
+    def seed_posts(self):
+        gen = self.generator("posts")
+        posts = [(gen.id(), gen.moment()) for _ in range(self.options["posts"])]
+        self.insert(Post, (
+            Post(id=id, author_id=gen.pick(self.active_users), content=gen.text(5, 60), is_pinned=gen.rng.random() < 0.01,
+                 created_at=created_at, updated_at=created_at)
+            for id, created_at in posts
+        ))
+        if not posts:
+            return
+
+        gen = self.generator("comments")
+        popular_posts = gen.ranked(posts, self.skew)
+        threads = defaultdict(list)
+        comments = []
+
+        def post_comments():
+            for _ in range(self.options["comments"]):
+                post_id, posted_at = gen.pick(popular_posts)
+                thread = threads[post_id]
+                parent_id, after = (None, posted_at)
+                if thread and gen.rng.random() < 0.35:
+                    parent_id, after = gen.rng.choice(thread)
+                id, created_at = gen.id(), gen.soon_after(after)
+                thread.append((id, created_at))
+                comments.append(id)
+                yield PostComment(id=id, post_id=post_id, parent_comment_id=parent_id, author_id=gen.pick(self.active_users),
+                                  content=gen.text(3, 30), created_at=created_at, updated_at=created_at)
+
+        self.insert(PostComment, post_comments())
+
+        gen = self.generator("post_reactions")
+        post_share = self.options["reactions"] * 3 // 4
+        liked_posts = gen.ranked([id for id, _ in posts], self.skew)
+        liked_comments = gen.ranked(comments, self.skew)
+        pairs = [(user_id, post_id, None) for user_id, post_id in self.unique_pairs(gen, post_share, self.active_users, liked_posts)]
+        if comments:
+            pairs += [(user_id, None, comment_id) for user_id, comment_id in self.unique_pairs(gen, self.options["reactions"] - post_share, self.active_users, liked_comments)]
+
+        def reactions():
+            for user_id, post_id, comment_id in pairs:
+                created_at = gen.moment()
+                yield PostReaction(id=gen.id(), user_id=user_id, post_id=post_id, comment_id=comment_id,
+                                   reaction_type=gen.rng.choice(["like", "like", "like", "love", "haha"]), created_at=created_at, updated_at=created_at)
+
+        self.insert(PostReaction, reactions())
+
+    # discussions, nested replies and reactions
+
+    def seed_discussions(self):
+        gen = self.generator("discussions")
+        topics = []
+
+        def panels():
+            for _ in range(self.options["discussions"]):
+                author_id = gen.pick(self.active_users)
+                community_id = self.community_of.get(author_id)
+                if author_id in self.community_ids:
+                    community_id = author_id
+                if community_id and gen.rng.random() < 0.5:
+                    community_id = None
+                visibility = "private" if community_id and gen.rng.random() < 0.4 else "public"
+                id, created_at = gen.id(), gen.moment()
+                topics.append((id, created_at))
+                yield DiscussionPanel(id=id, topic=gen.text(3, 10), content=gen.text(10, 80), created_by_id=author_id,
+                                      community_id=community_id, visibility=visibility, is_pinned=gen.rng.random() < 0.01,
+                                      created_at=created_at, updated_at=created_at)
+
+        self.insert(DiscussionPanel, panels())
+        if not topics:
+            return
+
+        gen = self.generator("replies")
+        popular_topics = gen.ranked(topics, self.skew)
+        threads = defaultdict(list)
+        replies = []
+
+        def topic_replies():
+            for _ in range(self.options["replies"]):
+                topic_id, opened_at = gen.pick(popular_topics)
+                thread = threads[topic_id]
+                parent = None
+                if thread and gen.rng.random() < 0.6:
+                    # Replying to a recent reply keeps some threads running deep
+                    parent = thread[-1 - min(int(gen.rng.expovariate(0.5)), len(thread) - 1)]
+                    if parent[3] >= MAX_REPLY_DEPTH:
+                        parent = None
+                parent_id, after, parent_path, parent_depth = parent or (None, opened_at, "", -1)
+                id, created_at = gen.id(), gen.soon_after(after)
+                path = parent_path + reply_path_segment(created_at, id)
+                thread.append((id, created_at, path, parent_depth + 1))
+                replies.append(id)
+                yield DiscussionReply(id=id, topic_id=topic_id, parent_reply_id=parent_id, reply_content=gen.text(3, 40),
+                                      created_by_id=gen.pick(self.active_users), path=path, depth=parent_depth + 1,
+                                      created_at=created_at, updated_at=created_at)
+
+        self.insert(DiscussionReply, topic_replies())
+
+        gen = self.generator("discussion_reactions")
+        topic_share = self.options["discussion_reactions"] // 2
+        pairs = [(user_id, topic_id, None) for user_id, topic_id in self.unique_pairs(gen, topic_share, self.active_users, gen.ranked([id for id, _ in topics], self.skew))]
+        if replies:
+            pairs += [(user_id, None, reply_id) for user_id, reply_id in self.unique_pairs(gen, self.options["discussion_reactions"] - topic_share, self.active_users, gen.ranked(replies, self.skew))]
+
+        def reactions():
+            for user_id, topic_id, reply_id in pairs:
+                created_at = gen.moment()
+                yield Reaction(id=gen.id(), user_id=user_id, topic_id=topic_id, reply_id=reply_id, created_at=created_at, updated_at=created_at)
+
+        self.insert(Reaction, reactions())
+
+    # events and registrations
+
+    def seed_events(self):
+        if not self.communities:
+            return
+        gen = self.generator("events")
+        events = []
+        today = self.end.date()
+
+        def community_events():
+            for _ in range(self.options["events"]):
+                community_id = gen.pick(self.popular_communities)
+                id, created_at = gen.id(), gen.moment()
+                day = created_at.date() + timedelta(days=gen.rng.randint(3, 60))
+                starts = gen.rng.randint(9, 18)
+                capacity = gen.rng.choice([None, 30, 50, 100, 200, 500])
+                events.append((id, created_at, day, capacity))
+                yield Event(id=id, community_id=community_id, created_by_id=community_id, title=gen.text(2, 6), description=gen.text(20, 80),
+                            date=day, start_time=time(starts), end_time=time(starts + gen.rng.randint(1, 4)),
+                            location=gen.rng.choice(["Main Hall", "Lab 2", "Auditorium", "Library", None]),
+                            format=gen.rng.choice(["On-site", "On-site", "Online", "Hybrid"]),
+                            registration_deadline=datetime.combine(day, time(8), tzinfo=dt_timezone.utc), max_participants=capacity,
+                            created_at=created_at, updated_at=created_at)
+
+        self.insert(Event, community_events())
+        if not events:
+            return
+
+        gen = self.generator("registrations")
+        by_id = {event[0]: event for event in events}
+        seats = Counter()
+        pairs = self.unique_pairs(gen, self.options["registrations"], gen.ranked(by_id, self.skew), self.active_students)
+
+        def registrations():
+            for event_id, user_id in pairs:
+                _, created_at, day, capacity = by_id[event_id]
+                if capacity and seats[event_id] >= capacity:
+                    continue
+                seats[event_id] += 1
+                registered_at = min(gen.soon_after(created_at), datetime.combine(day, time(8), tzinfo=dt_timezone.utc))
+                attendance = "NA" if day >= today else ("P" if gen.rng.random() < 0.8 else "A")
+                yield EventRegistration(id=gen.id(), event_id=event_id, user_id=user_id, attendance=attendance,
+                                        registered_at=registered_at, created_at=registered_at, updated_at=registered_at)
+
+        self.insert(EventRegistration, registrations())
+
+    # vacancies and applications
+
+    def seed_vacancies(self):
+        if not self.communities:
+            return
+        gen = self.generator("vacancies")
+        vacancies = []
+
+        def community_vacancies():
+            for _ in range(self.options["vacancies"]):
+                id, created_at = gen.id(), gen.moment()
+                deadline = created_at + timedelta(days=gen.rng.randint(7, 45))
+                status = CommunityVacancy.STATUS_CLOSED if deadline < self.end and gen.rng.random() < 0.7 else CommunityVacancy.STATUS_OPEN
+                vacancies.append((id, created_at))
+                # bulk_create skips save(), which is what normally derives is_open
+                yield CommunityVacancy(id=id, community_id=gen.pick(self.popular_communities), title=gen.text(2, 6), description=gen.text(20, 60),
+                                       deadline=deadline, status=status, is_open=status == CommunityVacancy.STATUS_OPEN,
+                                       created_at=created_at, updated_at=created_at)
+
+        self.insert(CommunityVacancy, community_vacancies())
+        if not vacancies:
+            return
+
+        gen = self.generator("applications")
+        opened = dict(vacancies)
+        pairs = self.unique_pairs(gen, self.options["applications"], self.active_students, gen.ranked(opened, self.skew))
+
+        def applications():
+            for user_id, vacancy_id in pairs:
+                applied_at = gen.soon_after(opened[vacancy_id])
+                yield VacancyApplication(id=gen.id(), user_id=user_id, vacancy_id=vacancy_id, message=gen.text(10, 50),
+                                         applied_at=applied_at, created_at=applied_at, updated_at=applied_at)
+
+        self.insert(VacancyApplication, applications())
+
+    # notifications
+
+    def seed_notifications(self):
+        gen = self.generator("notifications")
+        types = [value for value, _ in Notification.NOTIFICATION_TYPES]
+        read_before = self.end - timedelta(days=7)
+        unread = Counter()
+
+        def notifications():
+            for _ in range(self.options["notifications"]):
+                recipient_id = gen.pick(self.active_users)
+                type = gen.rng.choice(types)
+                created_at = gen.moment()
+                # Old notifications have mostly been read, the last week's mostly not
+                is_read = gen.rng.random() < (0.9 if created_at < read_before else 0.3)
+                is_deleted = gen.rng.random() < 0.02
+                if not is_read and not is_deleted:
+                    unread[recipient_id] += 1
+                yield Notification(id=gen.id(), recipient_id=recipient_id, actor_id=gen.pick(self.active_users), type=type,
+                                   title=f"New {type.replace('_', ' ')}", message=gen.text(5, 20), metadata={},
+                                   is_read=is_read, is_deleted=is_deleted, created_at=created_at, updated_at=created_at)
+
+        if self.everyone_ids:
+            self.insert(Notification, notifications())
+
+        # The badge counter NotificationService maintains, one UPDATE per distinct count
+        by_count = defaultdict(list)
+        for user_id, count in unread.items():
+            by_count[count].append(user_id)
+        for count, user_ids in by_count.items():
+            for start in range(0, len(user_ids), self.batch_size):
+                User.objects.filter(pk__in=user_ids[start:start + self.batch_size]).update(unread_notification_count=count)
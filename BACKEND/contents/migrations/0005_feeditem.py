@@ -0,0 +1,35 @@
+# Generated by Django 5.2.8 on 2026-10-18 14:55
+
+import django.core.serializers.json
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contents', '0004_announcement_announcement_feed_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedItem',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('content_type', models.CharField(choices=[('announcement', 'Announcement'), ('post', 'Post'), ('discussion', 'Discussion'), ('event', 'Event'), ('vacancy', 'Vacancy')], max_length=20)),
+                ('object_id', models.UUIDField()),
+                ('visibility', models.CharField(choices=[('public', 'Public'), ('private', 'Private')], default='public', max_length=20)),
+                ('created_at', models.DateTimeField()),
+                ('payload', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('community', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='feed_items', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-created_at', '-object_id'], name='feeditem_feed_idx')],
+                'unique_together': {('content_type', 'object_id')},
+            },
+        ),
+    ]
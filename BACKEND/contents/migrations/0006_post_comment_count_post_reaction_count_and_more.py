@@ -0,0 +1,34 @@
+# Generated by Django 5.2.8 on 2026-10-18 14:58
+
+from django.db import migrations, models
+
+
+def backfill_counters(apps, schema_editor):
+    from utils.counters import recount
+    recount(apps, models=['contents.Post', 'contents.PostComment'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contents', '0005_feeditem'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='reaction_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='postcomment',
+            name='reaction_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
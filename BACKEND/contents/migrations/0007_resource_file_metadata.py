@@ -0,0 +1,33 @@
+# Generated by Django 5.2.8 on 2026-10-18 15:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contents', '0006_post_comment_count_post_reaction_count_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resource',
+            name='content_hash',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='resource',
+            name='extension',
+            field=models.CharField(blank=True, max_length=10),
+        ),
+        migrations.AddField(
+            model_name='resource',
+            name='mime_type',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='resource',
+            name='size_bytes',
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+    ]
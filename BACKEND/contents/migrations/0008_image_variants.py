@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-18 15:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contents', '0007_resource_file_metadata'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='announcement',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,53 @@
+from django.db import migrations
+
+# (feed type, app label, model, community field or None, extra filter for what the feed shows)
+FEED_SOURCES = [
+    ("announcement", "contents", "Announcement", "community_id", {}),
+    ("post", "contents", "Post", None, {}),
+    ("discussion", "discussion", "DiscussionPanel", "community_id", {}),
+    ("event", "events", "Event", "community_id", {}),
+    ("vacancy", "communities", "CommunityVacancy", "community_id", {"status": "OPEN"}),
+]
+
+
+def backfill_feed(apps, schema_editor):
+    """
+    Creates the FeedItem rows of content that predates the materialized feed, from the historical
+    models only: position, community and visibility, with an empty payload. The feed renders an
+    empty card the first time it serves it (contents.feed.paginate_feed); `manage.py rebuild_feed`
+    renders all of them at once.
+    """
+    FeedItem = apps.get_model("contents", "FeedItem")
+    if FeedItem.objects.exists():
+        return
+    for type, app_label, model_name, community_field, filters in FEED_SOURCES:
+        model = apps.get_model(app_label, model_name)
+        has_visibility = any(field.name == "visibility" for field in model._meta.fields)
+        batch = []
+        for obj in model.objects.filter(**filters).iterator(chunk_size=1000):
+            batch.append(FeedItem(
+                content_type=type,
+                object_id=obj.pk,
+                community_id=getattr(obj, community_field) if community_field else None,
+                visibility=obj.visibility if has_visibility else "public",
+                created_at=obj.created_at,
+                payload={},
+            ))
+            if len(batch) >= 1000:
+                FeedItem.objects.bulk_create(batch)
+                batch = []
+        FeedItem.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('communities', '0016_community_email_broadcast'),
+        ('contents', '0008_image_variants'),
+        ('discussion', '0005_reply_materialized_path'),
+        ('events', '0006_image_variants'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_feed, migrations.RunPython.noop),
+    ]
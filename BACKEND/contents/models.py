@@ -2,12 +2,15 @@ from django.db import models
 from django.conf import settings
 from Base.models import BaseModel
 from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from utils.files import file_metadata, file_extension
 
 # Create your models here.
 class Announcement(BaseModel):
     title = models.CharField(max_length=255)
     description = models.TextField()
     image = models.ImageField(upload_to="announcements/", null=True, blank=True)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)  # utils/images.py
     VISIBILITY_CHOICES = [
         ("public", "Public"),
         ("private", "Private")
@@ -22,6 +25,7 @@ class Announcement(BaseModel):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [models.Index(fields=["-created_at", "-id"], name="announcement_feed_idx")]
 
     def __str__(self):
         return self.title
@@ -34,12 +38,19 @@ class Post(BaseModel):
     content = models.TextField()
     # Adding an optional image field to make it more like Facebook
     image = models.ImageField(upload_to="posts/", null=True, blank=True)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)  # utils/images.py
     
     # Logic: This only affects the author's own profile view
     is_pinned = models.BooleanField(default=False)
 
+    # Denormalized counters, maintained by utils/counters.py
+    comment_count = models.PositiveIntegerField(default=0)
+    reaction_count = models.PositiveIntegerField(default=0)
+    counter_fields = ("comment_count", "reaction_count")
+
     class Meta:
         ordering = ["-created_at"]
+        indexes = [models.Index(fields=["-created_at", "-id"], name="post_feed_idx")]
 
     def __str__(self):
         return f"Post by {self.author} at {self.created_at}"
@@ -58,6 +69,10 @@ class PostComment(BaseModel):
     content = models.TextField()
     author = models.ForeignKey(User, on_delete=models.CASCADE)
 
+    # Denormalized counter, maintained by utils/counters.py
+    reaction_count = models.PositiveIntegerField(default=0)
+    counter_fields = ("reaction_count",)
+
     def __str__(self):
         return f"Comment by {self.author} on Post {self.post.id}"
 
@@ -92,6 +107,11 @@ class Resource(BaseModel):
     title = models.CharField(max_length=255)
     description = models.TextField()
     file = models.FileField(upload_to="resources/", null=True, blank=True)
+    # Recorded from the upload (or by `manage.py backfill_resource_metadata`), never read back from storage
+    size_bytes = models.PositiveBigIntegerField(null=True, blank=True)
+    extension = models.CharField(max_length=10, blank=True)
+    mime_type = models.CharField(max_length=100, blank=True)
+    content_hash = models.CharField(max_length=64, blank=True)  # sha256
     video_url = models.URLField(null=True, blank=True)
     CATEGORY_CHOICES = [
         ("slide", "Slide"),
@@ -130,25 +150,56 @@ class Resource(BaseModel):
     def __str__(self):
         return self.title
 
+    def set_file_metadata(self, file, content_type=None):
+        """Fills the metadata columns from `file` (the upload, or the opened stored file), or clears them."""
+        if file:
+            metadata = file_metadata(file, content_type)
+        else:
+            metadata = {"size_bytes": None, "extension": "", "mime_type": "", "content_hash": ""}
+        for field, value in metadata.items():
+            setattr(self, field, value)
+
     @property
     def file_size(self):
-        try:
-            if self.file and hasattr(self.file, 'size'):
-                return self.file.size
-        except Exception:
-            pass
-        return 0
+        return self.size_bytes or 0
 
     @property
     def file_extension(self):
-        try:
-            if self.file and self.file.name:
-                ext = self.file.name.split('.')[-1].lower()
-                # If there's no dot or it's a very long string (like a path), handle it
-                if len(ext) > 10:
-                    return "file"
-                return ext
-        except Exception:
-            pass
-        return ""
+        # Derived from the name when the columns predate the backfill; still no storage call
+        return self.extension or (file_extension(self.file.name) if self.file else "")
+
+
+
+class FeedItem(BaseModel):
+    """
+    Denormalized feed row: one per object that shows up in the feed.
+    Written and removed by contents/signals.py, rebuilt by `manage.py rebuild_feed`.
+    The payload is the viewer-neutral card; viewer flags and "time ago" are filled in on read.
+    """
+    TYPE_CHOICES = [
+        ("announcement", "Announcement"),
+        ("post", "Post"),
+        ("discussion", "Discussion"),
+        ("event", "Event"),
+        ("vacancy", "Vacancy"),
+    ]
+    VISIBILITY_CHOICES = [
+        ("public", "Public"),
+        ("private", "Private")
+    ]
+
+    content_type = models.CharField(max_length=20, choices=TYPE_CHOICES)
+    object_id = models.UUIDField()
+    # Community whose members can see private items (null for posts)
+    community = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, null=True, blank=True, related_name="feed_items")
+    visibility = models.CharField(max_length=20, choices=VISIBILITY_CHOICES, default="public")
+    # Copied from the source object so the feed orders by when the content was posted
+    created_at = models.DateTimeField()
+    payload = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
 
+    class Meta:
+        unique_together = ("content_type", "object_id")
+        indexes = [models.Index(fields=["-created_at", "-object_id"], name="feeditem_feed_idx")]
+
+    def __str__(self):
+        return f"{self.content_type} {self.object_id}"
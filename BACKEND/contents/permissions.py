@@ -1,23 +1,14 @@
 from rest_framework.permissions import BasePermission
+from utils.principal import get_principal
     
 # For creation
 class CanCreateCommunityContent(BasePermission):
     message = "You do not have permission to create content for this community."
 
     def has_permission(self, request, view):
-        user = request.user
-
-        if not user or not user.is_authenticated:
-            return False
-
-        if user.role == "community":
-            return True
-
-        membership = getattr(user, "membership", None)
-        if membership and membership.role == "representative":
-            return True
-
-        return False
+        principal = get_principal(request)
+        # Community accounts and representatives of a community
+        return principal is not None and principal.managed_community_id is not None
     
 
 
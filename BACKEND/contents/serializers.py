@@ -1,12 +1,22 @@
 
-from rest_framework.serializers import ModelSerializer, ValidationError, CharField, ImageField, SerializerMethodField, IntegerField
+from rest_framework.serializers import ModelSerializer, ValidationError, CharField, SerializerMethodField, IntegerField
 from django.contrib.auth import get_user_model
 from .models import Announcement, Post, PostComment, PostReaction, Resource
 from django.utils.timesince import timesince
+from utils.viewer import ViewerFlagsListSerializer, get_viewer_context
+from utils.images import AVATAR_WIDTH, CARD_WIDTH, ResponsiveImageField, avatar_url
+from .comments import load_comment_trees, attach_reply_trees
  
 
 User = get_user_model()
 
+
+def time_since_posted(created_at):
+    time_str = timesince(created_at)
+    if "0 minutes" in time_str:
+        return "Just now"
+    return f"{time_str} ago"
+
 # announcements serializers
 
 class AnnouncementCreateSerializer(ModelSerializer):
@@ -38,13 +48,14 @@ class AnnouncementCreateSerializer(ModelSerializer):
 
 class AnnouncementReadSerializer(ModelSerializer):
     community_name = CharField(source="community.community_name", read_only=True)
-    community_logo = ImageField(source="community.community_logo", read_only=True)
+    community_logo = ResponsiveImageField("community_logo", AVATAR_WIDTH, source="community")
+    image_preview = ResponsiveImageField("image", CARD_WIDTH)
     uploaded_by = SerializerMethodField() # serializermethodfield tells that value comes from custom method in this serializer
     time_since_posted = SerializerMethodField()
 
     class Meta:
         model = Announcement
-        fields = ["id","community","title","description","image","community_name","community_logo","uploaded_by","time_since_posted","created_at","visibility"]
+        fields = ["id","community","title","description","image","image_preview","community_name","community_logo","uploaded_by","time_since_posted","created_at","visibility"]
 
     def get_uploaded_by(self, obj):
         if obj.created_by_user:
@@ -55,10 +66,7 @@ class AnnouncementReadSerializer(ModelSerializer):
 
 
     def get_time_since_posted(self, obj):
-        time_str = timesince(obj.created_at)
-        if "0 minutes" in time_str:
-            return "Just now"
-        return f"{time_str} ago"
+        return time_since_posted(obj.created_at)
 
 # Separate update to avoid changing created_At and community data.    
 class AnnouncementUpdateSerializer(ModelSerializer):
@@ -78,20 +86,26 @@ class PostCommentReadSerializer(ModelSerializer):
     author_community = SerializerMethodField()
     user_has_liked = SerializerMethodField()
     replies = SerializerMethodField()
+    replies_next_cursor = SerializerMethodField()
+    reaction_count = IntegerField(read_only=True)
+    viewer_flags = {"comment_like": "post_id"}
 
     class Meta:
         model = PostComment
-        fields = ["id", "post", "parent_comment", "content", "author", "author_name", "author_role", "author_image", "author_community", "time_ago", "user_has_liked", "replies", "created_at"]
+        fields = ["id", "post", "parent_comment", "content", "author", "author_name", "author_role", "author_image", "author_community", "time_ago", "user_has_liked", "reaction_count", "replies", "replies_next_cursor", "created_at"]
+        list_serializer_class = ViewerFlagsListSerializer
 
     def get_replies(self, obj):
-        if obj.parent_comment is None: # Only one level of nesting
-            replies = PostComment.objects.filter(parent_comment=obj)
-            return PostCommentReadSerializer(replies, many=True, context=self.context).data
-        return []
+        # Trees are attached by contents/comments.py; a lone comment loads its own
+        attach_reply_trees([obj])
+        return PostCommentReadSerializer(obj.reply_tree, many=True, context=self.context).data
+
+    def get_replies_next_cursor(self, obj):
+        attach_reply_trees([obj])
+        return obj.replies_next_cursor
 
     def get_user_has_liked(self, obj):
-        user = self.context['request'].user
-        return PostReaction.objects.filter(user=user, comment=obj).exists() if user.is_authenticated else False
+        return get_viewer_context(self.context).has("comment_like", obj.pk, scope_id=obj.post_id)
 
     def get_author_name(self, obj):
         user = obj.author
@@ -105,15 +119,7 @@ class PostCommentReadSerializer(ModelSerializer):
         return getattr(obj.author, 'role', 'student') if obj.author else 'student'
 
     def get_author_image(self, obj):
-        user = obj.author
-        if not user: return None
-        if getattr(user, 'role', '') == 'community' and getattr(user, 'community_logo', None):
-            request = self.context.get('request')
-            return request.build_absolute_uri(user.community_logo.url) if request else user.community_logo.url
-        if getattr(user, 'profile_image', None):
-            request = self.context.get('request')
-            return request.build_absolute_uri(user.profile_image.url) if request else user.profile_image.url
-        return None
+        return avatar_url(obj.author, self.context.get('request'))
 
     def get_author_community(self, obj):
         user = obj.author
@@ -127,20 +133,32 @@ class PostCommentReadSerializer(ModelSerializer):
     def get_time_ago(self, obj):
         return timesince(obj.created_at) + " ago"
     
+class PostListSerializer(ViewerFlagsListSerializer):
+    """Loads the comment trees of the whole page in one query before serializing it."""
+    def to_representation(self, data):
+        items = list(data.all() if hasattr(data, "all") else data)
+        load_comment_trees(items)
+        return super().to_representation(items)
+
+
 class PostReadSerializer(ModelSerializer):
     comments = SerializerMethodField()
-    comment_count = IntegerField(source="comments.count", read_only=True)
-    reaction_count = IntegerField(source="reactions.count", read_only=True)
+    comments_next_cursor = SerializerMethodField()
+    image_preview = ResponsiveImageField("image", CARD_WIDTH)
+    comment_count = IntegerField(read_only=True)
+    reaction_count = IntegerField(read_only=True)
     time_ago = SerializerMethodField()
     user_has_liked = SerializerMethodField()
     author_name = SerializerMethodField()
     author_role = SerializerMethodField()
     author_image = SerializerMethodField()
     author_community = SerializerMethodField()
+    viewer_flags = {"post_like": "pk", "comment_like": "pk"}
 
     class Meta:
         model = Post
-        fields = "__all__"
+        exclude = ["image_variants"]
+        list_serializer_class = PostListSerializer
 
     def get_author_name(self, obj):
         user = obj.author
@@ -154,15 +172,7 @@ class PostReadSerializer(ModelSerializer):
         return getattr(obj.author, 'role', 'student') if obj.author else 'student'
 
     def get_author_image(self, obj):
-        user = obj.author
-        if not user: return None
-        if getattr(user, 'role', '') == 'community' and getattr(user, 'community_logo', None):
-            request = self.context.get('request')
-            return request.build_absolute_uri(user.community_logo.url) if request else user.community_logo.url
-        if getattr(user, 'profile_image', None):
-            request = self.context.get('request')
-            return request.build_absolute_uri(user.profile_image.url) if request else user.profile_image.url
-        return None
+        return avatar_url(obj.author, self.context.get('request'))
 
     def get_author_community(self, obj):
         user = obj.author
@@ -174,13 +184,16 @@ class PostReadSerializer(ModelSerializer):
         return ''
 
     def get_user_has_liked(self, obj):
-        user = self.context['request'].user
-        return PostReaction.objects.filter(user=user, post=obj).exists() if user.is_authenticated else False
+        return get_viewer_context(self.context).has("post_like", obj.pk)
 
     def get_comments(self, obj):
-        # Only return top-level comments (those without a parent) - limited to 10
-        comments = obj.comments.filter(parent_comment__isnull=True).order_by("-created_at")[:10]
-        return PostCommentReadSerializer(comments, many=True, context=self.context).data
+        # Newest top-level comments with their replies, from the tree loaded for the page
+        load_comment_trees([obj])
+        return PostCommentReadSerializer(obj.comment_tree, many=True, context=self.context).data
+
+    def get_comments_next_cursor(self, obj):
+        load_comment_trees([obj])
+        return obj.comments_next_cursor
 
     def get_time_ago(self, obj):
         return timesince(obj.created_at) + " ago"
@@ -215,6 +228,11 @@ class PostReactionSerializer(ModelSerializer):
         model = PostReaction
         fields = ["id", "post", "comment", "reaction_type"]
 
+    def save(self, **kwargs):
+        # DRF's save() rejects the None that create() returns when a reaction is toggled off
+        self.instance = self.create({**self.validated_data, **kwargs})
+        return self.instance
+
     def create(self, validated_data):
         user = self.context["request"].user
         obj, created = PostReaction.objects.get_or_create(
@@ -276,11 +294,24 @@ class ResourceCreateUpdateSerializer(ModelSerializer):
         else:
             raise ValidationError("Unauthorized role.")
 
-        return Resource.objects.create(community=community, created_by_user=created_by_user, **validated_data)
+        resource = Resource(community=community, created_by_user=created_by_user, **validated_data)
+        self._record_file_metadata(resource, validated_data)
+        resource.save()
+        return resource
+
+    def update(self, instance, validated_data):
+        if "file" in validated_data:
+            self._record_file_metadata(instance, validated_data)
+        return super().update(instance, validated_data)
+
+    def _record_file_metadata(self, resource, validated_data):
+        # Read from the upload while it is still local, so listings never hit the storage API
+        upload = validated_data.get("file")
+        resource.set_file_metadata(upload, getattr(upload, "content_type", None))
 
 class ResourceReadSerializer(ModelSerializer):
     community_name = CharField(source="community.community_name", read_only=True)
-    community_logo = ImageField(source="community.community_logo", read_only=True)
+    community_logo = ResponsiveImageField("community_logo", AVATAR_WIDTH, source="community")
     author_name = SerializerMethodField()
     time_ago = SerializerMethodField()
     file_size = SerializerMethodField()
@@ -291,7 +322,7 @@ class ResourceReadSerializer(ModelSerializer):
         fields = [
             "id", "community", "title", "description", "file", "video_url",
             "community_name", "community_logo", "author_name", 
-            "time_ago", "file_size", "file_extension", "visibility", "category"
+            "time_ago", "file_size", "file_extension", "mime_type", "content_hash", "visibility", "category"
         ]
 
     def get_author_name(self, obj):
@@ -0,0 +1,105 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import receiver
+from .feed import (
+    FEED_USER_FIELDS, SOURCES_BY_MODEL, sync_feed_item, refresh_feed_item, remove_feed_item,
+    feed_objects_showing_user, resync_feed_items, resync_feed_items_for_user,
+)
+from utils.images import image_variants_ready
+
+"""
+    Keeps the materialized FeedItem table in step with the feed's source tables.
+    Saving a feed object re-renders its card, deleting it removes the card, and
+    engagement rows (comments, reactions, replies, registrations, applications)
+    re-render the card they are counted on. Users and memberships re-render the cards that
+    show the user's name, image or community.
+"""
+
+# Proxies send model signals under their own class (the admin saves communities as CommunityUser)
+USER_MODELS = ('accounts.User', 'accounts.ClaimsUser', 'accounts.CommunityUser', 'accounts.AdminManagement')
+
+# 1. Feed objects
+@receiver(post_save, sender='contents.Announcement')
+@receiver(post_save, sender='contents.Post')
+@receiver(post_save, sender='discussion.DiscussionPanel')
+@receiver(post_save, sender='events.Event')
+@receiver(post_save, sender='communities.CommunityVacancy')
+def sync_feed_on_save(sender, instance, **kwargs):
+    sync_feed_item(instance)
+
+@receiver(post_delete, sender='contents.Announcement')
+@receiver(post_delete, sender='contents.Post')
+@receiver(post_delete, sender='discussion.DiscussionPanel')
+@receiver(post_delete, sender='events.Event')
+@receiver(post_delete, sender='communities.CommunityVacancy')
+def remove_feed_on_delete(sender, instance, **kwargs):
+    remove_feed_item(instance)
+
+# 2. Posts: comments and post reactions
+@receiver(post_save, sender='contents.PostComment')
+@receiver(post_delete, sender='contents.PostComment')
+def refresh_post_on_comment(sender, instance, **kwargs):
+    refresh_feed_item("post", instance.post_id)
+
+@receiver(post_save, sender='contents.PostReaction')
+@receiver(post_delete, sender='contents.PostReaction')
+def refresh_post_on_reaction(sender, instance, **kwargs):
+    if instance.post_id:
+        refresh_feed_item("post", instance.post_id)
+
+# 3. Discussions: replies and topic reactions
+@receiver(post_save, sender='discussion.DiscussionReply')
+@receiver(post_delete, sender='discussion.DiscussionReply')
+def refresh_discussion_on_reply(sender, instance, **kwargs):
+    refresh_feed_item("discussion", instance.topic_id)
+
+@receiver(post_save, sender='discussion.Reaction')
+@receiver(post_delete, sender='discussion.Reaction')
+def refresh_discussion_on_reaction(sender, instance, **kwargs):
+    if instance.topic_id:
+        refresh_feed_item("discussion", instance.topic_id)
+
+# 4. Events and vacancies
+@receiver(post_save, sender='events.EventRegistration')
+@receiver(post_delete, sender='events.EventRegistration')
+def refresh_event_on_registration(sender, instance, **kwargs):
+    refresh_feed_item("event", instance.event_id)
+
+@receiver(post_save, sender='communities.VacancyApplication')
+@receiver(post_delete, sender='communities.VacancyApplication')
+def refresh_vacancy_on_application(sender, instance, **kwargs):
+    refresh_feed_item("vacancy", instance.vacancy_id)
+
+# 5. People shown on cards
+def resync_feed_on_user_save(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        return
+    fields = FEED_USER_FIELDS if update_fields is None else set(update_fields).intersection(FEED_USER_FIELDS)
+    if any(instance.may_have_changed(field) for field in fields):
+        resync_feed_items_for_user(instance.pk)
+
+def collect_feed_on_user_delete(sender, instance, **kwargs):
+    # Announcements outlive their uploader (SET_NULL), which sends no signal: find them first
+    instance._feed_objects_showing = feed_objects_showing_user(instance.pk)
+
+def resync_feed_on_user_delete(sender, instance, **kwargs):
+    resync_feed_items(getattr(instance, "_feed_objects_showing", {}))
+
+for model in USER_MODELS:
+    post_save.connect(resync_feed_on_user_save, sender=model, dispatch_uid=f"feed_user_save:{model}")
+    pre_delete.connect(collect_feed_on_user_delete, sender=model, dispatch_uid=f"feed_user_collect:{model}")
+    post_delete.connect(resync_feed_on_user_delete, sender=model, dispatch_uid=f"feed_user_delete:{model}")
+
+@receiver(post_save, sender='communities.CommunityMembership')
+@receiver(post_delete, sender='communities.CommunityMembership')
+def resync_feed_on_membership(sender, instance, **kwargs):
+    resync_feed_items_for_user(instance.user_id)
+
+# 6. Feed images: cards switch to the resized variants once they exist
+@receiver(image_variants_ready)
+def refresh_feed_on_image_variants(sender, instance, **kwargs):
+    if sender in SOURCES_BY_MODEL:
+        sync_feed_item(instance)
+    elif issubclass(sender, get_user_model()):
+        # Avatars and community logos on the cards that show the user
+        resync_feed_items_for_user(instance.pk)
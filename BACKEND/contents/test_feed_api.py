@@ -0,0 +1,136 @@
+from importlib import import_module
+from io import StringIO
+from django.apps import apps
+from django.test import TestCase
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.contrib.auth import get_user_model
+from contents.models import Announcement, Post, PostReaction, FeedItem
+from discussion.models import DiscussionPanel
+from communities.models import CommunityMembership, CommunityVacancy
+from accounts.models import CommunityUser
+from rest_framework.test import APIClient
+
+User = get_user_model()
+
+class FeedAPITest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+        self.community = User.objects.create_user(
+            email="comm@test.com",
+            username="testcomm",
+            password="password123",
+            role="community",
+            community_name="Test Community"
+        )
+        self.student = User.objects.create_user(
+            email="student@test.com",
+            username="teststudent",
+            password="password123",
+            role="student"
+        )
+
+        for i in range(4):
+            Announcement.objects.create(title=f"Announcement {i}", description="desc", community=self.community)
+            Post.objects.create(author=self.student, content=f"Post {i}")
+            DiscussionPanel.objects.create(topic=f"Topic {i}", created_by=self.student)
+        CommunityVacancy.objects.create(community=self.community, title="Vacancy", description="desc")
+        Announcement.objects.create(title="Members only", description="desc", visibility="private", community=self.community)
+
+    def _walk_feed(self, page_size, **params):
+        items, cursor = [], None
+        while True:
+            query = {"page_size": page_size, **params}
+            if cursor:
+                query["cursor"] = cursor
+            response = self.client.get("/contents/feed/", query)
+            self.assertEqual(response.status_code, 200)
+            items.extend(response.data["results"])
+            cursor = response.data["next_cursor"]
+            if not cursor:
+                return items
+
+    def test_cursor_walk_returns_every_item_once_in_order(self):
+        """Walking the cursor visits every public item exactly once, newest first."""
+        items = self._walk_feed(page_size=5)
+        keys = [(item["type"], str(item["id"])) for item in items]
+        self.assertEqual(len(keys), 13)
+        self.assertEqual(len(set(keys)), 13)
+        timestamps = [item["created_at"] for item in items]
+        self.assertEqual(timestamps, sorted(timestamps, reverse=True))
+
+    def test_private_announcement_only_for_its_community(self):
+        titles = [item.get("title") for item in self._walk_feed(page_size=50, type="announcement")]
+        self.assertNotIn("Members only", titles)
+
+        self.client.force_authenticate(user=self.community)
+        titles = [item.get("title") for item in self._walk_feed(page_size=50, type="announcement")]
+        self.assertIn("Members only", titles)
+
+    def test_invalid_cursor(self):
+        response = self.client.get("/contents/feed/", {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_feed_follows_deletes_and_viewer_flags(self):
+        post = Post.objects.filter(content="Post 0").get()
+        PostReaction.objects.create(user=self.student, post=post)
+        self.client.force_authenticate(user=self.student)
+
+        items = {item["id"]: item for item in self._walk_feed(page_size=50, type="post")}
+        self.assertTrue(items[str(post.id)]["user_has_liked"])
+        self.assertEqual(items[str(post.id)]["reaction_count"], 1)
+        self.assertTrue(items[str(post.id)]["time_ago"].endswith("ago"))
+
+        post.delete()
+        ids = [item["id"] for item in self._walk_feed(page_size=50, type="post")]
+        self.assertNotIn(str(post.id), ids)
+
+    def test_closed_vacancy_leaves_feed(self):
+        vacancy = CommunityVacancy.objects.get()
+        vacancy.status = CommunityVacancy.STATUS_CLOSED
+        vacancy.save()
+        self.assertEqual(self._walk_feed(page_size=50, type="vacancy"), [])
+
+    def test_rebuild_feed_repairs_drift(self):
+        call_command("rebuild_feed", "--check", stdout=StringIO())
+
+        FeedItem.objects.filter(content_type="post").first().delete()
+        FeedItem.objects.filter(content_type="announcement").update(payload={})
+        with self.assertRaises(CommandError):
+            call_command("rebuild_feed", "--check", stdout=StringIO())
+
+        call_command("rebuild_feed", stdout=StringIO())
+        call_command("rebuild_feed", "--check", stdout=StringIO())
+        self.assertEqual(len(self._walk_feed(page_size=50)), 13)
+
+    def test_cards_follow_renamed_authors_and_communities(self):
+        post = Post.objects.filter(content="Post 0").get()
+        student = User.objects.get(pk=self.student.pk)
+        student.first_name, student.last_name = "New", "Name"
+        student.save()
+        CommunityMembership.objects.create(user=self.student, community=self.community, role="member")
+
+        items = {item["id"]: item for item in self._walk_feed(page_size=50, type="post")}
+        self.assertEqual(items[str(post.id)]["author_name"], "New Name")
+        self.assertEqual(items[str(post.id)]["author_community"], "Test Community")
+
+        # The admin saves communities through a proxy model
+        community = CommunityUser.objects.get(pk=self.community.pk)
+        community.community_name = "Renamed Community"
+        community.save()
+        items = {item["id"]: item for item in self._walk_feed(page_size=50, type="post")}
+        self.assertEqual(items[str(post.id)]["author_community"], "Renamed Community")
+        call_command("rebuild_feed", "--check", stdout=StringIO())
+
+    def test_backfilled_cards_are_rendered_on_first_read(self):
+        FeedItem.objects.all().delete()
+        import_module("contents.migrations.0009_backfill_feed").backfill_feed(apps, None)
+        self.assertEqual(FeedItem.objects.filter(payload={}).count(), 14)
+
+        items = self._walk_feed(page_size=5)
+        self.assertEqual(len(items), 13)
+        self.assertTrue(all(item.get("id") for item in items))
+        self.assertFalse(FeedItem.objects.filter(visibility="public", payload={}).exists())
+        call_command("rebuild_feed", stdout=StringIO())
+        call_command("rebuild_feed", "--check", stdout=StringIO())
@@ -1,4 +1,11 @@
-from django.test import TestCase
+import hashlib
+import tempfile
+from io import StringIO
+from unittest import mock
+from django.test import TestCase, override_settings
+from django.core.files.storage import storages
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
 from django.contrib.auth import get_user_model
 from communities.models import CommunityMembership
 from contents.models import Resource
@@ -9,6 +16,17 @@ User = get_user_model()
 
 class ResourceAPITest(TestCase):
     def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        storage = override_settings(
+            MEDIA_ROOT=media.name, MEDIA_URL="/media/",
+            STORAGES={
+                "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+                "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+            },
+        )
+        storage.enable()
+        self.addCleanup(storage.disable)
         self.client = APIClient()
         
         # Create community
@@ -66,3 +84,34 @@ class ResourceAPITest(TestCase):
         """Verify that invalid community_id handles gracefully."""
         response = self.client.get("/contents/resources/?community_id=not-a-uuid")
         self.assertEqual(response.status_code, 200)
+
+    def test_file_metadata_is_stored_at_upload_and_read_without_storage_calls(self):
+        CommunityMembership.objects.create(user=self.rep, community=self.community, role="representative")
+        self.client.force_authenticate(user=self.rep)
+        content = b"%PDF-1.4 slides"
+        upload = SimpleUploadedFile("Week1.PDF", content, content_type="application/pdf")
+        response = self.client.post("/contents/resources/create/", {
+            "title": "Slides", "description": "desc", "category": "slide", "file": upload
+        }, format="multipart")
+        self.assertEqual(response.status_code, 201, response.data)
+
+        resource = Resource.objects.get(title="Slides")
+        self.assertEqual(
+            (resource.size_bytes, resource.extension, resource.mime_type, resource.content_hash),
+            (len(content), "pdf", "application/pdf", hashlib.sha256(content).hexdigest())
+        )
+
+        with mock.patch.object(type(storages["default"]), "size", side_effect=AssertionError("storage was queried")):
+            response = self.client.get("/contents/resources/")
+        item = next(r for r in response.data["results"] if r["title"] == "Slides")
+        self.assertEqual((item["file_size"], item["file_extension"]), (len(content), "pdf"))
+
+    def test_backfill_records_metadata_for_existing_files(self):
+        resource = Resource.objects.create(
+            title="Old upload", description="desc", community=self.community,
+            file=SimpleUploadedFile("notes.txt", b"hello")
+        )
+        self.assertIsNone(resource.size_bytes)
+        call_command("backfill_resource_metadata", stdout=StringIO())
+        resource.refresh_from_db()
+        self.assertEqual((resource.size_bytes, resource.extension, resource.mime_type), (5, "txt", "text/plain"))
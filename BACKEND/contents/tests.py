@@ -1,3 +1,326 @@
-from django.test import TestCase
+import json
+import os
+import tempfile
+from io import BytesIO, StringIO
+from PIL import Image
+from django.test import TestCase, override_settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from contents.models import Post, PostComment, PostReaction, FeedItem
+from contents.comments import REPLY_LIMIT, TOP_LEVEL_LIMIT, _fetch, attach_reply_trees
+from communities.models import CommunityMembership
+from utils.images import avatar_url, pending_images
+from rest_framework.test import APIClient
 
-# Create your tests here.
+User = get_user_model()
+
+class PostListViewerFlagsTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.student = User.objects.create_user(
+            email="student@test.com",
+            username="teststudent",
+            password="password123",
+            role="student"
+        )
+        self.client.force_authenticate(user=self.student)
+
+    def _add_posts(self, count):
+        for i in range(count):
+            post = Post.objects.create(author=self.student, content=f"Post {i}")
+            comment = PostComment.objects.create(post=post, author=self.student, content="Comment")
+            PostReaction.objects.create(user=self.student, post=post)
+            PostReaction.objects.create(user=self.student, comment=comment)
+
+    def _list_posts(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/contents/post-list/")
+        self.assertEqual(response.status_code, 200)
+        # Viewer lookups are the reaction queries filtered by the viewer (prefetches are not)
+        reaction_lookups = [
+            q for q in queries.captured_queries
+            if 'FROM "contents_postreaction"' in q["sql"] and "user_id" in q["sql"].split("WHERE", 1)[-1]
+        ]
+        return response.data["results"], len(reaction_lookups)
+
+    def test_viewer_flags_are_batched_per_page(self):
+        """Like flags are loaded once per page, not once per post or comment."""
+        self._add_posts(6)
+        results, reaction_lookups = self._list_posts()
+        self.assertEqual(len(results), 6)
+        self.assertTrue(all(post["user_has_liked"] for post in results))
+        self.assertTrue(all(comment["user_has_liked"] for post in results for comment in post["comments"]))
+        # One lookup for post likes, one for the likes on every comment of the page
+        self.assertEqual(reaction_lookups, 2)
+
+
+class CommentTreeLoaderTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.community = User.objects.create_user(
+            email="comm@test.com", username="testcomm", password="password123",
+            role="community", community_name="Test Community"
+        )
+        self.student = User.objects.create_user(email="student@test.com", username="student", password="password123", role="student")
+        CommunityMembership.objects.create(user=self.student, community=self.community)
+        self.client.force_authenticate(user=self.student)
+
+    def _thread(self, post, replies):
+        comment = PostComment.objects.create(post=post, author=self.student, content="Top")
+        for i in range(replies):
+            reply = PostComment.objects.create(post=post, author=self.student, parent_comment=comment, content=f"Reply {i}")
+        PostComment.objects.create(post=post, author=self.student, parent_comment=reply, content="Nested")
+        return comment
+
+    def test_comment_trees_cost_the_same_for_any_number_of_comments(self):
+        def comment_queries():
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get("/contents/post-list/")
+            self.assertEqual(response.status_code, 200)
+            return response.data["results"], [q for q in queries.captured_queries if 'FROM "contents_postcomment"' in q["sql"]]
+
+        post = Post.objects.create(author=self.student, content="Post")
+        self._thread(post, 1)
+        _, few = comment_queries()
+        for _ in range(3):
+            self._thread(Post.objects.create(author=self.student, content="Busy"), 5)
+        results, many = comment_queries()
+        self.assertEqual(len(few), 1)
+        self.assertEqual(len(many), 1)
+
+        comment = results[0]["comments"][0]
+        self.assertEqual(comment["author_community"], "Test Community")
+        self.assertEqual([reply["content"] for reply in comment["replies"]], ["Reply 0", "Reply 1", "Reply 2"])
+        self.assertIsNotNone(comment["replies_next_cursor"])
+        self.assertEqual(comment["replies"][0]["replies_next_cursor"], None)
+
+    def test_load_more_resumes_each_level_from_its_cursor(self):
+        post = Post.objects.create(author=self.student, content="Post")
+        comment = self._thread(post, 5)
+        for i in range(11):
+            PostComment.objects.create(post=post, author=self.student, content=f"Top {i}")
+
+        card = self.client.get(f"/contents/post/detail/{post.id}/").data
+        self.assertEqual(len(card["comments"]), 10)
+        older = self.client.get("/contents/post/comments/list/", {"post_id": post.id, "cursor": card["comments_next_cursor"]}).data
+        self.assertEqual([c["content"] for c in older["results"]], ["Top 0", "Top"])
+        self.assertIsNone(older["next_cursor"])
+
+        thread = older["results"][1]
+        more = self.client.get("/contents/post/comments/list/", {"parent_id": comment.id, "cursor": thread["replies_next_cursor"]}).data
+        self.assertEqual([r["content"] for r in more["results"]], ["Reply 3", "Reply 4"])
+        # The deepest level rides along with its parent
+        self.assertEqual([r["content"] for r in more["results"][1]["replies"]], ["Nested"])
+
+    def test_loading_is_bounded_per_parent_and_ids_are_checked(self):
+        post = Post.objects.create(author=self.student, content="Post")
+        comment = self._thread(post, 20)
+        for i in range(20):
+            PostComment.objects.create(post=post, author=self.student, content=f"Top {i}")
+        children = _fetch([post.pk], TOP_LEVEL_LIMIT, REPLY_LIMIT)
+        self.assertEqual(len(children[None]), TOP_LEVEL_LIMIT + 1)
+        self.assertEqual(children[None][-1].content, "Top 19")
+        self.assertEqual([c.content for c in children[comment.pk]], [f"Reply {i}" for i in range(REPLY_LIMIT + 1)])
+
+        # A page of comments only reads its own threads, one query per shown level
+        page = list(PostComment.objects.filter(pk=comment.pk))
+        with CaptureQueriesContext(connection) as queries:
+            attach_reply_trees(page)
+        self.assertEqual(len(queries), 2)
+        self.assertTrue(all('"parent_comment_id" IN' in q["sql"] for q in queries.captured_queries))
+        self.assertEqual([r.content for r in page[0].reply_tree], [f"Reply {i}" for i in range(REPLY_LIMIT)])
+
+        for params in ({"parent_id": "not-a-uuid"}, {"post_id": "not-a-uuid"}):
+            response = self.client.get("/contents/post/comments/list/", params)
+            self.assertEqual(response.status_code, 400)
+
+
+class EngagementCounterTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.student = User.objects.create_user(
+            email="student@test.com",
+            username="teststudent",
+            password="password123",
+            role="student"
+        )
+        self.post = Post.objects.create(author=self.student, content="Post")
+        self.client.force_authenticate(user=self.student)
+
+    def test_reaction_toggle_moves_counter(self):
+        self.client.post("/contents/post/react/", {"post": str(self.post.id)})
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.reaction_count, 1)
+
+        self.client.post("/contents/post/react/", {"post": str(self.post.id)})
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.reaction_count, 0)
+
+    def test_comment_delete_cascades_counters(self):
+        comment = PostComment.objects.create(post=self.post, author=self.student, content="Comment")
+        PostComment.objects.create(post=self.post, parent_comment=comment, author=self.student, content="Reply")
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 2)
+
+        comment.delete()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 0)
+
+    def test_edits_do_not_write_stale_counters_back(self):
+        loaded = Post.objects.get(pk=self.post.pk)
+        PostComment.objects.create(post=self.post, author=self.student, content="Meanwhile")
+        # A full save of the copy loaded before the comment keeps the counter it did not load
+        loaded.content = "Edited"
+        loaded.save()
+
+        self.post.refresh_from_db()
+        self.assertEqual((self.post.content, self.post.comment_count), ("Edited", 1))
+
+    def test_recount_repairs_drift(self):
+        PostComment.objects.create(post=self.post, author=self.student, content="Comment")
+        Post.objects.filter(pk=self.post.pk).update(comment_count=7)
+
+        with self.assertRaises(CommandError):
+            call_command("recount", "--check", stdout=StringIO())
+        call_command("recount", stdout=StringIO())
+
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 1)
+        call_command("recount", "--check", stdout=StringIO())
+
+
+def make_image(name, size, color="red"):
+    buffer = BytesIO()
+    Image.new("RGB", size, color).save(buffer, "PNG")
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/png")
+
+
+class ImageDerivativeTest(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.media_root = media.name
+        storage = override_settings(
+            MEDIA_ROOT=self.media_root, MEDIA_URL="/media/",
+            STORAGES={
+                "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+                "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+            },
+        )
+        storage.enable()
+        self.addCleanup(storage.disable)
+        self.student = User.objects.create_user(email="s@test.com", username="student", password="password123", role="student")
+
+    def test_variants_are_generated_off_the_request_and_served_to_cards(self):
+        post = Post.objects.create(author=self.student, content="Photo", image=make_image("photo.png", (2000, 1000)))
+        card = FeedItem.objects.get(object_id=post.pk).payload
+        self.assertEqual(card["image_preview"], post.image.url)
+        self.assertEqual(pending_images("contents.Post", "image").count(), 1)
+
+        call_command("generate_image_derivatives", "--once", stdout=StringIO())
+        post.refresh_from_db()
+        sizes = post.image_variants["sizes"]
+        self.assertEqual(
+            {name: (size["width"], size["height"]) for name, size in sizes.items()},
+            {"thumb": (160, 160), "small": (640, 320), "large": (1280, 640)}
+        )
+        webp_path = os.path.join(self.media_root, sizes["small"]["webp"][len("/media/"):])
+        with Image.open(webp_path) as webp:
+            self.assertEqual(webp.format, "WEBP")
+        self.assertTrue(sizes["thumb"]["fallback"].endswith(".jpg"))
+
+        # The stored feed card was re-rendered with the card-sized variant
+        card = FeedItem.objects.get(object_id=post.pk).payload
+        self.assertEqual(card["image_preview"], sizes["small"]["webp"])
+        self.assertFalse(pending_images("contents.Post", "image").exists())
+
+        # A new upload drops the stale variants until the worker runs again
+        post.image = make_image("other.png", (300, 300), "blue")
+        post.save()
+        self.assertEqual(post.image_variants, {})
+        self.assertEqual(FeedItem.objects.get(object_id=post.pk).payload["image_preview"], post.image.url)
+
+    def test_avatars_use_thumbnails_and_broken_files_are_not_retried(self):
+        self.student.profile_image = make_image("me.png", (800, 800))
+        self.student.save()
+        Post.objects.create(author=self.student, content="Broken", image=SimpleUploadedFile("broken.png", b"not an image"))
+
+        call_command("generate_image_derivatives", "--once", stdout=StringIO())
+        self.student.refresh_from_db()
+        self.assertTrue(avatar_url(self.student).endswith("_thumb.webp"))
+
+        broken = Post.objects.get(content="Broken")
+        self.assertIn("error", broken.image_variants)
+        # Cards showing the user switch to the thumbnail too
+        self.assertTrue(FeedItem.objects.get(object_id=broken.pk).payload["author_image"].endswith("_thumb.webp"))
+        self.assertEqual(avatar_url(None), None)
+        self.assertFalse(pending_images("contents.Post", "image").exists())
+
+
+class SeedScaleTest(TestCase):
+    VOLUMES = [
+        "--seed", "7", "--end", "2026-06-30", "--students", "40", "--communities", "4", "--posts", "30",
+        "--comments", "80", "--reactions", "120", "--discussions", "10", "--replies", "60",
+        "--discussion-reactions", "40", "--events", "6", "--registrations", "50", "--vacancies", "4",
+        "--applications", "20", "--notifications", "300", "--batch-size", "25",
+    ]
+
+    def seed(self):
+        call_command("seed_scale", *self.VOLUMES, stdout=StringIO())
+        return {
+            "posts": sorted(Post.objects.values_list("id", "created_at", "comment_count", "reaction_count")),
+            "unread": sorted(User.objects.values_list("username", "unread_notification_count")),
+        }
+
+    def test_same_seed_gives_the_same_consistent_dataset(self):
+        from discussion.models import DiscussionReply
+        from notifications.models import Notification
+
+        first = self.seed()
+        self.assertEqual(User.objects.count(), 44)
+        self.assertEqual(Notification.objects.count(), 300)
+        self.assertEqual(FeedItem.objects.filter(content_type="post").count(), 30)
+        # Counters were rebuilt from the bulk-created rows, and every reply path extends its parent's
+        call_command("recount", "--check", stdout=StringIO())
+        for reply in DiscussionReply.objects.select_related("parent_reply").filter(parent_reply__isnull=False):
+            self.assertTrue(reply.path.startswith(reply.parent_reply.path))
+            self.assertEqual(reply.depth, reply.parent_reply.depth + 1)
+
+        with self.assertRaises(CommandError):
+            call_command("seed_scale", *self.VOLUMES, stdout=StringIO())
+        User.objects.all().delete()
+        self.assertEqual(self.seed(), first)
+
+
+class BenchmarkCommandTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        call_command("seed_scale", *SeedScaleTest.VOLUMES, stdout=StringIO())
+
+    def test_run_is_recorded_and_compared_against_the_baseline(self):
+        folder = tempfile.TemporaryDirectory()
+        self.addCleanup(folder.cleanup)
+        output, baseline = os.path.join(folder.name, "latest.json"), os.path.join(folder.name, "baseline.json")
+        args = ["benchmark", "--iterations", "1", "--warmup", "0", "--output", output, "--baseline", baseline]
+
+        with self.assertRaises(CommandError):
+            call_command(*args, stdout=StringIO())
+        call_command(*args, "--update-baseline", stdout=StringIO())
+        with open(baseline) as f:
+            report = json.load(f)
+        self.assertEqual(len(report["results"]), 10)
+        feed = report["results"]["feed-list"]
+        self.assertEqual(set(feed), {"anonymous", "student", "member", "representative", "community"})
+        self.assertEqual(feed["member"]["status"], 200)
+        self.assertEqual(report["results"]["community-analytics"]["student"]["status"], 403)
+
+        # One more query than the baseline fails the run
+        feed["member"]["queries"] -= 1
+        with open(baseline, "w") as f:
+            json.dump(report, f)
+        with self.assertRaisesMessage(CommandError, "feed-list [member]"):
+            call_command(*args, "--endpoint", "feed-list", "--tolerance", "100", stdout=StringIO())
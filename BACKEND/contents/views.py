@@ -12,106 +12,25 @@ from django.contrib.auth import get_user_model
 from .permissions import CanCreateCommunityContent, CanEditContent, IsPostOwnerOrAdmin
 from .serializers import PostCommentReadSerializer, PostCommentCreateSerializer
 from rest_framework.response import Response
-from utils.pagination import StandardPagination, CommentPagination
-from discussion.models import DiscussionPanel
-from discussion.serializers import DiscussionReadSerializer
-from events.models import Event
-from events.serializers import EventSerializer
-from communities.models import CommunityVacancy
-from communities.serializers import CommunityVacancySerializer
+from utils.pagination import StandardPagination, CommentPagination, decode_cursor, after_cursor, before_cursor, get_cursor_page_size, cursor_page, encode_cursor, uuid_param
+from .comments import COMMENT_RELATED, TOP_LEVEL_LIMIT, REPLY_LIMIT, attach_reply_trees
+from .feed import paginate_feed
+from utils.principal import get_principal
+from utils.cache import ANNOUNCEMENTS, community_namespace, read_through
 
 
 User = get_user_model()
 # Create your views here.
-class FeedPagination(StandardPagination):
-    page_size = 20
-
-
 class FeedListView(GenericAPIView):
+    """
+    Merged feed of announcements, posts, discussions, events and open vacancies.
+    Cursor paginated: pass back `next_cursor` as ?cursor= to get the next page.
+    """
     permission_classes = [AllowAny]
-    pagination_class = FeedPagination
 
     def get(self, request, *args, **kwargs):
         content_type = request.query_params.get("type", "all")
-        user = request.user
-        items = []
-
-        if content_type in {"all", "announcement"}:
-            announcements_qs = Announcement.objects.filter(visibility="public")
-            if user.is_authenticated:
-                if user.role == "community":
-                    announcements_qs = announcements_qs | Announcement.objects.filter(visibility="private", community=user)
-                elif user.role == "student":
-                    membership = getattr(user, "membership", None)
-                    if membership:
-                        announcements_qs = announcements_qs | Announcement.objects.filter(
-                            visibility="private", community=membership.community
-                        )
-
-            announcements = AnnouncementReadSerializer(
-                announcements_qs.select_related("community").distinct(),
-                many=True,
-                context={"request": request},
-            ).data
-            for item in announcements:
-                item["type"] = "announcement"
-            items.extend(announcements)
-
-        if content_type in {"all", "post"}:
-            posts = PostReadSerializer(
-                Post.objects.all().select_related("author").prefetch_related("comments", "reactions"),
-                many=True,
-                context={"request": request},
-            ).data
-            for item in posts:
-                item["type"] = "post"
-            items.extend(posts)
-
-        if content_type in {"all", "discussion"}:
-            discussions_qs = DiscussionPanel.objects.all()
-            visibility_filter = Q(visibility="public")
-            if user.is_authenticated:
-                if user.role == "community":
-                    visibility_filter |= Q(community=user)
-                elif user.role == "student":
-                    membership = getattr(user, "membership", None)
-                    if membership:
-                        visibility_filter |= Q(community=membership.community)
-            discussions_qs = discussions_qs.filter(visibility_filter)
-
-            discussions = DiscussionReadSerializer(
-                discussions_qs.select_related("created_by", "community").prefetch_related("replies"),
-                many=True,
-                context={"request": request},
-            ).data
-            for item in discussions:
-                item["type"] = "discussion"
-            items.extend(discussions)
-
-        if content_type in {"all", "event"}:
-            events = EventSerializer(
-                Event.objects.all().select_related("community"),
-                many=True,
-                context={"request": request},
-            ).data
-            for item in events:
-                item["type"] = "event"
-            items.extend(events)
-
-        if content_type in {"all", "vacancy"}:
-            vacancies_qs = CommunityVacancy.objects.select_related("community").filter(status=CommunityVacancy.STATUS_OPEN)
-            vacancies = CommunityVacancySerializer(
-                vacancies_qs,
-                many=True,
-                context={"request": request},
-            ).data
-            for item in vacancies:
-                item["type"] = "vacancy"
-            items.extend(vacancies)
-
-        items.sort(key=lambda x: x.get("created_at") or "", reverse=True)
-        page = self.paginate_queryset(items)
-        return self.get_paginated_response(page)
+        return Response(paginate_feed(request, content_type))
 
 class AnnouncementCreateView(CreateAPIView):
     serializer_class = AnnouncementCreateSerializer
@@ -123,26 +42,16 @@ class AnnouncementListView(ListAPIView):
     pagination_class = StandardPagination
 
     def get_queryset(self):
-        user = self.request.user
-        
+        principal = get_principal(self.request)
+
         # fetching all announcement that is 'public'
-        queryset = Announcement.objects.filter(visibility="public")
-
-        # now go on to see if he should see private announcemnt
-        if user.is_authenticated:
-            if user.role == "community":
-                
-                private_qs = Announcement.objects.filter(visibility="private", community=user)
-                queryset = queryset | private_qs  # shows both public and private 
-            
-            elif user.role == "student":
-                
-                membership = getattr(user, 'membership', None)
-                if membership:
-                    private_qs = Announcement.objects.filter(visibility="private", community=membership.community)
-                    queryset = queryset | private_qs
-
-        queryset = queryset.select_related("community").distinct() #distinct prevents from showing duplicates if there is same post in private and public
+        query = Q(visibility="public")
+
+        # now go on to see if he should see private announcemnt: his own community's
+        if principal and principal.community_id:
+            query |= Q(visibility="private", community_id=principal.community_id)
+
+        queryset = Announcement.objects.filter(query).select_related("community", "created_by_user__membership")
         
         community_id = self.request.query_params.get("community_id")
         if community_id:
@@ -154,15 +63,16 @@ class AnnouncementStatsView(ListAPIView):
     permission_classes = [AllowAny]
     
     def get(self, request, *args, **kwargs):
-        qs = Announcement.objects.all()
         community_id = request.query_params.get("community_id")
-        if community_id:
-            qs = qs.filter(community_id=community_id)
 
-        total_announcements = qs.count()
-        return Response({
-            "total_announcements": total_announcements
-        })
+        def stats():
+            qs = Announcement.objects.all()
+            if community_id:
+                qs = qs.filter(community_id=community_id)
+            return {"total_announcements": qs.count()}
+
+        namespace = community_namespace(community_id) if community_id else ANNOUNCEMENTS
+        return Response(read_through("announcement-stats", [namespace], stats, parts=[community_id]))
 
 class AnnouncementUpdateView(UpdateAPIView):
     queryset = Announcement.objects.all()
@@ -185,7 +95,7 @@ class PostListView(ListAPIView):
  
 
     def get_queryset(self):
-        qs = Post.objects.all().select_related('author').prefetch_related('comments', 'reactions')
+        qs = Post.objects.all().select_related('author__membership__community')
         
         user_id = self.request.query_params.get('user_id')
         
@@ -197,7 +107,7 @@ class PostListView(ListAPIView):
         return qs.order_by('-created_at')
 
 class PostDetailView(RetrieveAPIView):
-    queryset = Post.objects.all()
+    queryset = Post.objects.select_related('author__membership__community')
     serializer_class = PostReadSerializer
     
 
@@ -250,11 +160,39 @@ class PostCommentListView(ListAPIView):
     pagination_class = CommentPagination
 
     def get_queryset(self):
-        post_id = self.request.query_params.get("post_id")
+        post_id = uuid_param(self.request, "post_id")
         if not post_id:
             return PostComment.objects.none()
         # Only top-level comments for the specific post
-        return PostComment.objects.filter(post_id=post_id, parent_comment__isnull=True).order_by("-created_at")
+        return PostComment.objects.filter(post_id=post_id, parent_comment__isnull=True).select_related(*COMMENT_RELATED).order_by("-created_at")
+
+    def list(self, request, *args, **kwargs):
+        # "Load more" from a comments_next_cursor / replies_next_cursor is keyset paginated
+        if "cursor" not in request.query_params and "parent_id" not in request.query_params:
+            return super().list(request, *args, **kwargs)
+
+        cursor = decode_cursor(request.query_params.get("cursor"))
+        parent_id = uuid_param(request, "parent_id")
+        if parent_id:
+            # Replies run oldest first
+            qs = PostComment.objects.filter(parent_comment_id=parent_id).order_by("created_at", "id")
+            if cursor:
+                qs = qs.filter(before_cursor(cursor))
+            page_size = get_cursor_page_size(request, REPLY_LIMIT, 50)
+        else:
+            qs = self.get_queryset().order_by("-created_at", "-id")
+            if cursor:
+                qs = qs.filter(after_cursor(cursor))
+            page_size = get_cursor_page_size(request, TOP_LEVEL_LIMIT, 50)
+
+        comments = list(qs.select_related(*COMMENT_RELATED)[:page_size + 1])
+        has_more = len(comments) > page_size
+        comments = comments[:page_size]
+        attach_reply_trees(comments)
+
+        data = self.get_serializer(comments, many=True).data
+        next_cursor = encode_cursor(comments[-1].created_at, comments[-1].pk) if has_more else None
+        return Response(cursor_page(request, data, next_cursor))
 
 # Resource Views
 
@@ -268,20 +206,14 @@ class ResourceListView(ListAPIView):
     pagination_class = StandardPagination
 
     def get_queryset(self):
-        user = self.request.user
-        
+        principal = get_principal(self.request)
+
         # Base filter: Public resources
         query = Q(visibility="public")
 
-        if user.is_authenticated:
-            if user.role == "community":
-                # Resources for this community
-                query |= Q(visibility="private", community=user)
-            elif user.role == "student":
-                # Resources for student's community
-                membership = getattr(user, 'membership', None)
-                if membership:
-                    query |= Q(visibility="private", community=membership.community)
+        # Resources of the viewer's community (its own, for a community account)
+        if principal and principal.community_id:
+            query |= Q(visibility="private", community_id=principal.community_id)
 
         queryset = Resource.objects.filter(query)
 
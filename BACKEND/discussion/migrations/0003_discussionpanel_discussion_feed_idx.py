@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-18 14:52
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('discussion', '0002_remove_discussionpanel_tags_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='discussionpanel',
+            index=models.Index(fields=['-created_at', '-id'], name='discussion_feed_idx'),
+        ),
+    ]
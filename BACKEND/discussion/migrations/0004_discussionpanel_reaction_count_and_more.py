@@ -0,0 +1,29 @@
+# Generated by Django 5.2.8 on 2026-10-18 14:58
+
+from django.db import migrations, models
+
+
+def backfill_counters(apps, schema_editor):
+    from utils.counters import recount
+    recount(apps, models=['discussion.DiscussionPanel'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('discussion', '0003_discussionpanel_discussion_feed_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='discussionpanel',
+            name='reaction_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='discussionpanel',
+            name='reply_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
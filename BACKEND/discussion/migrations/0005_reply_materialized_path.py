@@ -0,0 +1,59 @@
+# Generated by Django 5.2.8 on 2026-10-18 15:25
+
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from django.conf import settings
+from django.db import migrations, models
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+# Copied from discussion.models as of this migration, so later changes there cannot alter it
+def reply_path_segment(moment, id):
+    """14 hex digits of microseconds since the epoch, then 12 of the reply's id as a tie breaker."""
+    micros = (moment - EPOCH) // timedelta(microseconds=1)
+    return f"{micros:014x}{id.hex[:12]}"
+
+
+def backfill_reply_paths(apps, schema_editor):
+    """Walks every topic's reply tree from the roots down, so each parent has its path first."""
+    DiscussionReply = apps.get_model("discussion", "DiscussionReply")
+    children = defaultdict(list)
+    for id, parent_id, created_at in DiscussionReply.objects.values_list("id", "parent_reply_id", "created_at").iterator():
+        children[parent_id].append((id, created_at))
+
+    updated = []
+    stack = [(None, "", -1)]
+    while stack:
+        parent_id, parent_path, parent_depth = stack.pop()
+        for id, created_at in children.get(parent_id, []):
+            path = parent_path + reply_path_segment(created_at, id)
+            updated.append(DiscussionReply(id=id, path=path, depth=parent_depth + 1))
+            stack.append((id, path, parent_depth + 1))
+    DiscussionReply.objects.bulk_update(updated, ["path", "depth"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('discussion', '0004_discussionpanel_reaction_count_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='discussionreply',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='discussionreply',
+            name='path',
+            field=models.CharField(default='', editable=False, max_length=806),
+        ),
+        migrations.RunPython(backfill_reply_paths, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='discussionreply',
+            index=models.Index(fields=['topic', 'path'], name='reply_thread_idx'),
+        ),
+    ]
@@ -1,5 +1,7 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 from Base.models import BaseModel
 from django.core.exceptions import ValidationError
 
@@ -25,8 +27,15 @@ class DiscussionPanel(BaseModel):
 
 
     is_pinned = models.BooleanField(default=False)
+
+    # Denormalized counters, maintained by utils/counters.py
+    reply_count = models.PositiveIntegerField(default=0)
+    reaction_count = models.PositiveIntegerField(default=0)
+    counter_fields = ("reply_count", "reaction_count")
+
     class Meta:
         ordering = ["-created_at"]
+        indexes = [models.Index(fields=["-created_at", "-id"], name="discussion_feed_idx")]
 
 
 
@@ -35,6 +44,25 @@ class DiscussionPanel(BaseModel):
     
 
 
+# Materialized path of a reply: one fixed-width hex segment per level, root first.
+# Hex only, so paths sort the same under any collation: ordering a topic's replies by path is a
+# depth-first walk with siblings oldest first, and a subtree is the range [path, path + "g").
+PATH_SEGMENT_LENGTH = 26
+MAX_REPLY_DEPTH = 30
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def reply_path_segment(moment, id):
+    """14 hex digits of microseconds since the epoch, then 12 of the reply's id as a tie breaker."""
+    micros = (moment - EPOCH) // timedelta(microseconds=1)
+    return f"{micros:014x}{id.hex[:12]}"
+
+
+def subtree_range(path):
+    """Filter for a reply's subtree (itself included) as an indexable range instead of a LIKE."""
+    return models.Q(path__gte=path, path__lt=path + "g")
+
+
 class DiscussionReply(BaseModel):
     topic = models.ForeignKey(DiscussionPanel, on_delete=models.CASCADE, related_name="replies")
 
@@ -42,7 +70,22 @@ class DiscussionReply(BaseModel):
 
     reply_content = models.TextField()
     created_by = models.ForeignKey(User, on_delete=models.CASCADE)
-    
+
+    # Set once on insert; a reply never moves to another parent
+    path = models.CharField(max_length=PATH_SEGMENT_LENGTH * (MAX_REPLY_DEPTH + 1), default="", editable=False)
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
+
+    class Meta:
+        indexes = [models.Index(fields=["topic", "path"], name="reply_thread_idx")]
+
+    def save(self, *args, **kwargs):
+        if not self.path:
+            parent = self.parent_reply
+            segment = reply_path_segment(timezone.now(), self.id)
+            self.path = (parent.path if parent else "") + segment
+            self.depth = parent.depth + 1 if parent else 0
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"Reply by {self.created_by} on {self.topic.topic}"
 
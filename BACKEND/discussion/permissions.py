@@ -1,4 +1,5 @@
 from rest_framework.permissions import BasePermission
+from utils.principal import get_principal
 
 
 class CanCreateDiscussion(BasePermission):
@@ -17,14 +18,8 @@ class CanCreateDiscussion(BasePermission):
 
         # PRIVATE → only community, representative, or member
         if visibility == "private":
-            community_id = request.data.get("community")
-
-            if user.role in ["community", "admin"]:
-                return str(user.id) == str(community_id)
-
-            membership = getattr(user, "membership", None)
-            if membership and membership.role in ["representative", "member"]:
-                return str(membership.community_id) == str(community_id)
+            principal = get_principal(request)
+            return principal.belongs_to(request.data.get("community"))
 
 
         return False
@@ -47,14 +42,7 @@ class CanAccessDiscussion(BasePermission):
             return True
 
         # private → must belong to same community
-        if user.role in ["community", "admin"]:
-            return topic.community_id == user.id
-
-        membership = getattr(user, "membership", None)
-        if membership:
-            return membership.community_id == topic.community_id
-
-        return False
+        return get_principal(request).belongs_to(topic.community_id)
 
 
 
@@ -1,8 +1,28 @@
+from django.db.models import Prefetch
 from rest_framework import serializers
-from .models import DiscussionPanel, DiscussionReply, Reaction
+from .models import DiscussionPanel, DiscussionReply, Reaction, MAX_REPLY_DEPTH
 from django.utils.timesince import timesince
+from utils.viewer import ViewerFlagsListSerializer, get_viewer_context
+from utils.images import avatar_url
 
 
+# Latest top-level replies shown under each topic card
+REPLY_PREVIEW_LIMIT = 10
+REPLY_RELATED = ("created_by__membership__community",)
+
+
+def latest_replies_prefetch():
+    """
+    Prefetches the REPLY_PREVIEW_LIMIT latest top-level replies of every topic into
+    `topic.latest_replies`. The slice makes Django filter on ROW_NUMBER() OVER
+    (PARTITION BY topic_id ORDER BY created_at DESC), so one query covers the whole page.
+    """
+    replies = (
+        DiscussionReply.objects.filter(parent_reply__isnull=True)
+        .select_related(*REPLY_RELATED)
+        .order_by("-created_at", "-id")
+    )
+    return Prefetch("replies", queryset=replies[:REPLY_PREVIEW_LIMIT], to_attr="latest_replies")
 
 
 
@@ -36,16 +56,15 @@ class ReplyReadSerializer(serializers.ModelSerializer):
     author_image = serializers.SerializerMethodField()
     author_community = serializers.SerializerMethodField()
     user_has_liked = serializers.SerializerMethodField()
+    viewer_flags = {"reply_like": "topic_id"}
 
     class Meta:
         model = DiscussionReply
-        fields = "__all__"
+        exclude = ["path"]
+        list_serializer_class = ViewerFlagsListSerializer
 
     def get_user_has_liked(self, obj):
-        user = self.context['request'].user
-        if user.is_authenticated:
-            return Reaction.objects.filter(user=user, reply=obj).exists()
-        return False
+        return get_viewer_context(self.context).has("reply_like", obj.pk, scope_id=obj.topic_id)
 
     def get_author_name(self, obj):
         user = obj.created_by
@@ -59,14 +78,7 @@ class ReplyReadSerializer(serializers.ModelSerializer):
         return getattr(obj.created_by, 'role', 'student') if obj.created_by else 'student'
 
     def get_author_image(self, obj):
-        user = obj.created_by
-        if not user: return None
-        request = self.context.get('request')
-        if getattr(user, 'role', '') == 'community' and getattr(user, 'community_logo', None):
-            return request.build_absolute_uri(user.community_logo.url) if request else user.community_logo.url
-        if getattr(user, 'profile_image', None):
-            return request.build_absolute_uri(user.profile_image.url) if request else user.profile_image.url
-        return None
+        return avatar_url(obj.created_by, self.context.get('request'))
 
     def get_author_community(self, obj):
         user = obj.created_by
@@ -83,8 +95,8 @@ class ReplyReadSerializer(serializers.ModelSerializer):
 
 class DiscussionReadSerializer(serializers.ModelSerializer):
     replies = serializers.SerializerMethodField()
-    reply_count = serializers.IntegerField(source="replies.count", read_only=True)
-    reaction_count = serializers.IntegerField(source="reactions.count", read_only=True)
+    reply_count = serializers.IntegerField(read_only=True)
+    reaction_count = serializers.IntegerField(read_only=True)
     time_ago = serializers.SerializerMethodField()
     user_has_liked = serializers.SerializerMethodField()
     
@@ -93,10 +105,12 @@ class DiscussionReadSerializer(serializers.ModelSerializer):
     author_image = serializers.SerializerMethodField()
     author_community = serializers.SerializerMethodField()
     community_name = serializers.CharField(source="community.community_name", read_only=True)
+    viewer_flags = {"topic_like": "pk", "reply_like": "pk"}
 
     class Meta:
         model = DiscussionPanel
         fields = "__all__"
+        list_serializer_class = ViewerFlagsListSerializer
 
     def get_author_name(self, obj):
         user = obj.created_by
@@ -110,14 +124,7 @@ class DiscussionReadSerializer(serializers.ModelSerializer):
         return getattr(obj.created_by, 'role', 'student') if obj.created_by else 'student'
 
     def get_author_image(self, obj):
-        user = obj.created_by
-        if not user: return None
-        request = self.context.get('request')
-        if getattr(user, 'role', '') == 'community' and getattr(user, 'community_logo', None):
-            return request.build_absolute_uri(user.community_logo.url) if request else user.community_logo.url
-        if getattr(user, 'profile_image', None):
-            return request.build_absolute_uri(user.profile_image.url) if request else user.profile_image.url
-        return None
+        return avatar_url(obj.created_by, self.context.get('request'))
 
     def get_author_community(self, obj):
         user = obj.created_by
@@ -129,10 +136,7 @@ class DiscussionReadSerializer(serializers.ModelSerializer):
         return ''
 
     def get_user_has_liked(self, obj):
-        user = self.context['request'].user
-        if user.is_authenticated:
-            return Reaction.objects.filter(user=user, topic=obj).exists()
-        return False
+        return get_viewer_context(self.context).has("topic_like", obj.pk)
 
     def get_time_ago(self, obj):
         if not obj.created_at:
@@ -140,7 +144,13 @@ class DiscussionReadSerializer(serializers.ModelSerializer):
         return timesince(obj.created_at) + " ago"
 
     def get_replies(self, obj):
-        replies = obj.replies.filter(parent_reply__isnull=True).order_by("-created_at")[:10]
+        replies = getattr(obj, "latest_replies", None)
+        if replies is None:
+            replies = (
+                obj.replies.filter(parent_reply__isnull=True)
+                .select_related(*REPLY_RELATED)
+                .order_by("-created_at", "-id")[:REPLY_PREVIEW_LIMIT]
+            )
         return ReplyReadSerializer(replies, many=True, context=self.context).data
 
 
@@ -161,10 +171,25 @@ class ReplyCreateSerializer(serializers.ModelSerializer):
         model = DiscussionReply
         fields = ["id", "topic", "parent_reply", "reply_content"]
 
+    def validate(self, data):
+        parent = data.get("parent_reply")
+        if parent and not self.instance:
+            if parent.topic_id != data["topic"].id:
+                raise serializers.ValidationError({"parent_reply": "The parent reply belongs to another discussion."})
+            if parent.depth >= MAX_REPLY_DEPTH:
+                raise serializers.ValidationError({"parent_reply": "This thread is nested too deeply to reply to."})
+        return data
+
     def create(self, validated_data):
         validated_data["created_by"] = self.context["request"].user
         return super().create(validated_data)
 
+    def update(self, instance, validated_data):
+        # A reply's place in the thread (its materialized path) is fixed once created
+        validated_data.pop("topic", None)
+        validated_data.pop("parent_reply", None)
+        return super().update(instance, validated_data)
+
 
 # -----------------------
 # REACTION (toggle)
@@ -174,6 +199,11 @@ class ReactionSerializer(serializers.ModelSerializer):
         model = Reaction
         fields = ["id", "topic", "reply"]
 
+    def save(self, **kwargs):
+        # DRF's save() rejects the None that create() returns when a reaction is toggled off
+        self.instance = self.create({**self.validated_data, **kwargs})
+        return self.instance
+
     def create(self, validated_data):
         user = self.context["request"].user
 
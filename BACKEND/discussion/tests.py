@@ -1,3 +1,117 @@
+from importlib import import_module
+from django.apps import apps
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from .models import DiscussionPanel, DiscussionReply
 
-# Create your tests here.
+User = get_user_model()
+
+
+class ReplyThreadTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.student = User.objects.create_user(email="student@test.com", username="student", password="password123", role="student")
+        self.client.force_authenticate(user=self.student)
+        self.topic = DiscussionPanel.objects.create(topic="Topic", created_by=self.student)
+
+    def _reply(self, content, parent=None):
+        response = self.client.post("/discussions/replies/create/", {
+            "topic": self.topic.id, "reply_content": content, **({"parent_reply": parent.id} if parent else {})
+        })
+        self.assertEqual(response.status_code, 201, response.data)
+        return DiscussionReply.objects.get(pk=response.data["id"])
+
+    def _thread(self, **params):
+        response = self.client.get("/discussions/replies/thread/", params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data
+
+    def _build(self):
+        a = self._reply("A")
+        a1 = self._reply("A1", a)
+        self._reply("A1a", a1)
+        self._reply("A2", a)
+        b = self._reply("B")
+        self._reply("B1", b)
+        return a, a1
+
+    def test_thread_and_subtrees_come_back_depth_first(self):
+        a, a1 = self._build()
+        data = self._thread(topic_id=self.topic.id)
+        self.assertEqual(
+            [(r["reply_content"], r["depth"]) for r in data["results"]],
+            [("A", 0), ("A1", 1), ("A1a", 2), ("A2", 1), ("B", 0), ("B1", 1)]
+        )
+        self.assertEqual([r["reply_content"] for r in self._thread(reply_id=a.id)["results"]], ["A", "A1", "A1a", "A2"])
+        self.assertEqual([r["reply_content"] for r in self._thread(reply_id=a.id, max_depth=1)["results"]], ["A", "A1", "A2"])
+        self.assertEqual([r["reply_content"] for r in self._thread(topic_id=self.topic.id, max_depth=0)["results"]], ["A", "B"])
+
+        # Cursor pages continue the same walk
+        walked, cursor = [], None
+        while True:
+            page = self._thread(topic_id=self.topic.id, page_size=4, **({"cursor": cursor} if cursor else {}))
+            walked += [r["reply_content"] for r in page["results"]]
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+        self.assertEqual(walked, ["A", "A1", "A1a", "A2", "B", "B1"])
+        self.assertEqual(self.client.get("/discussions/replies/thread/", {"topic_id": self.topic.id, "cursor": "x/"}).status_code, 400)
+
+    def test_parent_must_be_in_the_same_topic(self):
+        other = DiscussionPanel.objects.create(topic="Other", created_by=self.student)
+        foreign = DiscussionReply.objects.create(topic=other, created_by=self.student, reply_content="Elsewhere")
+        response = self.client.post("/discussions/replies/create/", {
+            "topic": self.topic.id, "reply_content": "Hi", "parent_reply": foreign.id
+        })
+        self.assertEqual(response.status_code, 400)
+
+    def test_migration_backfills_paths_of_existing_replies(self):
+        a, a1 = self._build()
+        expected = dict(DiscussionReply.objects.values_list("id", "depth"))
+        DiscussionReply.objects.update(path="", depth=0)
+
+        migration = import_module("discussion.migrations.0005_reply_materialized_path")
+        migration.backfill_reply_paths(apps, None)
+        self.assertEqual(dict(DiscussionReply.objects.values_list("id", "depth")), expected)
+        ordered = DiscussionReply.objects.filter(topic=self.topic).order_by("path").values_list("reply_content", flat=True)
+        self.assertEqual(list(ordered), ["A", "A1", "A1a", "A2", "B", "B1"])
+
+
+class LatestRepliesPrefetchTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.student = User.objects.create_user(email="student@test.com", username="student", password="password123", role="student")
+        self.client.force_authenticate(user=self.student)
+
+    def _topic(self, replies):
+        topic = DiscussionPanel.objects.create(topic=f"Topic {replies}", created_by=self.student)
+        for i in range(replies):
+            reply = DiscussionReply.objects.create(topic=topic, created_by=self.student, reply_content=f"Reply {i}")
+        DiscussionReply.objects.create(topic=topic, created_by=self.student, parent_reply=reply, reply_content="Nested")
+        return topic
+
+    def _list(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/discussions/list/")
+        self.assertEqual(response.status_code, 200)
+        reply_queries = [q for q in queries.captured_queries if 'FROM "discussion_discussionreply"' in q["sql"]]
+        return response.data["results"], reply_queries
+
+    def test_one_windowed_query_loads_the_latest_replies_of_the_page(self):
+        self._topic(2)
+        _, few = self._list()
+        for count in (12, 4, 15):
+            self._topic(count)
+        results, many = self._list()
+
+        self.assertEqual(len(few), 1)
+        self.assertEqual(len(many), 1)
+        self.assertIn("ROW_NUMBER", many[0]["sql"])
+
+        replies = {topic["topic"]: [r["reply_content"] for r in topic["replies"]] for topic in results}
+        self.assertEqual(replies["Topic 12"], [f"Reply {i}" for i in range(11, 1, -1)])
+        self.assertEqual(replies["Topic 4"], ["Reply 3", "Reply 2", "Reply 1", "Reply 0"])
+        self.assertEqual(len(replies["Topic 15"]), 10)
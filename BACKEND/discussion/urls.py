@@ -4,18 +4,19 @@ from .views import *
 urlpatterns = [
 
     # discussions
-    path("list/", DiscussionListView.as_view()),
-    path("create/", DiscussionCreateView.as_view()),
-    path("discussion-detail/<uuid:pk>/", DiscussionDetailView.as_view()),
-    path("<uuid:pk>/update/", DiscussionUpdateView.as_view()),
-    path("<uuid:pk>/delete/", DiscussionDeleteView.as_view()),
+    path("list/", DiscussionListView.as_view(), name="discussion-list"),
+    path("create/", DiscussionCreateView.as_view(), name="discussion-create"),
+    path("discussion-detail/<uuid:pk>/", DiscussionDetailView.as_view(), name="discussion-detail"),
+    path("<uuid:pk>/update/", DiscussionUpdateView.as_view(), name="discussion-update"),
+    path("<uuid:pk>/delete/", DiscussionDeleteView.as_view(), name="discussion-delete"),
 
     # replies
     path("replies/list/", ReplyListView.as_view(), name="reply-list"),
-    path("replies/create/", ReplyCreateView.as_view()),
-    path("replies/<uuid:pk>/update/", ReplyUpdateView.as_view()),
-    path("replies/<uuid:pk>/delete/", ReplyDeleteView.as_view()),
+    path("replies/thread/", ReplyThreadView.as_view(), name="reply-thread"),
+    path("replies/create/", ReplyCreateView.as_view(), name="reply-create"),
+    path("replies/<uuid:pk>/update/", ReplyUpdateView.as_view(), name="reply-update"),
+    path("replies/<uuid:pk>/delete/", ReplyDeleteView.as_view(), name="reply-delete"),
 
     # reactions
-    path("reactions/", ReactionCreateView.as_view()),
+    path("reactions/", ReactionCreateView.as_view(), name="discussion-react"),
 ]
@@ -1,14 +1,17 @@
-from rest_framework.generics import CreateAPIView,ListAPIView,RetrieveAPIView,UpdateAPIView,DestroyAPIView,ListCreateAPIView
+from rest_framework.generics import CreateAPIView,ListAPIView,RetrieveAPIView,UpdateAPIView,DestroyAPIView,ListCreateAPIView,get_object_or_404
 from rest_framework.response import Response
 
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.exceptions import PermissionDenied
-from django.db.models import Prefetch, Q
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.views import APIView
+import re
+from django.db.models import Q
 
-from .models import DiscussionPanel, DiscussionReply, Reaction
-from .serializers import DiscussionCreateSerializer,DiscussionReadSerializer,DiscussionUpdateSerializer,ReplyCreateSerializer,ReactionSerializer
+from .models import DiscussionPanel, DiscussionReply, Reaction, subtree_range
+from .serializers import DiscussionCreateSerializer,DiscussionReadSerializer,DiscussionUpdateSerializer,ReplyCreateSerializer,ReplyReadSerializer,ReactionSerializer,latest_replies_prefetch
 from .permissions import CanCreateDiscussion, CanAccessDiscussion, IsOwner
-from utils.pagination import StandardPagination, CommentPagination
+from utils.pagination import StandardPagination, CommentPagination, get_cursor_page_size, cursor_page
+from utils.principal import get_principal
 
 
 # =====================================================
@@ -26,19 +29,13 @@ class DiscussionListView(ListAPIView):
     pagination_class = StandardPagination
 
     def get_queryset(self):
-        user = self.request.user
-
         qs = DiscussionPanel.objects.all()
 
         visibility_filter = Q(visibility="public")
 
-        if user.role == "community":
-            visibility_filter |= Q(community=user)
-
-        elif user.role == "student":
-            membership = getattr(user, "membership", None)
-            if membership:
-                visibility_filter |= Q(community=membership.community)
+        viewer_community_id = get_principal(self.request).community_id
+        if viewer_community_id:
+            visibility_filter |= Q(community_id=viewer_community_id)
 
         qs = qs.filter(visibility_filter)
 
@@ -46,10 +43,10 @@ class DiscussionListView(ListAPIView):
         if community_id:
             qs = qs.filter(community_id=community_id)
 
-        return qs.select_related("created_by","community").prefetch_related(Prefetch("replies",queryset=DiscussionReply.objects.select_related("created_by")))
+        return qs.select_related("created_by__membership__community","community").prefetch_related(latest_replies_prefetch())
 
 class DiscussionDetailView(RetrieveAPIView):
-    queryset = DiscussionPanel.objects.all()
+    queryset = DiscussionPanel.objects.select_related("created_by__membership__community","community").prefetch_related(latest_replies_prefetch())
     serializer_class = DiscussionReadSerializer
     permission_classes = [IsAuthenticated, CanAccessDiscussion]
 
@@ -109,6 +106,52 @@ class ReplyListView(ListAPIView):
         return DiscussionReply.objects.filter(topic_id=topic_id, parent_reply__isnull=True).order_by("-created_at")
 
 
+class ReplyThreadView(APIView):
+    """
+    A whole thread (?topic_id=) or the subtree under one reply (?reply_id=), flattened in
+    depth-first order with each reply's `depth`. One range scan on (topic, path) per page.
+    ?max_depth=N stops N levels below the start (0: only top-level replies / only the reply),
+    ?cursor= is the next_cursor of the previous page.
+    """
+    permission_classes = [IsAuthenticated, CanAccessDiscussion]
+
+    def get(self, request):
+        reply_id = request.query_params.get("reply_id")
+        topic_id = request.query_params.get("topic_id")
+        if not (reply_id or topic_id):
+            return Response({"error": "topic_id or reply_id is required."}, status=400)
+
+        if reply_id:
+            root = get_object_or_404(DiscussionReply.objects.select_related("topic"), pk=reply_id)
+            topic, replies, base_depth = root.topic, DiscussionReply.objects.filter(subtree_range(root.path)), root.depth
+        else:
+            topic = get_object_or_404(DiscussionPanel, pk=topic_id)
+            replies, base_depth = DiscussionReply.objects.all(), 0
+        self.check_object_permissions(request, topic)
+        replies = replies.filter(topic=topic)
+
+        max_depth = request.query_params.get("max_depth")
+        if max_depth is not None:
+            if not max_depth.isdigit():
+                raise ValidationError({"max_depth": "Must be a non-negative integer."})
+            replies = replies.filter(depth__lte=base_depth + int(max_depth))
+
+        # The cursor is the path of the last reply sent: the next page continues the walk after it
+        cursor = request.query_params.get("cursor")
+        if cursor:
+            if not re.fullmatch(r"[0-9a-f]+", cursor):
+                raise ValidationError({"cursor": "Invalid cursor."})
+            replies = replies.filter(path__gt=cursor)
+
+        page_size = get_cursor_page_size(request, 50, 200)
+        page = list(replies.select_related("created_by__membership__community").order_by("path")[:page_size + 1])
+        has_more = len(page) > page_size
+        page = page[:page_size]
+
+        data = ReplyReadSerializer(page, many=True, context={"request": request}).data
+        return Response(cursor_page(request, data, page[-1].path if has_more else None))
+
+
 
 # =====================================================
 # REACTION (toggle)
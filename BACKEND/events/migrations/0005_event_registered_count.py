@@ -0,0 +1,24 @@
+# Generated by Django 5.2.8 on 2026-10-18 14:58
+
+from django.db import migrations, models
+
+
+def backfill_counters(apps, schema_editor):
+    from utils.counters import recount
+    recount(apps, models=['events.Event'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0004_event_event_feed_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='registered_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -21,6 +21,7 @@ class Event(BaseModel):
     format = models.CharField(max_length=20, choices=FORMAT_CHOICES, default="On-site")
     
     image = models.ImageField(upload_to="events/", null=True, blank=True)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)  # utils/images.py
     
     speakers = models.JSONField(null=True,blank=True,help_text='Example: [{"name": "Aryush Khatri", "profession": "Backend Engineer"}]')
 
@@ -30,10 +31,18 @@ class Event(BaseModel):
     registration_deadline = models.DateTimeField(null=True, blank=True)
     max_participants = models.PositiveIntegerField(null=True, blank=True)
 
+    # Denormalized counter, maintained by utils/counters.py
+    registered_count = models.PositiveIntegerField(default=0)
+    counter_fields = ("registered_count",)
+
     created_by = models.ForeignKey(settings.AUTH_USER_MODEL,on_delete=models.SET_NULL,null=True,blank=True,related_name="created_events",)
+
+    # Diffed by notifications.signals.notify_event_update
+    tracked_fields = ("date", "start_time", "end_time", "location")
     
     class Meta:
         ordering = ["date", "start_time"]
+        indexes = [models.Index(fields=["-created_at", "-id"], name="event_feed_idx")]
 
     def __str__(self):
         return f"{self.title} ({self.date})"
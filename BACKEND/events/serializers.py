@@ -4,36 +4,35 @@ from .models import Event, EventRegistration
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 import json
+from utils.viewer import ViewerFlagsListSerializer, get_viewer_context
+from utils.images import AVATAR_WIDTH, CARD_WIDTH, ResponsiveImageField
 
 User = get_user_model()
 
 
 class EventSerializer(serializers.ModelSerializer):
     community_name = serializers.CharField(source='community.community_name', read_only=True)
-    community_logo = serializers.ImageField(source='community.community_logo', read_only=True)
+    community_logo = ResponsiveImageField('community_logo', AVATAR_WIDTH, source='community')
+    image_preview = ResponsiveImageField('image', CARD_WIDTH)
     is_registered = serializers.SerializerMethodField()
-    registered_count = serializers.SerializerMethodField()
+    registered_count = serializers.IntegerField(read_only=True)
     speakers = serializers.JSONField(required=False)
     what_to_expect = serializers.JSONField(required=False)
+    viewer_flags = {"event_registration": "pk"}
 
     class Meta:
         model = Event
         fields = [
             'id', 'community', 'community_name', 'community_logo', 'title', 'description', 
-            'date', 'start_time', 'end_time', 'location', 'format', 'image', 
+            'date', 'start_time', 'end_time', 'location', 'format', 'image', 'image_preview',
             'created_at', 'created_by', 'is_registered', 'registered_count',
             'registration_deadline', 'max_participants', 'speakers', 'what_to_expect'
         ]
         read_only_fields = ['created_by']
+        list_serializer_class = ViewerFlagsListSerializer
 
     def get_is_registered(self, obj):
-        request = self.context.get('request')
-        if request and request.user and request.user.is_authenticated:
-            return obj.registrations.filter(user=request.user).exists()
-        return False
-
-    def get_registered_count(self, obj):
-        return obj.registrations.count()
+        return get_viewer_context(self.context).has("event_registration", obj.pk)
 
     def to_internal_value(self, data):
         if hasattr(data, 'dict'):
@@ -16,6 +16,8 @@ from .models import Event, EventRegistration
 from communities.permissions import IsCommunityRepresentativeOrReadOnly
 from contents.permissions import CanCreateCommunityContent
 from utils.pagination import StandardPagination
+from utils.principal import get_principal
+from utils.cache import EVENTS, community_namespace, read_through
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 
@@ -26,13 +28,8 @@ class IsEventCreator(BasePermission):
             return False
             
         event_id = view.kwargs.get('pk') or view.kwargs.get('event_id')
-        event = get_object_or_404(Event, id=event_id)
-        
-        if request.user.role == 'community':
-            return event.community == request.user
-        
-        membership = getattr(request.user, 'membership', None)
-        return membership and membership.role == 'representative' and membership.community == event.community
+        event = get_object_or_404(Event.objects.only('community_id'), id=event_id)
+        return get_principal(request).manages(event.community_id)
 
 
 # --- Generic API Views (used by existing URL patterns) ---
@@ -55,17 +52,19 @@ class EventStatsView(ListAPIView):
     
     def get(self, request, *args, **kwargs):
         community_id = request.query_params.get("community_id")
-        qs = Event.objects.all()
-        if community_id:
-            qs = qs.filter(community_id=community_id)
+        today = timezone.now().date()
 
-        total_events = qs.count()
-        upcoming_events = qs.filter(date__gte=timezone.now().date()).count()
-        
-        return Response({
-            "total_events": total_events,
-            "upcoming_events": upcoming_events
-        })
+        def stats():
+            qs = Event.objects.all()
+            if community_id:
+                qs = qs.filter(community_id=community_id)
+            return {
+                "total_events": qs.count(),
+                "upcoming_events": qs.filter(date__gte=today).count()
+            }
+
+        namespace = community_namespace(community_id) if community_id else EVENTS
+        return Response(read_through("event-stats", [namespace], stats, parts=[community_id, today]))
 
 
 class EventCreateView(CreateAPIView):
@@ -130,21 +129,11 @@ class ParticipantListView(ListAPIView):
 class AttendanceUpdateView(UpdateAPIView):
     serializer_class = AttendanceUpdateSerializer
     permission_classes = [IsAuthenticated]
-    queryset = EventRegistration.objects.all()
+    queryset = EventRegistration.objects.select_related('event')
 
     def get_object(self):
         obj = super().get_object()
-        event = obj.event
-        user = self.request.user
-        
-        is_creator = False
-        if user.role == 'community':
-            is_creator = (event.community == user)
-        else:
-            membership = getattr(user, 'membership', None)
-            is_creator = (membership and membership.role == 'representative' and membership.community == event.community)
-            
-        if not is_creator:
+        if not get_principal(self.request).manages(obj.event.community_id):
             raise PermissionDenied("You do not have permission to update attendance for this event.")
             
         return obj
@@ -176,9 +165,10 @@ class EventViewSet(viewsets.ModelViewSet):
 
     def perform_create(self, serializer):
         user = self.request.user
-        if user.role == 'community':
+        principal = get_principal(self.request)
+        if principal.is_community:
             serializer.save(created_by=None, community=user)
-        elif hasattr(user, 'membership') and user.membership and user.membership.community:
+        elif principal.membership_community_id:
             serializer.save(created_by=user, community=user.membership.community)
         else:
             from rest_framework.exceptions import ValidationError
@@ -0,0 +1,36 @@
+"""
+    SQL queries each endpoint may run per request, by URL name (see utils/instrumentation.py).
+    Budgets hold for a whole page of results, authentication included: an endpoint whose count
+    grows with the page is an N+1 and fails hckonnect/test_query_budgets.py. Endpoints not listed
+    get DEFAULT_QUERY_BUDGET; None leaves an endpoint unbudgeted.
+"""
+
+DEFAULT_QUERY_BUDGET = 10
+
+QUERY_BUDGETS = {
+    # Feed and content lists
+    "feed-list": 8,
+    "post-list": 7,
+    "post-detail": 6,
+    "comment-list": 6,
+    "announcement-list": 4,
+    "resource-list": 5,
+    "discussion-list": 7,
+    "discussion-detail": 6,
+    "reply-list": 4,
+    "reply-thread": 5,
+
+    # Events and communities
+    "event-list": 5,
+    "event-detail": 4,
+    "participant-list": 4,
+    "vacancy-list": 5,
+    "vacancy-applications": 4,
+    "community-dashboard": 9,
+    "user-profile-detail": 8,
+
+    # Notifications
+    "notification-list": 4,
+    "unread-count": 3,
+    "notification-stream": None,  # long-lived stream, not measured
+}
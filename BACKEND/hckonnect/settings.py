@@ -77,6 +77,7 @@ SOCIALACCOUNT_PROVIDERS = {
 }
 
 MIDDLEWARE = [
+    'utils.instrumentation.RequestMetricsMiddleware',  # First, to count every other middleware's queries
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',  # Add this right after SecurityMiddleware
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -144,7 +145,7 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ),
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.PrincipalJWTAuthentication',
     ),
 }
 
@@ -159,6 +160,48 @@ SIMPLE_JWT = {
     'SIGNING_KEY': SECRET_KEY,
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
+
+# Query counts and timings per endpoint (utils/instrumentation.py, budgets in hckonnect/query_budgets.py)
+REQUEST_METRICS = {
+    'SERVER_TIMING': DEBUG or os.getenv("SERVER_TIMING") == "True",
+    'DUPLICATE_THRESHOLD': 3,  # a statement repeated this often in one request is logged as an N+1
+}
+
+# Authorize read-only requests from the claims signed into the token, without loading the user
+# (accounts/tokens.py). Token versions are cached: startup fails unless the cache is shared by all workers.
+JWT_CLAIMS_AUTH = {
+    'ENABLED': os.getenv("JWT_CLAIMS_AUTH") == "True",
+    'VERSION_CACHE_SECONDS': 300,
+}
+
+# Read-through cache of the hot read endpoints (utils/cache.py). Local memory by default, which
+# is per process and leaves the read cache off: with several workers point CACHE_BACKEND/CACHE_LOCATION at a shared cache
+# (e.g. django.core.cache.backends.redis.RedisCache, redis://...) so they see the same versions.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv("CACHE_BACKEND", 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv("CACHE_LOCATION", 'hckonnect'),
+    }
+}
+
+READ_CACHE = {
+    # READ_CACHE=True/False; unset, it is on only when CACHES['default'] is shared between workers
+    'ENABLED': os.getenv("READ_CACHE") == "True" if os.getenv("READ_CACHE") else None,
+    'ALIAS': 'default',
+    'TIMEOUT': 300,  # upper bound on staleness for what no signal invalidates (F() counters)
+    'LOCK_TIMEOUT': 10,  # a worker building a missing entry holds its lock at most this long
+    'LOCK_WAIT': 5,  # how long the others wait for that entry before computing it themselves
+}
+
+# Push channel for notifications (GET /notifications/stream/, served by the ASGI app).
+# InProcessBackend only reaches streams of the process that created the notification: run more than
+# one process with NOTIFICATION_STREAM_BACKEND=notifications.realtime.PostgresBackend (LISTEN/NOTIFY).
+NOTIFICATION_STREAM = {
+    'BACKEND': os.getenv("NOTIFICATION_STREAM_BACKEND", 'notifications.realtime.InProcessBackend'),
+    'OPTIONS': {'max_queue': 100},  # events buffered per client before a slow one is cut off
+    'HEARTBEAT_SECONDS': 15,
+    'TICKET_SECONDS': 30,  # how long a stream ticket can be redeemed (once)
+}
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -227,6 +270,13 @@ EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD")
 
 DEFAULT_FROM_EMAIL = os.getenv("DEFAULT_FROM_EMAIL")
 
+# Outgoing mail is queued in notifications.EmailOutbox and sent by `manage.py send_outbox`
+EMAIL_OUTBOX = {
+    'DOMAIN_RATE_LIMITS': {},  # e.g. {'gmail.com': 60}: emails per minute to a recipient domain
+    'DEFAULT_RATE_LIMIT': None,  # per-minute limit for every other domain; None is unlimited
+    'RETENTION_DAYS': 30,  # sent emails are deleted by send_outbox after this many days
+}
+
 
 GOOGLE_CLIENT_ID = os.getenv('GOOGLE_CLIENT_ID')
 GOOGLE_CLIENT_SECRET = os.getenv('GOOGLE_CLIENT_SECRET')
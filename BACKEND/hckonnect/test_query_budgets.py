@@ -0,0 +1,110 @@
+import datetime
+import json
+from django.contrib.auth import get_user_model
+from django.test import AsyncClient, TestCase, override_settings
+from rest_framework.test import APIClient
+from communities.models import CommunityMembership, CommunityVacancy, VacancyApplication
+from contents.models import Announcement, Post, PostComment, PostReaction, Resource
+from discussion.models import DiscussionPanel, DiscussionReply
+from events.models import Event, EventRegistration
+from notifications.services import NotificationService
+from utils.instrumentation import fingerprint
+from utils.testing import QueryBudgetMixin
+
+User = get_user_model()
+
+PAGE = 6
+
+
+class QueryBudgetTest(QueryBudgetMixin, TestCase):
+    """Every endpoint, with a page of content behind the lists, stays within its query budget."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.community = User.objects.create_user(
+            email="comm@test.com", username="testcomm", password="password123",
+            role="community", community_name="Test Community"
+        )
+        cls.rep = User.objects.create_user(email="rep@test.com", username="rep", password="password123", role="student")
+        CommunityMembership.objects.create(user=cls.rep, community=cls.community, role="representative")
+        students = [
+            User.objects.create_user(email=f"s{i}@test.com", username=f"student{i}", password="password123", role="student")
+            for i in range(PAGE)
+        ]
+        for student in students:
+            CommunityMembership.objects.create(user=student, community=cls.community)
+
+        vacancy = CommunityVacancy.objects.create(community=cls.community, title="Designer", description="Design things")
+        for i, student in enumerate(students):
+            author = students[(i + 1) % PAGE]
+            post = Post.objects.create(author=student, content=f"Post {i}")
+            comment = PostComment.objects.create(post=post, author=author, content="Comment")
+            PostComment.objects.create(post=post, author=student, parent_comment=comment, content="Reply")
+            PostReaction.objects.create(user=author, post=post)
+            Announcement.objects.create(community=cls.community, created_by_user=cls.rep, title=f"Announcement {i}", description="Text")
+            Resource.objects.create(community=cls.community, created_by_user=cls.rep, title=f"Resource {i}", description="Text", video_url="https://example.com/v")
+            cls.event = Event.objects.create(
+                community=cls.community, title=f"Event {i}", description="Text",
+                date=datetime.date(2030, 1, 1), start_time=datetime.time(10), end_time=datetime.time(12),
+            )
+            EventRegistration.objects.create(event=cls.event, user=author)
+            cls.topic = DiscussionPanel.objects.create(topic=f"Topic {i}", content="Text", created_by=student, community=cls.community)
+            reply = DiscussionReply.objects.create(topic=cls.topic, created_by=author, reply_content="Reply")
+            DiscussionReply.objects.create(topic=cls.topic, created_by=student, parent_reply=reply, reply_content="Nested")
+            VacancyApplication.objects.create(vacancy=vacancy, user=student)
+            NotificationService.create_notification(recipient=cls.rep, type="system", title=f"Notice {i}", message="Text", actor=author)
+        cls.post = post
+        cls.student = students[0]
+
+    def test_endpoints_stay_within_their_budgets(self):
+        client = APIClient()
+        client.force_authenticate(user=self.rep)
+        self.client = client
+        self.assertEndpointsWithinBudget(
+            kwargs={
+                "community-dashboard": {"pk": self.community.pk},
+                "community-analytics": {"pk": self.community.pk},
+                "community-members": {"community_id": self.community.pk},
+                "user-profile-detail": {"pk": self.student.pk},
+                "post-detail": {"pk": self.post.pk},
+                "event-detail": {"pk": self.event.pk},
+                "participant-list": {"event_id": self.event.pk},
+                "discussion-detail": {"pk": self.topic.pk},
+            },
+            params={
+                "comment-list": {"post_id": self.post.pk},
+                "reply-list": {"topic_id": self.topic.pk},
+                "reply-thread": {"topic_id": self.topic.pk},
+                "member-list": {"community_id": self.community.pk},
+            },
+        )
+
+    @override_settings(REQUEST_METRICS={"SERVER_TIMING": True})
+    def test_metrics_are_sent_as_server_timing_and_logged(self):
+        with self.assertLogs("hckonnect.requests", "INFO") as logs:
+            response = self.client.get("/contents/feed/")
+        self.assertEqual(response.status_code, 200)
+        metrics = response.request_metrics
+        self.assertIn('db;dur=', response["Server-Timing"])
+        self.assertIn(f'desc="{metrics.queries} queries"', response["Server-Timing"])
+
+        record = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(record["endpoint"], "feed-list")
+        self.assertEqual(record["queries"], metrics.queries)
+        self.assertEqual(record["query_budget"], 8)
+
+        # Batches of different sizes are the same statement
+        self.assertEqual(
+            fingerprint('SELECT * FROM "t" WHERE "id" IN (%s, %s, %s)'),
+            fingerprint('SELECT  *  FROM "t" WHERE "id" IN (%s)')
+        )
+
+    @override_settings(REQUEST_METRICS={"SERVER_TIMING": True})
+    async def test_metrics_are_recorded_under_asgi(self):
+        client = AsyncClient()
+        with self.assertLogs("hckonnect.requests", "INFO") as logs:
+            response = await client.get("/contents/feed/")
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(response.request_metrics.queries, 0)
+        self.assertIn("total;dur=", response["Server-Timing"])
+        self.assertEqual(json.loads(logs.records[-1].getMessage())["endpoint"], "feed-list")
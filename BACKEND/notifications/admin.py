@@ -1,3 +1,24 @@
 from django.contrib import admin
 
 # Register your models here.
+from .models import NotificationJob, EmailOutbox
+
+
+@admin.register(NotificationJob)
+class NotificationJobAdmin(admin.ModelAdmin):
+    list_display = ('idempotency_key', 'status', 'attempts', 'sent_count', 'run_after', 'finished_at')
+    list_filter = ('status', 'audience')
+    search_fields = ('idempotency_key',)
+
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'to_email', 'status', 'priority', 'sensitive', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status', 'domain', 'sensitive')
+    search_fields = ('to_email', 'subject')
+
+    def get_exclude(self, request, obj=None):
+        # Passwords and OTPs waiting to be sent are not shown to staff
+        if obj is not None and obj.sensitive:
+            return ('body_text', 'body_html')
+        return super().get_exclude(request, obj)
@@ -0,0 +1,162 @@
+import traceback
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from .models import Notification, NotificationJob
+from .services import NotificationService
+from .realtime import publish_notifications
+
+User = get_user_model()
+
+
+"""
+    DB-backed notification fan-out for groups that get personal rows (applicants, attendees);
+    audience-wide messages are BroadcastNotifications instead.
+    Signals only enqueue a NotificationJob (one row, inside the request's transaction);
+    `manage.py run_notification_worker` claims due jobs, streams the recipient ids and
+    bulk_creates the notifications in fixed-size batches.
+    Jobs are claimed with a conditional UPDATE rather than SELECT ... FOR UPDATE,
+    so any number of workers can share the queue on Postgres and SQLite alike.
+    Every claim bumps the job's attempt number, which fences the claim: checkpoints and the
+    final status are written only while the row still has this worker's number, so a worker
+    whose job was reclaimed after LOCK_TIMEOUT rolls back its batch and stops.
+"""
+
+BATCH_SIZE = 1000
+RETRY_BASE_DELAY = timedelta(seconds=30)
+# A running job whose worker went silent for this long is claimed again
+LOCK_TIMEOUT = timedelta(minutes=10)
+
+# audience: recipients for a job's audience_id
+AUDIENCES = {
+    'vacancy_applicants': lambda audience_id: User.objects.filter(vacancy_applications__vacancy_id=audience_id),
+    'event_attendees': lambda audience_id: User.objects.filter(event_registrations__event_id=audience_id),
+}
+
+
+class ClaimLost(Exception):
+    """Another worker reclaimed the job; this one must not write to it any more."""
+
+
+def enqueue_fanout(idempotency_key, audience, type, title, message, audience_id=None, actor=None, metadata=None):
+    """Queues a fan-out once per key; enqueueing the same key again returns the existing job."""
+    job, _ = NotificationJob.objects.get_or_create(
+        idempotency_key=idempotency_key,
+        defaults={
+            'audience': audience,
+            'audience_id': audience_id,
+            'type': type,
+            'title': title,
+            'message': message,
+            'actor': actor,
+            'metadata': metadata or {},
+        }
+    )
+    return job
+
+
+def claim_next_job():
+    """Claims the next due job for this worker, or returns None when the queue is empty."""
+    now = timezone.now()
+    due = NotificationJob.objects.filter(
+        Q(status=NotificationJob.STATUS_PENDING, run_after__lte=now) |
+        Q(status=NotificationJob.STATUS_RUNNING, locked_at__lt=now - LOCK_TIMEOUT)
+    ).order_by('run_after')
+
+    for job in due[:10]:
+        # Only one worker's UPDATE can match the row in the state it was read in
+        claimed = NotificationJob.objects.filter(pk=job.pk, status=job.status, locked_at=job.locked_at).update(
+            status=NotificationJob.STATUS_RUNNING,
+            locked_at=now,
+            attempts=F('attempts') + 1,
+        )
+        if claimed:
+            job.refresh_from_db()
+            return job
+    return None
+
+
+def _update_claimed(job, **fields):
+    """Updates the job if this worker's claim still holds it, else raises ClaimLost."""
+    updated = NotificationJob.objects.filter(
+        pk=job.pk, status=NotificationJob.STATUS_RUNNING, attempts=job.attempts
+    ).update(updated_at=timezone.now(), **fields)
+    if not updated:
+        raise ClaimLost(f"Job {job.pk} was claimed by another worker")
+
+
+def _send_batch(job, recipient_ids):
+    with transaction.atomic():
+        # The checkpoint commits with the batch, so a retry never sends it twice. It is written
+        # first: the row stays locked until commit, and a lost claim rolls the batch back.
+        _update_claimed(
+            job,
+            last_recipient_id=recipient_ids[-1],
+            sent_count=F('sent_count') + len(recipient_ids),
+            locked_at=timezone.now(),
+        )
+        notifications = Notification.objects.bulk_create([
+            Notification(
+                recipient_id=recipient_id,
+                actor=job.actor,
+                type=job.type,
+                title=job.title,
+                message=job.message,
+                metadata=job.metadata,
+            ) for recipient_id in recipient_ids
+        ])
+        NotificationService.adjust_unread(recipient_ids, 1)
+        publish_notifications(notifications)
+    job.last_recipient_id = recipient_ids[-1]
+    job.sent_count += len(recipient_ids)
+
+
+def run_job(job, batch_size=BATCH_SIZE):
+    """
+    Sends the job to every recipient after its checkpoint. Failures are retried with backoff.
+    Returns False when it failed, or when another worker reclaimed it meanwhile.
+    """
+    try:
+        recipients = AUDIENCES[job.audience](job.audience_id).order_by('pk')
+        if job.last_recipient_id:
+            recipients = recipients.filter(pk__gt=job.last_recipient_id)
+
+        batch = []
+        for recipient_id in recipients.values_list('pk', flat=True).iterator(chunk_size=batch_size):
+            batch.append(recipient_id)
+            if len(batch) == batch_size:
+                _send_batch(job, batch)
+                batch = []
+        if batch:
+            _send_batch(job, batch)
+        _update_claimed(job, status=NotificationJob.STATUS_DONE, locked_at=None, finished_at=timezone.now())
+    except ClaimLost:
+        return False
+    except Exception:
+        fields = {'last_error': traceback.format_exc(), 'locked_at': None}
+        if job.attempts >= job.max_attempts:
+            fields.update(status=NotificationJob.STATUS_FAILED, finished_at=timezone.now())
+        else:
+            fields.update(status=NotificationJob.STATUS_PENDING, run_after=timezone.now() + RETRY_BASE_DELAY * 2 ** (job.attempts - 1))
+        try:
+            _update_claimed(job, **fields)
+        except ClaimLost:
+            pass
+        return False
+    return True
+
+
+def run_pending_jobs(batch_size=BATCH_SIZE, limit=None):
+    """Runs due jobs until the queue is empty (or `limit` jobs ran). Returns (succeeded, failed)."""
+    succeeded = failed = 0
+    while limit is None or succeeded + failed < limit:
+        job = claim_next_job()
+        if job is None:
+            break
+        if run_job(job, batch_size=batch_size):
+            succeeded += 1
+        else:
+            failed += 1
+    return succeeded, failed
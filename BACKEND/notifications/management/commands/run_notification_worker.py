@@ -0,0 +1,22 @@
+import time
+from django.core.management.base import BaseCommand
+from notifications.fanout import BATCH_SIZE, run_pending_jobs
+
+
+class Command(BaseCommand):
+    help = "Runs queued notification fan-out jobs. Polls the queue until stopped, or drains it once with --once."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Run every due job, then exit.")
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Notifications inserted per batch.")
+        parser.add_argument("--interval", type=float, default=2.0, help="Seconds to wait when the queue is empty.")
+
+    def handle(self, *args, **options):
+        while True:
+            succeeded, failed = run_pending_jobs(batch_size=options["batch_size"])
+            if succeeded or failed:
+                self.stdout.write(f"Ran {succeeded + failed} jobs: {succeeded} done, {failed} failed or retrying.")
+            if options["once"]:
+                break
+            time.sleep(options["interval"])
+        self.stdout.write(self.style.SUCCESS("Notification queue drained."))
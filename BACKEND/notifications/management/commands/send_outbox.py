@@ -0,0 +1,31 @@
+import time
+from django.core.management.base import BaseCommand
+from notifications.outbox import BATCH_SIZE, purge_sent, send_pending
+
+# Sent rows past the retention period are purged at start and then this often (seconds)
+PURGE_INTERVAL = 3600
+
+
+class Command(BaseCommand):
+    help = "Sends queued emails from the outbox. Polls until stopped, or drains the outbox once with --once."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Send every due email, then exit.")
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Emails sent per SMTP connection.")
+        parser.add_argument("--interval", type=float, default=1.0, help="Seconds to wait when the outbox is empty.")
+
+    def handle(self, *args, **options):
+        purged_at = None
+        while True:
+            if purged_at is None or time.monotonic() - purged_at >= PURGE_INTERVAL:
+                purged = purge_sent()
+                purged_at = time.monotonic()
+                if purged:
+                    self.stdout.write(f"Purged {purged} sent emails past retention.")
+            sent, failed = send_pending(batch_size=options["batch_size"])
+            if sent or failed:
+                self.stdout.write(f"Sent {sent} emails, {failed} failed or retrying.")
+            if options["once"]:
+                break
+            time.sleep(options["interval"])
+        self.stdout.write(self.style.SUCCESS("Outbox drained."))
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.8 on 2026-10-18 15:04
+
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0002_alter_notification_type'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('idempotency_key', models.CharField(max_length=255, unique=True)),
+                ('audience', models.CharField(choices=[('active_students', 'All Active Students'), ('community_members', 'Community Members')], max_length=30)),
+                ('audience_id', models.UUIDField(blank=True, null=True)),
+                ('type', models.CharField(choices=[('membership', 'Membership'), ('role_change', 'Role Change'), ('vacancy', 'Vacancy/Recruitment'), ('event', 'Event'), ('announcement', 'Announcement'), ('discussion', 'Discussion'), ('post', 'Post'), ('resource', 'Resource'), ('message', 'Message')], max_length=20)),
+                ('title', models.CharField(max_length=255)),
+                ('message', models.TextField()),
+                ('metadata', models.JSONField(blank=True, default=dict)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('max_attempts', models.PositiveIntegerField(default=5)),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now)),
+                ('locked_at', models.DateTimeField(blank=True, null=True)),
+                ('last_recipient_id', models.UUIDField(blank=True, null=True)),
+                ('sent_count', models.PositiveIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='notification_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'run_after'], name='notificationjob_queue_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.8 on 2026-10-18 15:06
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0003_notificationjob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='notificationjob',
+            name='audience',
+            field=models.CharField(choices=[('vacancy_applicants', 'Vacancy Applicants'), ('event_attendees', 'Event Attendees')], max_length=30),
+        ),
+        migrations.CreateModel(
+            name='BroadcastNotification',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('audience', models.CharField(choices=[('all_students', 'All Students'), ('community_members', 'Community Members')], max_length=30)),
+                ('type', models.CharField(choices=[('membership', 'Membership'), ('role_change', 'Role Change'), ('vacancy', 'Vacancy/Recruitment'), ('event', 'Event'), ('announcement', 'Announcement'), ('discussion', 'Discussion'), ('post', 'Post'), ('resource', 'Resource'), ('message', 'Message')], max_length=20)),
+                ('title', models.CharField(max_length=255)),
+                ('message', models.TextField()),
+                ('metadata', models.JSONField(blank=True, default=dict)),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='broadcast_actions', to=settings.AUTH_USER_MODEL)),
+                ('community', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='broadcast_notifications', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='BroadcastReceipt',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('is_read', models.BooleanField(default=False)),
+                ('is_deleted', models.BooleanField(default=False)),
+                ('broadcast', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='receipts', to='notifications.broadcastnotification')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='broadcast_receipts', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='broadcastnotification',
+            index=models.Index(fields=['audience', 'community', '-created_at'], name='broadcast_audience_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='broadcastreceipt',
+            unique_together={('broadcast', 'user')},
+        ),
+    ]
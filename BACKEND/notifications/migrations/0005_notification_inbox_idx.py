@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-18 15:08
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0004_broadcastnotification'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['recipient', 'is_deleted', '-created_at', '-id'], name='notification_inbox_idx'),
+        ),
+    ]
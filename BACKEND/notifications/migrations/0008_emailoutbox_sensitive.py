@@ -0,0 +1,35 @@
+# Generated by Django 5.2.8 on 2026-10-18 16:02
+
+from django.db import migrations, models
+
+# Subjects of the emails queued before this migration that carry a password or an OTP
+CREDENTIAL_SUBJECTS = [
+    "Welcome to HCKonnect - Your Account Details",
+    "Your HCKonnect Community Account Password",
+    "OTP for HCKonnect Password Reset",
+    "Your OTP Has Been Resent",
+]
+
+
+def redact_queued_credentials(apps, schema_editor):
+    """Flags the credential emails already in the outbox and blanks the ones that are done."""
+    EmailOutbox = apps.get_model("notifications", "EmailOutbox")
+    rows = EmailOutbox.objects.filter(subject__in=CREDENTIAL_SUBJECTS)
+    rows.update(sensitive=True)
+    rows.filter(status__in=["sent", "failed"]).update(body_text="[redacted]", body_html="")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0007_emailoutbox_batch_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='emailoutbox',
+            name='sensitive',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(redact_queued_credentials, migrations.RunPython.noop),
+    ]
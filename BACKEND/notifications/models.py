@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 from Base.models import BaseModel
 
 class Notification(BaseModel):
@@ -36,6 +37,168 @@ class Notification(BaseModel):
 
     class Meta:
         ordering = ['-created_at']
+        # The inbox: recipient's live notifications walked by a (created_at, id) cursor
+        indexes = [models.Index(fields=['recipient', 'is_deleted', '-created_at', '-id'], name='notification_inbox_idx')]
 
     def __str__(self):
         return f"{self.type} - {self.recipient.username} - {self.title}"
+
+
+class BroadcastNotification(BaseModel):
+    """
+    One notification for a whole audience, stored once and fanned out on read.
+    Per-user state only exists as a BroadcastReceipt once the user reads or deletes it.
+    """
+    AUDIENCE_ALL_STUDENTS = 'all_students'
+    AUDIENCE_COMMUNITY_MEMBERS = 'community_members'
+    AUDIENCE_CHOICES = [
+        (AUDIENCE_ALL_STUDENTS, 'All Students'),
+        (AUDIENCE_COMMUNITY_MEMBERS, 'Community Members'),
+    ]
+
+    audience = models.CharField(max_length=30, choices=AUDIENCE_CHOICES)
+    # The community whose members are the audience (community_members only)
+    community = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='broadcast_notifications'
+    )
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='broadcast_actions'
+    )
+    type = models.CharField(max_length=20, choices=Notification.NOTIFICATION_TYPES)
+    title = models.CharField(max_length=255)
+    message = models.TextField()
+    metadata = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [models.Index(fields=['audience', 'community', '-created_at'], name='broadcast_audience_idx')]
+
+    def __str__(self):
+        return f"{self.type} - {self.audience} - {self.title}"
+
+
+class BroadcastReceipt(BaseModel):
+    broadcast = models.ForeignKey(BroadcastNotification, on_delete=models.CASCADE, related_name='receipts')
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='broadcast_receipts')
+    is_read = models.BooleanField(default=False)
+    is_deleted = models.BooleanField(default=False)
+
+    class Meta:
+        unique_together = ('broadcast', 'user')
+
+    def __str__(self):
+        return f"{self.user_id} - {self.broadcast_id}"
+
+class NotificationJob(BaseModel):
+    """
+    A queued fan-out of one notification to an audience, run by `manage.py run_notification_worker`.
+    `last_recipient_id` is the checkpoint: recipients are walked in id order and each batch is
+    committed together with it, so a retried job picks up where it stopped.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+    AUDIENCE_CHOICES = [
+        ('vacancy_applicants', 'Vacancy Applicants'),
+        ('event_attendees', 'Event Attendees'),
+    ]
+
+    idempotency_key = models.CharField(max_length=255, unique=True)
+    audience = models.CharField(max_length=30, choices=AUDIENCE_CHOICES)
+    audience_id = models.UUIDField(null=True, blank=True)  # e.g. the vacancy for vacancy_applicants
+
+    # The notification every recipient gets
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='notification_jobs'
+    )
+    type = models.CharField(max_length=20, choices=Notification.NOTIFICATION_TYPES)
+    title = models.CharField(max_length=255)
+    message = models.TextField()
+    metadata = models.JSONField(default=dict, blank=True)
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_recipient_id = models.UUIDField(null=True, blank=True)
+    sent_count = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'run_after'], name='notificationjob_queue_idx')]
+
+    def __str__(self):
+        return f"{self.idempotency_key} ({self.status})"
+
+
+class EmailOutbox(BaseModel):
+    """
+    One outgoing email, written in the same transaction as the change that caused it and
+    delivered by `manage.py send_outbox`. Lower priority numbers go first (e.g. OTPs).
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_SENDING = 'sending'
+    STATUS_SENT = 'sent'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_SENDING, 'Sending'),
+        (STATUS_SENT, 'Sent'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+    PRIORITY_URGENT = 0
+    PRIORITY_NORMAL = 5
+    PRIORITY_BULK = 9
+
+    to_email = models.EmailField()
+    domain = models.CharField(max_length=255)  # of to_email, for per-domain rate limits
+    from_email = models.CharField(max_length=255)
+    subject = models.CharField(max_length=255)
+    body_text = models.TextField()
+    body_html = models.TextField(blank=True)
+    priority = models.PositiveSmallIntegerField(default=PRIORITY_NORMAL)
+    # Shared by emails queued together, e.g. the id of a CommunityEmailBroadcast
+    batch_id = models.UUIDField(null=True, blank=True, db_index=True)
+    # The body carries credentials (a password, an OTP): it is blanked once sent or given up on
+    sensitive = models.BooleanField(default=False)
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claim_token = models.UUIDField(null=True, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        verbose_name = 'Email Outbox'
+        verbose_name_plural = 'Email Outbox'
+        indexes = [
+            models.Index(fields=['status', 'priority', 'next_attempt_at'], name='emailoutbox_queue_idx'),
+            models.Index(fields=['domain', 'sent_at'], name='emailoutbox_domain_rate_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {self.to_email} ({self.status})"
@@ -0,0 +1,206 @@
+import logging
+import traceback
+import uuid
+from datetime import timedelta
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db.models import Count, F, Q
+from django.utils import timezone
+from .models import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+
+"""
+    Transactional email outbox. Code that sends mail only writes EmailOutbox rows, inside the
+    same transaction as the change the mail is about, so a rolled back request sends nothing
+    and a committed one cannot lose its mail to an SMTP hiccup.
+    `manage.py send_outbox` claims due rows in batches (a conditional UPDATE stamps them with a
+    claim token, so workers never share a row), sends each batch over one SMTP connection,
+    holds domains to the per-minute limits in settings.EMAIL_OUTBOX and retries failures with
+    exponential backoff.
+    Sensitive rows (passwords, OTPs) have their body blanked as soon as they are sent or failed
+    for good, and purge_sent() deletes sent rows after EMAIL_OUTBOX["RETENTION_DAYS"].
+"""
+
+BATCH_SIZE = 100
+RETRY_BASE_DELAY = timedelta(seconds=30)
+RATE_WINDOW = timedelta(minutes=1)
+# A row left in 'sending' by a worker that died is claimed again after this long
+LOCK_TIMEOUT = timedelta(minutes=10)
+REDACTED = "[redacted]"
+
+
+def get_outbox_settings():
+    return {"DOMAIN_RATE_LIMITS": {}, "DEFAULT_RATE_LIMIT": None, "RETENTION_DAYS": 30, **getattr(settings, "EMAIL_OUTBOX", {})}
+
+
+def build_email(to_email, subject, body_text, body_html="", priority=EmailOutbox.PRIORITY_NORMAL, batch_id=None, sensitive=False):
+    """An unsaved outbox row, for callers that bulk_create their own (e.g. personalised) rows."""
+    return EmailOutbox(
+        to_email=to_email,
+        domain=to_email.rsplit('@', 1)[-1].lower(),
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        subject=subject,
+        body_text=body_text,
+        body_html=body_html,
+        priority=priority,
+        batch_id=batch_id,
+        sensitive=sensitive,
+    )
+
+
+def queue_email(to_emails, subject, body_text, body_html="", priority=EmailOutbox.PRIORITY_NORMAL, batch_id=None, sensitive=False):
+    """Writes one outbox row per recipient. Call it inside the business change's transaction."""
+    if isinstance(to_emails, str):
+        to_emails = [to_emails]
+    return EmailOutbox.objects.bulk_create([
+        build_email(to_email, subject, body_text, body_html, priority, batch_id, sensitive) for to_email in to_emails
+    ])
+
+
+def claim_batch(batch_size=BATCH_SIZE):
+    """Claims up to batch_size due rows for this worker, most urgent first."""
+    now = timezone.now()
+    due = Q(status=EmailOutbox.STATUS_PENDING, next_attempt_at__lte=now) | \
+        Q(status=EmailOutbox.STATUS_SENDING, locked_at__lt=now - LOCK_TIMEOUT)
+    candidates = list(
+        EmailOutbox.objects.filter(due).order_by('priority', 'next_attempt_at').values_list('pk', flat=True)[:batch_size]
+    )
+    if not candidates:
+        return []
+
+    token = uuid.uuid4()
+    # Re-checking `due` in the UPDATE leaves rows another worker claimed in the meantime alone
+    EmailOutbox.objects.filter(due, pk__in=candidates).update(
+        status=EmailOutbox.STATUS_SENDING, claim_token=token, locked_at=now, updated_at=now
+    )
+    return list(EmailOutbox.objects.filter(claim_token=token).order_by('priority', 'next_attempt_at'))
+
+
+def _apply_rate_limits(rows):
+    """Splits claimed rows into those a domain's limit allows now and those put back for later."""
+    config = get_outbox_settings()
+    limits = {domain.lower(): limit for domain, limit in config["DOMAIN_RATE_LIMITS"].items()}
+    default = config["DEFAULT_RATE_LIMIT"]
+    limited = {row.domain for row in rows if limits.get(row.domain, default) is not None}
+    if not limited:
+        return rows, []
+
+    now = timezone.now()
+    recent = dict(
+        EmailOutbox.objects.filter(domain__in=limited, status=EmailOutbox.STATUS_SENT, sent_at__gt=now - RATE_WINDOW)
+        .values('domain').annotate(sent=Count('pk')).values_list('domain', 'sent')
+    )
+    allowance = {domain: max(limits.get(domain, default) - recent.get(domain, 0), 0) for domain in limited}
+
+    allowed, deferred = [], []
+    for row in rows:
+        if row.domain not in allowance:
+            allowed.append(row)
+        elif allowance[row.domain] > 0:
+            allowance[row.domain] -= 1
+            allowed.append(row)
+        else:
+            deferred.append(row)
+
+    if deferred:
+        # Not an attempt: the rows go back in the queue untouched until the window has moved on
+        EmailOutbox.objects.filter(pk__in=[row.pk for row in deferred]).update(
+            status=EmailOutbox.STATUS_PENDING, claim_token=None, locked_at=None,
+            next_attempt_at=now + RATE_WINDOW, updated_at=now
+        )
+    return allowed, deferred
+
+
+def _build_message(row, connection):
+    message = EmailMultiAlternatives(
+        subject=row.subject,
+        body=row.body_text,
+        from_email=row.from_email,
+        to=[row.to_email],
+        connection=connection
+    )
+    if row.body_html:
+        message.attach_alternative(row.body_html, "text/html")
+    return message
+
+
+def _record_failure(row, error):
+    now = timezone.now()
+    row.attempts += 1
+    row.last_error = error
+    row.claim_token = None
+    row.locked_at = None
+    update_fields = ['attempts', 'last_error', 'claim_token', 'locked_at', 'status', 'next_attempt_at', 'updated_at']
+    if row.attempts >= row.max_attempts:
+        row.status = EmailOutbox.STATUS_FAILED
+        if row.sensitive:
+            row.body_text, row.body_html = REDACTED, ""
+            update_fields += ['body_text', 'body_html']
+    else:
+        row.status = EmailOutbox.STATUS_PENDING
+        row.next_attempt_at = now + RETRY_BASE_DELAY * 2 ** (row.attempts - 1)
+    row.save(update_fields=update_fields)
+    logger.warning("Email %s to %s failed (attempt %s): %s", row.pk, row.to_email, row.attempts, error.splitlines()[-1])
+
+
+def send_batch(rows):
+    """Sends claimed rows over one connection. Returns (sent, failed)."""
+    rows, _ = _apply_rate_limits(rows)
+    if not rows:
+        return 0, 0
+
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception:
+        error = traceback.format_exc()
+        for row in rows:
+            _record_failure(row, error)
+        return 0, len(rows)
+
+    sent, failed = [], 0
+    try:
+        for row in rows:
+            try:
+                # One message per call so a bad address fails alone, on the shared open connection
+                connection.send_messages([_build_message(row, connection)])
+            except Exception:
+                _record_failure(row, traceback.format_exc())
+                failed += 1
+            else:
+                sent.append(row.pk)
+    finally:
+        connection.close()
+
+    now = timezone.now()
+    EmailOutbox.objects.filter(pk__in=sent).update(
+        status=EmailOutbox.STATUS_SENT, sent_at=now, attempts=F('attempts') + 1,
+        claim_token=None, locked_at=None, last_error='', updated_at=now
+    )
+    # Credentials only live in the outbox until they are delivered
+    EmailOutbox.objects.filter(pk__in=sent, sensitive=True).update(body_text=REDACTED, body_html='')
+    return len(sent), failed
+
+
+def purge_sent(now=None):
+    """Deletes sent rows older than the retention period. Returns the number deleted."""
+    now = now or timezone.now()
+    cutoff = now - timedelta(days=get_outbox_settings()["RETENTION_DAYS"])
+    deleted, _ = EmailOutbox.objects.filter(status=EmailOutbox.STATUS_SENT, sent_at__lt=cutoff).delete()
+    return deleted
+
+
+def send_pending(batch_size=BATCH_SIZE, limit=None):
+    """Sends due mail until the queue is empty (or `limit` batches ran). Returns (sent, failed)."""
+    sent = failed = batches = 0
+    while limit is None or batches < limit:
+        rows = claim_batch(batch_size)
+        if not rows:
+            break
+        batch_sent, batch_failed = send_batch(rows)
+        sent += batch_sent
+        failed += batch_failed
+        batches += 1
+    return sent, failed
@@ -0,0 +1,273 @@
+import asyncio
+import json
+import logging
+import re
+import secrets
+import select
+import threading
+import time
+from collections import defaultdict
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, transaction
+from django.utils.module_loading import import_string
+from utils.pagination import encode_cursor, decode_cursor
+
+logger = logging.getLogger(__name__)
+
+
+"""
+    Pub/sub hub behind the notification stream (GET /notifications/stream/).
+    NotificationService publishes every new notification after its transaction commits;
+    each open stream subscribes to the channels its user listens on:
+        user:<id>        personal notifications
+        students         broadcasts to all students
+        community:<id>   broadcasts to the members of a community
+    The backend is pluggable (settings.NOTIFICATION_STREAM["BACKEND"]) and needs subscribe,
+    unsubscribe, publish and has_subscribers (a relaying backend can always say True).
+    InProcessBackend only reaches streams served by the same process, which is what tests
+    and a single ASGI worker need. With several workers, or notifications created by other
+    processes (the fan-out worker, management commands), use PostgresBackend, which relays
+    every event through LISTEN/NOTIFY.
+    Browsers open the stream with a stream ticket (issue_stream_ticket): EventSource cannot send
+    headers, and a JWT in the URL would end up in access logs. A stream closes when the access
+    token it was opened with expires; the client reconnects with a new ticket.
+"""
+
+STREAM_TICKET_SALT = "notifications.stream"
+
+# Put in a subscriber's queue when it fell too far behind and was cut off
+OVERFLOW = object()
+
+
+class Subscription:
+    def __init__(self, backend, channels, max_queue):
+        self.backend = backend
+        self.channels = channels
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=max_queue)
+        self.overflowed = False
+
+    def deliver(self, event):
+        """Thread-safe: publishers run in sync request threads, the stream on the event loop."""
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # The stream's event loop is gone
+            pass
+
+    def _put(self, event):
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Backpressure: a slow client is not buffered without bound. Drop what is
+            # queued and end its stream; it reconnects and resumes from Last-Event-ID.
+            self.overflowed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(OVERFLOW)
+
+    async def get(self):
+        return await self.queue.get()
+
+    def close(self):
+        self.backend.unsubscribe(self)
+
+
+class InProcessBackend:
+    def __init__(self, max_queue=100):
+        self.max_queue = max_queue
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+
+    def subscribe(self, channels):
+        subscription = Subscription(self, channels, self.max_queue)
+        with self._lock:
+            for channel in channels:
+                self._subscribers[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                self._subscribers[channel].discard(subscription)
+                if not self._subscribers[channel]:
+                    del self._subscribers[channel]
+
+    def has_subscribers(self, channel):
+        return bool(self._subscribers.get(channel))
+
+    def publish(self, channel, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            subscription.deliver(event)
+
+
+class PostgresBackend(InProcessBackend):
+    """
+    Relays events between processes: publish() NOTIFYs through the database, and every process
+    LISTENs on a connection of its own in a background thread, handing what it hears to its
+    local subscribers. Events missed while the listener reconnects are replayed when their
+    client reconnects (Last-Event-ID).
+    """
+    # NOTIFY payloads are capped at 8000 bytes; bigger events travel as their id and are re-read
+    MAX_PAYLOAD_BYTES = 7900
+
+    def __init__(self, max_queue=100, channel="hckonnect_notifications", database="default"):
+        super().__init__(max_queue)
+        if not re.fullmatch(r"[a-z_][a-z0-9_]*", channel):
+            raise ImproperlyConfigured(f"Invalid NOTIFY channel name: {channel!r}")
+        self.channel = channel
+        self.database = database
+        self._listener = None
+
+    def subscribe(self, channels):
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(target=self._listen, name="notification-listener", daemon=True)
+                self._listener.start()
+        return super().subscribe(channels)
+
+    def has_subscribers(self, channel):
+        # They may be in any process
+        return True
+
+    def publish(self, channel, event):
+        payload = json.dumps({"channel": channel, "event": event})
+        if len(payload.encode()) > self.MAX_PAYLOAD_BYTES:
+            payload = json.dumps({"channel": channel, "id": event["id"]})
+        with connections[self.database].cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [self.channel, payload])
+
+    def _listen(self):
+        wrapper = connections[self.database]
+        while True:
+            raw = None
+            try:
+                raw = wrapper.get_new_connection(wrapper.get_connection_params())
+                raw.autocommit = True
+                with raw.cursor() as cursor:
+                    cursor.execute(f'LISTEN "{self.channel}"')
+                while True:
+                    if not select.select([raw], [], [], 30)[0]:
+                        continue
+                    raw.poll()
+                    while raw.notifies:
+                        self._relay(json.loads(raw.notifies.pop(0).payload))
+            except Exception:
+                logger.exception("Notification listener lost its connection, reconnecting")
+                time.sleep(1)
+            finally:
+                if raw is not None:
+                    raw.close()
+
+    def _relay(self, message):
+        channel, event = message["channel"], message.get("event")
+        if not super().has_subscribers(channel):
+            return
+        if event is None:
+            event = self._reread(channel, message["id"])
+            if event is None:
+                return
+        super().publish(channel, event)
+
+    def _reread(self, channel, event_id):
+        from .models import Notification, BroadcastNotification
+        model = Notification if channel.startswith("user:") else BroadcastNotification
+        try:
+            item = model.objects.filter(pk=decode_cursor(event_id)[1]).first()
+            return build_event(item) if item is not None else None
+        finally:
+            # The ORM opened this thread's own connection; do not keep it idle
+            connections.close_all()
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_stream_settings():
+    return {
+        "BACKEND": "notifications.realtime.InProcessBackend", "OPTIONS": {}, "HEARTBEAT_SECONDS": 15, "TICKET_SECONDS": 30,
+        **getattr(settings, "NOTIFICATION_STREAM", {}),
+    }
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                config = get_stream_settings()
+                _backend = import_string(config["BACKEND"])(**config["OPTIONS"])
+    return _backend
+
+
+def channels_for(user):
+    channels = [f"user:{user.pk}"]
+    if user.role == "student" and user.status == "active":
+        channels.append("students")
+    membership = getattr(user, "membership", None)
+    if membership is not None:
+        channels.append(f"community:{membership.community_id}")
+    return channels
+
+
+def issue_stream_ticket(user, expires_at):
+    """A signed, single-use ticket that opens the user's stream until expires_at (a timestamp)."""
+    return signing.dumps(
+        {"user": str(user.pk), "ver": user.token_version, "exp": expires_at, "nonce": secrets.token_urlsafe(12)},
+        salt=STREAM_TICKET_SALT,
+    )
+
+
+def redeem_stream_ticket(ticket):
+    """The ticket's claims ({"user", "ver", "exp"}), or None if it is forged, too old or already used."""
+    config = get_stream_settings()
+    try:
+        claims = signing.loads(ticket, salt=STREAM_TICKET_SALT, max_age=config["TICKET_SECONDS"])
+    except signing.BadSignature:
+        return None
+    if not cache.add(f"notifications:stream_ticket:{claims['nonce']}", True, config["TICKET_SECONDS"]):
+        return None
+    return claims
+
+
+def build_event(item):
+    """An SSE event for a Notification or BroadcastNotification; its id is the resume cursor."""
+    from .models import BroadcastNotification
+    from .serializers import NotificationSerializer, BroadcastNotificationSerializer
+    if isinstance(item, BroadcastNotification):
+        if not hasattr(item, "viewer_is_read"):
+            item.viewer_is_read = False
+        data = BroadcastNotificationSerializer(item).data
+    else:
+        data = NotificationSerializer(item).data
+    return {"id": encode_cursor(item.created_at, item.id), "data": json.dumps(data, cls=DjangoJSONEncoder)}
+
+
+def _publish_on_commit(channel_items):
+    def publish():
+        backend = get_backend()
+        for channel, item in channel_items:
+            if backend.has_subscribers(channel):
+                backend.publish(channel, build_event(item))
+    transaction.on_commit(publish)
+
+
+def publish_notifications(notifications):
+    _publish_on_commit([(f"user:{n.recipient_id}", n) for n in notifications])
+
+
+def publish_broadcast(broadcast):
+    if broadcast.audience == broadcast.AUDIENCE_ALL_STUDENTS:
+        channel = "students"
+    else:
+        channel = f"community:{broadcast.community_id}"
+    _publish_on_commit([(channel, broadcast)])
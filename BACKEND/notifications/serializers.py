@@ -1,5 +1,6 @@
 from rest_framework import serializers
-from .models import Notification
+from .models import Notification, BroadcastNotification
+from utils.images import avatar_url
 
 class NotificationSerializer(serializers.ModelSerializer):
     actor_name = serializers.ReadOnlyField(source='actor.username')
@@ -13,8 +14,12 @@ class NotificationSerializer(serializers.ModelSerializer):
         ]
 
     def get_actor_image(self, obj):
-        if obj.actor:
-            if obj.actor.role == 'community':
-                return obj.actor.community_logo.url if obj.actor.community_logo else None
-            return obj.actor.profile_image.url if obj.actor.profile_image else None
-        return None
+        return avatar_url(obj.actor)
+
+
+class BroadcastNotificationSerializer(NotificationSerializer):
+    """Same shape as a personal notification; is_read comes from the viewer's receipt."""
+    is_read = serializers.BooleanField(source='viewer_is_read', read_only=True)
+
+    class Meta(NotificationSerializer.Meta):
+        model = BroadcastNotification
@@ -1,12 +1,28 @@
-from .models import Notification
+import heapq
+from .models import Notification, BroadcastNotification, BroadcastReceipt
+from .realtime import publish_notifications, publish_broadcast
 from django.contrib.auth import get_user_model
+from django.db.models import BooleanField, Exists, ExpressionWrapper, F, OuterRef, Q
+from django.db.models.functions import Greatest
+from django.utils import timezone
+from utils.pagination import before_cursor
 
 User = get_user_model()
 
 class NotificationService:
+    # The badge counts at most this many unread broadcasts, so the count stays a bounded index range
+    UNREAD_BROADCAST_LIMIT = 99
+
+    @staticmethod
+    def adjust_unread(user_ids, delta):
+        """Moves the users' unread_notification_count by delta, never below zero."""
+        User.objects.filter(pk__in=user_ids).update(
+            unread_notification_count=Greatest(F('unread_notification_count') + delta, 0)
+        )
+
     @staticmethod
     def create_notification(recipient, type, title, message, actor=None, metadata=None):
-        return Notification.objects.create(
+        notification = Notification.objects.create(
             recipient=recipient,
             type=type,
             title=title,
@@ -14,6 +30,9 @@ class NotificationService:
             actor=actor,
             metadata=metadata or {}
         )
+        NotificationService.adjust_unread([recipient.pk], 1)
+        publish_notifications([notification])
+        return notification
 
     @staticmethod
     def notify_group(users, type, title, message, actor=None, metadata=None):
@@ -27,4 +46,107 @@ class NotificationService:
                 metadata=metadata or {}
             ) for user in users
         ]
-        return Notification.objects.bulk_create(notifications)
+        notifications = Notification.objects.bulk_create(notifications)
+        NotificationService.adjust_unread([n.recipient_id for n in notifications], 1)
+        publish_notifications(notifications)
+        return notifications
+
+    @staticmethod
+    def mark_read(notification):
+        # Only the UPDATE that flips a live unread row moves the counter, so races cannot double count
+        rows = Notification.objects.filter(pk=notification.pk, is_read=False)
+        if rows.filter(is_deleted=False).update(is_read=True):
+            NotificationService.adjust_unread([notification.recipient_id], -1)
+        else:
+            rows.update(is_read=True)
+        notification.is_read = True
+
+    @staticmethod
+    def mark_all_read(user):
+        Notification.objects.filter(recipient=user, is_read=False).update(is_read=True)
+        # Moving the watermark marks every broadcast sent so far read, without a receipt each
+        user.broadcasts_read_at = timezone.now()
+        User.objects.filter(pk=user.pk).update(unread_notification_count=0, broadcasts_read_at=user.broadcasts_read_at)
+
+    @staticmethod
+    def delete(notification):
+        """Soft delete; an unread notification leaves the unread count with it."""
+        rows = Notification.objects.filter(pk=notification.pk, is_deleted=False)
+        if rows.filter(is_read=False).update(is_deleted=True):
+            NotificationService.adjust_unread([notification.recipient_id], -1)
+        else:
+            rows.update(is_deleted=True)
+        notification.is_deleted = True
+
+    @staticmethod
+    def unread_count(user):
+        """
+        The badge count: the user's counter plus their unread broadcasts. Never scans Notification;
+        broadcasts are only counted after the user's read watermark and up to UNREAD_BROADCAST_LIMIT.
+        """
+        broadcasts = NotificationService.broadcasts_for(user).filter(viewer_is_read=False)
+        if user.broadcasts_read_at is not None:
+            broadcasts = broadcasts.filter(created_at__gt=user.broadcasts_read_at)
+        unread_broadcasts = broadcasts.values('pk')[:NotificationService.UNREAD_BROADCAST_LIMIT].count()
+        return user.unread_notification_count + unread_broadcasts
+
+    @staticmethod
+    def broadcast(audience, type, title, message, community=None, actor=None, metadata=None):
+        """One row for the whole audience (all students, or the members of `community`)."""
+        broadcast = BroadcastNotification.objects.create(
+            audience=audience,
+            community=community,
+            type=type,
+            title=title,
+            message=message,
+            actor=actor,
+            metadata=metadata or {}
+        )
+        publish_broadcast(broadcast)
+        return broadcast
+
+    @staticmethod
+    def broadcasts_for(user):
+        """
+        Broadcasts addressed to the user and not deleted by them, annotated with `viewer_is_read`.
+        A user only sees broadcasts sent after they joined the audience, like a fanned-out row;
+        "all students" means active students, as the fan-out to them did.
+        """
+        audience = Q(pk__in=[])
+        if user.role == 'student' and user.status == 'active':
+            audience |= Q(audience=BroadcastNotification.AUDIENCE_ALL_STUDENTS, created_at__gte=user.created_at)
+        membership = getattr(user, 'membership', None)
+        if membership is not None:
+            audience |= Q(
+                audience=BroadcastNotification.AUDIENCE_COMMUNITY_MEMBERS,
+                community_id=membership.community_id,
+                created_at__gte=membership.created_at
+            )
+
+        receipts = BroadcastReceipt.objects.filter(broadcast=OuterRef('pk'), user=user)
+        is_read = Exists(receipts.filter(is_read=True))
+        if user.broadcasts_read_at is not None:
+            is_read = ExpressionWrapper(is_read | Q(created_at__lte=user.broadcasts_read_at), output_field=BooleanField())
+        return BroadcastNotification.objects.filter(audience).annotate(
+            viewer_is_read=is_read
+        ).exclude(Exists(receipts.filter(is_deleted=True)))
+
+    @staticmethod
+    def update_broadcast_receipt(user, broadcast_id, **state):
+        """Records read/deleted state for a broadcast the user can see. Returns False if they cannot."""
+        if not NotificationService.broadcasts_for(user).filter(pk=broadcast_id).exists():
+            return False
+        BroadcastReceipt.objects.update_or_create(broadcast_id=broadcast_id, user=user, defaults=state)
+        return True
+
+    @staticmethod
+    def newer_than(user, cursor, limit):
+        """Personal and broadcast notifications after a (created_at, id) cursor, oldest first."""
+        personal = Notification.objects.filter(recipient=user, is_deleted=False).filter(before_cursor(cursor))
+        broadcasts = NotificationService.broadcasts_for(user).filter(before_cursor(cursor))
+        merged = heapq.merge(
+            personal.select_related('actor').order_by('created_at', 'id')[:limit],
+            broadcasts.select_related('actor').order_by('created_at', 'id')[:limit],
+            key=lambda item: (item.created_at, item.id)
+        )
+        return list(merged)[:limit]
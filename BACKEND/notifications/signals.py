@@ -2,25 +2,21 @@ from django.db.models.signals import post_save, pre_save
 from django.dispatch import receiver
 from django.conf import settings
 from .services import NotificationService
+from .fanout import enqueue_fanout
+from .models import BroadcastNotification
 
 # 1. Membership / Role Change
 @receiver(pre_save, sender=settings.AUTH_USER_MODEL)
 def notify_role_change(sender, instance, **kwargs):
-    from django.contrib.auth import get_user_model
-    User = get_user_model()
-    if instance.pk:
-        try:
-            old_instance = User.objects.get(pk=instance.pk)
-            if old_instance.role != instance.role:
-                NotificationService.create_notification(
-                    recipient=instance,
-                    type='role_change',
-                    title='Role Updated',
-                    message=f'Your role has been changed from {old_instance.role} to {instance.role}.',
-                    metadata={'new_role': instance.role}
-                )
-        except User.DoesNotExist:
-            pass
+    # Diffed against the values loaded with the instance: no extra query on every User save
+    if instance.has_changed('role'):
+        NotificationService.create_notification(
+            recipient=instance,
+            type='role_change',
+            title='Role Updated',
+            message=f'Your role has been changed from {instance.previous("role")} to {instance.role}.',
+            metadata={'new_role': instance.role}
+        )
 
 @receiver(post_save, sender='communities.CommunityMembership')
 def notify_membership_change(sender, instance, created, **kwargs):
@@ -65,14 +61,10 @@ def notify_new_application(sender, instance, created, **kwargs):
 
 @receiver(post_save, sender='communities.CommunityVacancy')
 def notify_vacancy_actions(sender, instance, created, **kwargs):
-    from django.contrib.auth import get_user_model
-    from communities.models import CommunityVacancy
-    User = get_user_model()
     if created:
-        # Notify all students
-        students = User.objects.filter(role='student', status='active')
-        NotificationService.notify_group(
-            users=students,
+        # Notify all students (one broadcast row, fanned out on read)
+        NotificationService.broadcast(
+            audience=BroadcastNotification.AUDIENCE_ALL_STUDENTS,
             type='vacancy',
             title='New Vacancy Opened',
             message=f'{instance.community.community_name} has a new vacancy: {instance.title}.',
@@ -84,38 +76,30 @@ def notify_vacancy_actions(sender, instance, created, **kwargs):
 @receiver(pre_save, sender='communities.CommunityVacancy')
 def notify_vacancy_closed(sender, instance, **kwargs):
     from communities.models import CommunityVacancy
-    if not instance.pk:
+    if not instance.has_changed('status') or instance.status != CommunityVacancy.STATUS_CLOSED:
         return
 
-    try:
-        previous = CommunityVacancy.objects.get(pk=instance.pk)
-    except CommunityVacancy.DoesNotExist:
-        return
-
-    if previous.status != CommunityVacancy.STATUS_CLOSED and instance.status == CommunityVacancy.STATUS_CLOSED:
-        from django.contrib.auth import get_user_model
-        User = get_user_model()
-        applicants = User.objects.filter(vacancy_applications__vacancy=instance)
-        NotificationService.notify_group(
-            users=applicants,
-            type='vacancy',
-            title='Vacancy Closed',
-            message=f'The vacancy "{instance.title}" you applied for has been closed.',
-            actor=instance.community,
-            metadata={'vacancy_id': str(instance.id)}
-        )
+    # Notify applicants (fanned out by the notification worker).
+    # updated_at is still the loaded value here, so it identifies this transition.
+    enqueue_fanout(
+        f'vacancy_closed:{instance.id}:{instance.updated_at.isoformat()}',
+        audience='vacancy_applicants',
+        audience_id=instance.id,
+        type='vacancy',
+        title='Vacancy Closed',
+        message=f'The vacancy "{instance.title}" you applied for has been closed.',
+        actor=instance.community,
+        metadata={'vacancy_id': str(instance.id)}
+    )
 
 # 3. Events
 @receiver(post_save, sender='events.Event')
 def notify_event_actions(sender, instance, created, **kwargs):
-    from django.contrib.auth import get_user_model
-    User = get_user_model()
     if created:
-        # Notify all community members
-        from communities.models import CommunityMembership
-        members = User.objects.filter(membership__community=instance.community)
-        NotificationService.notify_group(
-            users=members,
+        # Notify all community members (one broadcast row, fanned out on read)
+        NotificationService.broadcast(
+            audience=BroadcastNotification.AUDIENCE_COMMUNITY_MEMBERS,
+            community=instance.community,
             type='event',
             title='New Event Created',
             message=f'A new event "{instance.title}" has been scheduled for {instance.date}.',
@@ -125,34 +109,28 @@ def notify_event_actions(sender, instance, created, **kwargs):
 
 @receiver(pre_save, sender='events.Event')
 def notify_event_update(sender, instance, **kwargs):
-    if instance.pk:
-        from events.models import Event
-        try:
-            old_event = Event.objects.get(pk=instance.pk)
-            changes = []
-            if old_event.date != instance.date:
-                changes.append(f"date to {instance.date}")
-            if old_event.start_time != instance.start_time or old_event.end_time != instance.end_time:
-                changes.append("time")
-            if old_event.location != instance.location:
-                changes.append(f"location to {instance.location}")
-
-            if changes:
-                # Notify attendees
-                from django.contrib.auth import get_user_model
-                User = get_user_model()
-                attendees = User.objects.filter(event_registrations__event=instance)
-                change_text = ", ".join(changes)
-                NotificationService.notify_group(
-                    users=attendees,
-                    type='event',
-                    title='Event Updated',
-                    message=f'The event "{instance.title}" has been updated: {change_text}.',
-                    actor=instance.community,
-                    metadata={'event_id': str(instance.id)}
-                )
-        except Event.DoesNotExist:
-            pass
+    changes = []
+    if instance.has_changed('date'):
+        changes.append(f"date to {instance.date}")
+    if instance.has_changed('start_time') or instance.has_changed('end_time'):
+        changes.append("time")
+    if instance.has_changed('location'):
+        changes.append(f"location to {instance.location}")
+
+    if changes:
+        # Notify attendees (fanned out by the notification worker).
+        # updated_at is still the loaded value here, so it identifies this change.
+        change_text = ", ".join(changes)
+        enqueue_fanout(
+            f'event_updated:{instance.id}:{instance.updated_at.isoformat()}',
+            audience='event_attendees',
+            audience_id=instance.id,
+            type='event',
+            title='Event Updated',
+            message=f'The event "{instance.title}" has been updated: {change_text}.',
+            actor=instance.community,
+            metadata={'event_id': str(instance.id)}
+        )
 
 @receiver(post_save, sender='events.EventRegistration')
 def notify_event_registration(sender, instance, created, **kwargs):
@@ -170,12 +148,10 @@ def notify_event_registration(sender, instance, created, **kwargs):
 # 4. Announcements
 @receiver(post_save, sender='contents.Announcement')
 def notify_announcement(sender, instance, created, **kwargs):
-    from django.contrib.auth import get_user_model
-    User = get_user_model()
     if created:
-        members = User.objects.filter(membership__community=instance.community)
-        NotificationService.notify_group(
-            users=members,
+        NotificationService.broadcast(
+            audience=BroadcastNotification.AUDIENCE_COMMUNITY_MEMBERS,
+            community=instance.community,
             type='announcement',
             title='New Announcement',
             message=instance.title,
@@ -225,12 +201,10 @@ def notify_post_comment(sender, instance, created, **kwargs):
 # 7. Resources
 @receiver(post_save, sender='contents.Resource')
 def notify_resource_upload(sender, instance, created, **kwargs):
-    from django.contrib.auth import get_user_model
-    User = get_user_model()
     if created:
-        members = User.objects.filter(membership__community=instance.community)
-        NotificationService.notify_group(
-            users=members,
+        NotificationService.broadcast(
+            audience=BroadcastNotification.AUDIENCE_COMMUNITY_MEMBERS,
+            community=instance.community,
             type='resource',
             title='New Resource Uploaded',
             message=f'A new resource "{instance.title}" is available in {instance.community.community_name}.',
@@ -0,0 +1,109 @@
+import asyncio
+import time
+from asgiref.sync import sync_to_async
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.tokens import AccessToken
+from .realtime import OVERFLOW, InProcessBackend, build_event, issue_stream_ticket
+from .services import NotificationService
+
+User = get_user_model()
+
+
+@override_settings(NOTIFICATION_STREAM={"HEARTBEAT_SECONDS": 0.05})
+class NotificationStreamTest(TestCase):
+    def setUp(self):
+        self.student = User.objects.create_user(email="student@test.com", username="student", password="password123", role="student")
+        self.token = str(AccessToken.for_user(self.student))
+
+    def _notify(self, title):
+        with self.captureOnCommitCallbacks(execute=True):
+            return NotificationService.create_notification(recipient=self.student, type="message", title=title, message="")
+
+    async def _ticket(self):
+        response = await self.async_client.post("/notifications/stream/ticket/", headers={"Authorization": f"Bearer {self.token}"})
+        self.assertEqual(response.status_code, 200)
+        return response.json()["ticket"]
+
+    async def _next(self, stream):
+        return (await asyncio.wait_for(anext(stream), timeout=2)).decode()
+
+    async def _next_event(self, stream):
+        while True:
+            chunk = await self._next(stream)
+            if chunk.startswith("id:"):
+                return chunk
+
+    async def test_requires_a_token(self):
+        response = await self.async_client.get("/notifications/stream/")
+        self.assertEqual(response.status_code, 401)
+
+    async def test_pushes_new_notifications_with_heartbeats(self):
+        response = await self.async_client.get("/notifications/stream/", {"ticket": await self._ticket()})
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        stream = aiter(response.streaming_content)
+        self.assertEqual(await self._next(stream), "retry: 5000\n\n")
+        self.assertEqual(await self._next(stream), ": heartbeat\n\n")
+
+        await sync_to_async(self._notify)("Pushed")
+        self.assertIn('"title": "Pushed"', await self._next_event(stream))
+        await stream.aclose()
+
+    async def test_last_event_id_replays_what_was_missed(self):
+        first = await sync_to_async(self._notify)("First")
+        await sync_to_async(self._notify)("Missed")
+
+        response = await self.async_client.get("/notifications/stream/", {"ticket": await self._ticket()})
+        stream = aiter(response.streaming_content)
+        await self._next(stream)
+        await sync_to_async(self._notify)("Live")
+        live = await self._next_event(stream)
+        await stream.aclose()
+        self.assertIn('"title": "Live"', live)
+
+        event_id = live.split("\n")[0][len("id: "):]
+        first_id = (await sync_to_async(build_event)(first))["id"]
+
+        response = await self.async_client.get("/notifications/stream/", headers={"Authorization": f"Bearer {self.token}", "Last-Event-ID": first_id})
+        stream = aiter(response.streaming_content)
+        await self._next(stream)
+        self.assertIn('"title": "Missed"', await self._next_event(stream))
+        self.assertEqual(event_id, (await self._next_event(stream)).split("\n")[0][len("id: "):])
+        await stream.aclose()
+
+    async def test_tickets_are_single_use_and_tokens_stay_out_of_the_url(self):
+        ticket = await self._ticket()
+        response = await self.async_client.get("/notifications/stream/", {"ticket": ticket})
+        self.assertEqual(response.status_code, 200)
+        await aiter(response.streaming_content).aclose()
+
+        for params in ({"ticket": ticket}, {"ticket": "forged"}, {"token": self.token}):
+            response = await self.async_client.get("/notifications/stream/", params)
+            self.assertEqual(response.status_code, 401)
+
+    async def test_inactive_users_are_refused(self):
+        ticket = await self._ticket()
+        self.student.is_active = False
+        await self.student.asave()
+        response = await self.async_client.get("/notifications/stream/", headers={"Authorization": f"Bearer {self.token}"})
+        self.assertEqual(response.status_code, 401)
+        response = await self.async_client.get("/notifications/stream/", {"ticket": ticket})
+        self.assertEqual(response.status_code, 401)
+
+    async def test_stream_ends_when_the_token_expires(self):
+        ticket = await sync_to_async(issue_stream_ticket)(self.student, time.time() + 0.2)
+        response = await self.async_client.get("/notifications/stream/", {"ticket": ticket})
+        stream = aiter(response.streaming_content)
+        with self.assertRaises(StopAsyncIteration):
+            while True:
+                await self._next(stream)
+
+    async def test_slow_subscriber_is_cut_off(self):
+        backend = InProcessBackend(max_queue=2)
+        subscription = backend.subscribe(["user:1"])
+        for i in range(3):
+            backend.publish("user:1", {"id": str(i), "data": "{}"})
+        await asyncio.sleep(0)
+        self.assertIs(await subscription.get(), OVERFLOW)
+        subscription.close()
+        self.assertFalse(backend.has_subscribers("user:1"))
@@ -1,3 +1,317 @@
-from django.test import TestCase
+from io import StringIO
+from datetime import date, time, timedelta
+from unittest import mock
+from django.test import TestCase, override_settings
+from django.core import mail
+from django.core.management import call_command
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APIClient
+from communities.models import CommunityMembership, CommunityVacancy, VacancyApplication
+from contents.models import Announcement
+from events.models import Event
+from .models import Notification, NotificationJob, BroadcastNotification, BroadcastReceipt, EmailOutbox
+from .fanout import claim_next_job, enqueue_fanout, run_job, run_pending_jobs
+from .outbox import REDACTED, purge_sent, queue_email, send_pending
+from .services import NotificationService
 
-# Create your tests here.
+User = get_user_model()
+
+
+class NotificationFanoutWorkerTest(TestCase):
+    def setUp(self):
+        self.community = User.objects.create_user(
+            email="comm@test.com", username="testcomm", password="password123",
+            role="community", community_name="Test Community"
+        )
+        self.students = [
+            User.objects.create_user(email=f"s{i}@test.com", username=f"student{i}", password="password123", role="student")
+            for i in range(5)
+        ]
+
+    def test_vacancy_closed_is_fanned_out_by_the_worker(self):
+        vacancy = CommunityVacancy.objects.create(community=self.community, title="Vacancy", description="desc")
+        for student in self.students:
+            VacancyApplication.objects.create(user=student, vacancy=vacancy)
+        vacancy.status = CommunityVacancy.STATUS_CLOSED
+        vacancy.save()
+        self.assertEqual(NotificationJob.objects.count(), 1)
+        self.assertFalse(Notification.objects.filter(title="Vacancy Closed").exists())
+
+        call_command("run_notification_worker", "--once", "--batch-size", "2", stdout=StringIO())
+        job = NotificationJob.objects.get()
+        self.assertEqual(job.status, NotificationJob.STATUS_DONE)
+        self.assertEqual(job.sent_count, 5)
+        self.assertEqual(
+            set(Notification.objects.filter(title="Vacancy Closed").values_list("recipient_id", flat=True)),
+            {student.id for student in self.students}
+        )
+
+        # The same key never queues or sends twice
+        enqueue_fanout(job.idempotency_key, audience="vacancy_applicants", audience_id=vacancy.id, type="vacancy", title="Again", message="")
+        run_pending_jobs()
+        self.assertEqual(NotificationJob.objects.count(), 1)
+        self.assertEqual(Notification.objects.filter(title="Vacancy Closed").count(), 5)
+
+    def test_retry_resumes_after_the_checkpoint(self):
+        job = enqueue_fanout("broken", audience="unknown", type="vacancy", title="Title", message="")
+        self.assertEqual(run_pending_jobs(), (0, 1))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (NotificationJob.STATUS_PENDING, 1))
+        self.assertIn("KeyError", job.last_error)
+        self.assertGreater(job.run_after, job.updated_at)
+
+        ordered_ids = sorted(student.id for student in self.students)
+        vacancy = CommunityVacancy.objects.create(community=self.community, title="Vacancy", description="desc")
+        for student in self.students:
+            VacancyApplication.objects.create(user=student, vacancy=vacancy)
+        job.audience, job.audience_id = "vacancy_applicants", vacancy.id
+        job.last_recipient_id = ordered_ids[1]
+        job.run_after = job.created_at
+        job.save()
+        self.assertEqual(run_pending_jobs(batch_size=2), (1, 0))
+        self.assertEqual(
+            sorted(Notification.objects.filter(title="Title").values_list("recipient_id", flat=True)),
+            ordered_ids[2:]
+        )
+
+    def test_a_reclaimed_job_is_left_to_its_new_worker(self):
+        vacancy = CommunityVacancy.objects.create(community=self.community, title="Vacancy", description="desc")
+        for student in self.students:
+            VacancyApplication.objects.create(user=student, vacancy=vacancy)
+        enqueue_fanout("slow", audience="vacancy_applicants", audience_id=vacancy.id, type="vacancy", title="Title", message="")
+        stalled = claim_next_job()
+
+        # The first worker went silent past LOCK_TIMEOUT and another one claimed the job again
+        NotificationJob.objects.filter(pk=stalled.pk).update(locked_at=timezone.now() - timedelta(hours=1))
+        reclaimed = claim_next_job()
+        self.assertEqual(reclaimed.attempts, stalled.attempts + 1)
+
+        self.assertFalse(run_job(stalled, batch_size=2))
+        self.assertFalse(Notification.objects.filter(title="Title").exists())
+        self.assertTrue(run_job(reclaimed, batch_size=2))
+        self.assertEqual(Notification.objects.filter(title="Title").count(), 5)
+        job = NotificationJob.objects.get(pk=stalled.pk)
+        self.assertEqual((job.status, job.sent_count), (NotificationJob.STATUS_DONE, 5))
+
+
+class BroadcastNotificationTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.community = User.objects.create_user(
+            email="comm@test.com", username="testcomm", password="password123",
+            role="community", community_name="Test Community"
+        )
+        self.member = User.objects.create_user(email="member@test.com", username="member", password="password123", role="student")
+        self.student = User.objects.create_user(email="student@test.com", username="student", password="password123", role="student")
+        CommunityMembership.objects.create(user=self.member, community=self.community)
+        Announcement.objects.create(title="Members only", description="desc", community=self.community)
+        CommunityVacancy.objects.create(community=self.community, title="Vacancy", description="desc")
+
+    def _titles(self, user):
+        self.client.force_authenticate(user=user)
+        response = self.client.get("/notifications/")
+        self.assertEqual(response.status_code, 200)
+        return [(item["title"], item["is_read"]) for item in response.data["results"]]
+
+    def test_broadcasts_are_stored_once_and_merged_per_audience(self):
+        self.assertEqual(BroadcastNotification.objects.count(), 2)
+        self.assertFalse(Notification.objects.exclude(type="membership").exists())
+
+        # Newest first, merged with the personal "Joined Community" notification
+        self.assertEqual(self._titles(self.member), [
+            ("New Vacancy Opened", False), ("New Announcement", False), ("Joined Community", False),
+        ])
+        self.assertEqual(self._titles(self.student), [("New Vacancy Opened", False)])
+
+        # "All students" are the active ones
+        self.student.status = "blocked"
+        self.student.save()
+        self.assertEqual(self._titles(self.student), [])
+
+    def test_receipts_track_read_and_deleted_state(self):
+        announcement = BroadcastNotification.objects.get(type="announcement")
+        vacancy = BroadcastNotification.objects.get(type="vacancy")
+        self.client.force_authenticate(user=self.member)
+
+        self.assertEqual(self.client.patch(f"/notifications/{announcement.id}/read/").status_code, 200)
+        self.assertEqual(self.client.delete(f"/notifications/{vacancy.id}/delete/").status_code, 204)
+        self.assertEqual(self._titles(self.member), [("New Announcement", True), ("Joined Community", False)])
+        self.assertEqual(BroadcastReceipt.objects.count(), 2)
+
+        # Not in the outsider's audience
+        self.client.force_authenticate(user=self.student)
+        self.assertEqual(self.client.patch(f"/notifications/{announcement.id}/read/").status_code, 404)
+
+        self.client.patch("/notifications/mark-all-read/")
+        self.assertEqual(self._titles(self.student), [("New Vacancy Opened", True)])
+
+
+class NotificationInboxTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.community = User.objects.create_user(
+            email="comm@test.com", username="testcomm", password="password123",
+            role="community", community_name="Test Community"
+        )
+        self.member = User.objects.create_user(email="member@test.com", username="member", password="password123", role="student")
+        CommunityMembership.objects.create(user=self.member, community=self.community)
+        for i in range(3):
+            Announcement.objects.create(title=f"Announcement {i}", description="desc", community=self.community)
+            NotificationService.create_notification(recipient=self.member, type="message", title=f"Personal {i}", message="")
+        self.client.force_authenticate(user=self.member)
+
+    def _unread(self):
+        # A real request loads the user (and its counter) fresh
+        self.member.refresh_from_db()
+        response = self.client.get("/notifications/unread-count/")
+        self.assertEqual(response.status_code, 200)
+        return response.data["unread_count"]
+
+    def test_cursor_walks_personal_and_broadcasts_once(self):
+        ids, cursor = [], None
+        while True:
+            params = {"page_size": 3, **({"cursor": cursor} if cursor else {})}
+            response = self.client.get("/notifications/", params)
+            ids.extend(item["id"] for item in response.data["results"])
+            cursor = response.data["next_cursor"]
+            if not cursor:
+                break
+        # 3 announcements, 3 personal messages and "Joined Community"
+        self.assertEqual(len(ids), 7)
+        self.assertEqual(len(set(ids)), 7)
+        self.assertEqual(self.client.get("/notifications/", {"cursor": "bad"}).status_code, 400)
+
+    def test_unread_counter_follows_read_delete_and_mark_all(self):
+        self.assertEqual(self._unread(), 7)
+        personal = Notification.objects.filter(recipient=self.member, type="message")
+        first, second = personal[0], personal[1]
+
+        self.client.patch(f"/notifications/{first.id}/read/")
+        self.client.patch(f"/notifications/{first.id}/read/")
+        self.client.delete(f"/notifications/{first.id}/delete/")
+        self.client.delete(f"/notifications/{second.id}/delete/")
+        self.assertEqual(self._unread(), 5)
+        self.assertEqual(self.member.unread_notification_count, 2)
+
+        with self.assertNumQueries(1):
+            # Only the broadcast count, never the notifications table
+            self.client.get("/notifications/unread-count/")
+
+        self.client.patch("/notifications/mark-all-read/")
+        self.assertEqual(self._unread(), 0)
+
+    def test_mark_all_read_moves_the_broadcast_watermark(self):
+        self.client.patch("/notifications/mark-all-read/")
+        self.assertFalse(BroadcastReceipt.objects.filter(user=self.member).exists())
+        Announcement.objects.create(title="Announcement 3", description="desc", community=self.community)
+        self.assertEqual(self._unread(), 1)
+
+        results = self.client.get("/notifications/").data["results"]
+        self.assertEqual(sum(not item["is_read"] for item in results), 1)
+
+    def test_unread_broadcasts_are_counted_up_to_the_limit(self):
+        with mock.patch.object(NotificationService, "UNREAD_BROADCAST_LIMIT", 2):
+            self.assertEqual(self._unread(), self.member.unread_notification_count + 2)
+
+    def test_profile_saves_do_not_write_stale_counters_back(self):
+        stale = User.objects.get(pk=self.member.pk)
+        before = stale.unread_notification_count
+        NotificationService.create_notification(recipient=self.member, type="message", title="Late", message="")
+        stale.bio = "Edited"
+        stale.save()
+
+        self.member.refresh_from_db()
+        self.assertEqual(self.member.bio, "Edited")
+        self.assertEqual(self.member.unread_notification_count, before + 1)
+
+
+class TrackedFieldsSignalTest(TestCase):
+    def setUp(self):
+        self.community = User.objects.create_user(
+            email="comm@test.com", username="testcomm", password="password123",
+            role="community", community_name="Test Community"
+        )
+        self.student = User.objects.create_user(email="student@test.com", username="student", password="password123", role="student")
+
+    def test_user_save_diffs_role_in_memory(self):
+        user = User.objects.get(pk=self.student.pk)
+        user.last_login = timezone.now()
+        with self.assertNumQueries(1):
+            # Only the UPDATE: notify_role_change no longer re-reads the row
+            user.save(update_fields=["last_login"])
+
+        user.role = "admin"
+        user.save()
+        notification = Notification.objects.get(recipient=user, type="role_change")
+        self.assertEqual(notification.message, "Your role has been changed from student to admin.")
+
+        # The saved role is the new baseline
+        user.save()
+        self.assertEqual(Notification.objects.filter(type="role_change").count(), 1)
+
+    def test_event_update_is_diffed_against_loaded_values(self):
+        Event.objects.create(
+            community=self.community, title="Meetup", description="desc",
+            date=date(2030, 1, 1), start_time=time(10), end_time=time(12), location="Hall A"
+        )
+        event = Event.objects.get()
+        self.assertFalse(event.has_changed("location"))
+
+        event.description = "New description"
+        event.save()
+        self.assertFalse(NotificationJob.objects.exists())
+
+        event.location = "Hall B"
+        self.assertEqual((event.previous("location"), event.has_changed("location")), ("Hall A", True))
+        event.save()
+        job = NotificationJob.objects.get()
+        self.assertEqual(job.message, 'The event "Meetup" has been updated: location to Hall B.')
+
+
+class EmailOutboxTest(TestCase):
+    def test_password_reset_email_is_queued_and_sent_by_the_worker(self):
+        User.objects.create_user(email="student@test.com", username="student", password="password123", role="student")
+        queue_email("bulk@test.com", "Newsletter", "body", priority=EmailOutbox.PRIORITY_BULK)
+        response = APIClient().post("/accounts/forgot-password/", {"email": "student@test.com"})
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(mail.outbox, [])
+
+        call_command("send_outbox", "--once", stdout=StringIO())
+        # The OTP goes out ahead of the bulk mail queued before it
+        self.assertEqual([message.to for message in mail.outbox], [["student@test.com"], ["bulk@test.com"]])
+        self.assertEqual(mail.outbox[0].alternatives[0].mimetype, "text/html")
+        self.assertFalse(EmailOutbox.objects.exclude(status=EmailOutbox.STATUS_SENT).exists())
+
+        # The OTP was delivered, so the outbox no longer holds it; the newsletter keeps its body
+        otp = EmailOutbox.objects.get(to_email="student@test.com")
+        self.assertTrue(otp.sensitive)
+        self.assertEqual((otp.body_text, otp.body_html), (REDACTED, ""))
+        self.assertEqual(EmailOutbox.objects.get(to_email="bulk@test.com").body_text, "body")
+
+        # Sent rows are purged once past retention
+        self.assertEqual(purge_sent(), 0)
+        self.assertEqual(purge_sent(now=timezone.now() + timedelta(days=31)), 2)
+
+    @override_settings(EMAIL_OUTBOX={"DOMAIN_RATE_LIMITS": {"slow.com": 2}})
+    def test_domain_rate_limit_defers_without_spending_attempts(self):
+        queue_email([f"user{i}@slow.com" for i in range(3)] + ["user@fast.com"], "Hello", "body")
+        self.assertEqual(send_pending(), (3, 0))
+        deferred = EmailOutbox.objects.get(status=EmailOutbox.STATUS_PENDING)
+        self.assertEqual((deferred.domain, deferred.attempts), ("slow.com", 0))
+        self.assertGreater(deferred.next_attempt_at, timezone.now())
+
+    def test_failures_back_off_then_give_up(self):
+        # A header newline makes the backend refuse the message; the rest of the batch still goes out
+        broken, ok = queue_email(["broken@test.com", "ok@test.com"], "Broken", "body")
+        EmailOutbox.objects.filter(pk=broken.pk).update(subject="Broken\nheader", max_attempts=2)
+        self.assertEqual(send_pending(), (1, 1))
+        broken.refresh_from_db()
+        self.assertEqual((broken.status, broken.attempts), (EmailOutbox.STATUS_PENDING, 1))
+        self.assertIn("BadHeaderError", broken.last_error)
+
+        EmailOutbox.objects.filter(pk=broken.pk).update(next_attempt_at=timezone.now())
+        self.assertEqual(send_pending(), (0, 1))
+        broken.refresh_from_db()
+        self.assertEqual(broken.status, EmailOutbox.STATUS_FAILED)
+        self.assertEqual(len(mail.outbox), 1)
@@ -1,6 +1,9 @@
 from django.urls import path
 from .views import (
     NotificationListView, 
+    UnreadNotificationCountView,
+    notification_stream,
+    NotificationStreamTicketView,
     MarkNotificationReadView, 
     MarkAllReadView, 
     DeleteNotificationView
@@ -8,6 +11,9 @@ from .views import (
 
 urlpatterns = [
     path('', NotificationListView.as_view(), name='notification-list'),
+    path('unread-count/', UnreadNotificationCountView.as_view(), name='unread-count'),
+    path('stream/', notification_stream, name='notification-stream'),
+    path('stream/ticket/', NotificationStreamTicketView.as_view(), name='notification-stream-ticket'),
     path('<uuid:pk>/read/', MarkNotificationReadView.as_view(), name='mark-read'),
     path('mark-all-read/', MarkAllReadView.as_view(), name='mark-all-read'),
     path('<uuid:pk>/delete/', DeleteNotificationView.as_view(), name='delete-notification'),
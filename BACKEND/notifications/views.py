@@ -1,11 +1,30 @@
+import asyncio
+import heapq
+import time
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse, StreamingHttpResponse
 from rest_framework import generics, status
+from rest_framework.exceptions import ValidationError
+from accounts.authentication import PrincipalJWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
-from .models import Notification
-from .serializers import NotificationSerializer
+from .models import Notification, BroadcastNotification
+from .serializers import NotificationSerializer, BroadcastNotificationSerializer
+from .services import NotificationService
+from .realtime import (
+    OVERFLOW, build_event, channels_for, get_backend, get_stream_settings, issue_stream_ticket, redeem_stream_ticket,
+)
+from utils.pagination import encode_cursor, decode_cursor, after_cursor, get_cursor_page_size, cursor_page
 
 class NotificationListView(generics.ListAPIView):
+    """
+    Personal notifications merged with the broadcasts addressed to the user, newest first.
+    Keyset-paginated over (created_at, id): ?cursor=<next_cursor>&page_size=<n>.
+    """
     serializer_class = NotificationSerializer
     permission_classes = [IsAuthenticated]
 
@@ -15,23 +34,54 @@ class NotificationListView(generics.ListAPIView):
             is_deleted=False
         ).select_related('actor')
 
+    def list(self, request, *args, **kwargs):
+        cursor = decode_cursor(request.query_params.get('cursor'))
+        page_size = get_cursor_page_size(request)
+
+        personal = self.get_queryset()
+        broadcasts = NotificationService.broadcasts_for(request.user).select_related('actor')
+        if cursor:
+            personal = personal.filter(after_cursor(cursor))
+            broadcasts = broadcasts.filter(after_cursor(cursor))
+        # Each side can fill the page on its own, so take page_size + 1 from both and merge
+        personal = personal.order_by('-created_at', '-id')[:page_size + 1]
+        broadcasts = broadcasts.order_by('-created_at', '-id')[:page_size + 1]
+        merged = list(heapq.merge(personal, broadcasts, key=lambda item: (item.created_at, item.id), reverse=True))
+
+        page = merged[:page_size]
+        next_cursor = encode_cursor(page[-1].created_at, page[-1].id) if len(merged) > page_size else None
+        context = self.get_serializer_context()
+        results = [
+            (BroadcastNotificationSerializer if isinstance(item, BroadcastNotification) else NotificationSerializer)(item, context=context).data
+            for item in page
+        ]
+        return Response(cursor_page(request, results, next_cursor))
+
+class UnreadNotificationCountView(APIView):
+    """Badge count for polling: reads the per-user counter, not the notifications table."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        return Response({"unread_count": NotificationService.unread_count(request.user)})
+
 class MarkNotificationReadView(APIView):
     permission_classes = [IsAuthenticated]
 
     def patch(self, request, pk):
         try:
             notification = Notification.objects.get(pk=pk, recipient=request.user)
-            notification.is_read = True
-            notification.save()
+            NotificationService.mark_read(notification)
             return Response({"status": "read"})
         except Notification.DoesNotExist:
+            if NotificationService.update_broadcast_receipt(request.user, pk, is_read=True):
+                return Response({"status": "read"})
             return Response(status=status.HTTP_404_NOT_FOUND)
 
 class MarkAllReadView(APIView):
     permission_classes = [IsAuthenticated]
 
     def patch(self, request):
-        Notification.objects.filter(recipient=request.user, is_read=False).update(is_read=True)
+        NotificationService.mark_all_read(request.user)
         return Response({"status": "all marked as read"})
 
 class DeleteNotificationView(APIView):
@@ -40,8 +90,128 @@ class DeleteNotificationView(APIView):
     def delete(self, request, pk):
         try:
             notification = Notification.objects.get(pk=pk, recipient=request.user)
-            notification.is_deleted = True
-            notification.save()
+            NotificationService.delete(notification)
             return Response(status=status.HTTP_204_NO_CONTENT)
         except Notification.DoesNotExist:
+            if NotificationService.update_broadcast_receipt(request.user, pk, is_deleted=True):
+                return Response(status=status.HTTP_204_NO_CONTENT)
             return Response(status=status.HTTP_404_NOT_FOUND)
+
+
+# -----------------------
+# PUSH CHANNEL (SSE)
+# -----------------------
+# Events missed while disconnected that are replayed on reconnect (older ones: reload the list)
+STREAM_REPLAY_LIMIT = 100
+
+
+class NotificationStreamTicketView(APIView):
+    """
+    POST /notifications/stream/ticket/ - a single-use ticket for opening the stream:
+    GET /notifications/stream/?ticket=<ticket>. The stream lasts as long as the access token.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        token = request.auth
+        if token is not None and "exp" in token:
+            expires_at = token["exp"]
+        else:
+            expires_at = int(time.time() + jwt_settings.ACCESS_TOKEN_LIFETIME.total_seconds())
+        return Response({"ticket": issue_stream_ticket(request.user, expires_at)})
+
+
+def _ticket_user(ticket):
+    claims = redeem_stream_ticket(ticket)
+    if claims is None:
+        return None
+    user = get_user_model().objects.select_related("membership").filter(pk=claims["user"], is_active=True).first()
+    if user is None or user.token_version != claims["ver"]:
+        return None
+    return user, claims["exp"]
+
+
+def _stream_user(request):
+    """
+    (user, channels, token expiry) from the Authorization header's JWT, or from ?ticket= since
+    EventSource cannot set headers. None if neither authenticates.
+    """
+    auth = PrincipalJWTAuthentication()
+    header = auth.get_header(request)
+    raw_token = auth.get_raw_token(header) if header else None
+    try:
+        if raw_token:
+            validated_token = auth.get_validated_token(raw_token)
+            user, expires_at = auth.get_user(validated_token), validated_token["exp"]
+        elif request.GET.get('ticket'):
+            authenticated = _ticket_user(request.GET['ticket'])
+            if authenticated is None:
+                return None
+            user, expires_at = authenticated
+        else:
+            return None
+    except (InvalidToken, TokenError, AuthenticationFailed):
+        # Malformed or expired tokens, and inactive or deleted users
+        return None
+    # Resolve the channels here too, while we are in a sync thread
+    return user, channels_for(user), expires_at
+
+
+def _format_event(event):
+    return f"id: {event['id']}\nevent: notification\ndata: {event['data']}\n\n"
+
+
+async def _event_stream(user, channels, resume_from, expires_at):
+    config = get_stream_settings()
+    # Subscribe before replaying so nothing published in between is missed
+    subscription = get_backend().subscribe(channels)
+    try:
+        yield "retry: 5000\n\n"
+        last_sent = resume_from
+        if resume_from:
+            missed = await sync_to_async(NotificationService.newer_than)(user, resume_from, STREAM_REPLAY_LIMIT)
+            for item in missed:
+                yield _format_event(await sync_to_async(build_event)(item))
+                last_sent = (item.created_at, item.id)
+
+        while True:
+            remaining = expires_at - time.time()
+            if remaining <= 0:
+                # The token it was opened with expired: the client reconnects with a fresh one
+                return
+            try:
+                event = await asyncio.wait_for(subscription.get(), timeout=min(config['HEARTBEAT_SECONDS'], remaining))
+            except asyncio.TimeoutError:
+                # Keeps proxies from closing an idle connection
+                yield ": heartbeat\n\n"
+                continue
+            if event is OVERFLOW:
+                # Too slow to keep up: end the stream, the client resumes from its Last-Event-ID
+                return
+            if last_sent and decode_cursor(event['id']) <= last_sent:
+                # Already sent by the replay
+                continue
+            yield _format_event(event)
+    finally:
+        subscription.close()
+
+
+async def notification_stream(request):
+    """
+    GET /notifications/stream/ - Server-Sent Events with the user's new notifications.
+    Serve it from the ASGI app: every open stream holds a connection, not a worker thread.
+    """
+    authenticated = await sync_to_async(_stream_user)(request)
+    if authenticated is None:
+        return HttpResponse(status=401)
+    user, channels, expires_at = authenticated
+
+    try:
+        resume_from = decode_cursor(request.headers.get('Last-Event-ID') or request.GET.get('last_event_id'))
+    except ValidationError:
+        resume_from = None
+
+    response = StreamingHttpResponse(_event_stream(user, channels, resume_from, expires_at), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,147 @@
+import math
+import tracemalloc
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIClient
+from accounts.tokens import get_tokens_for_user
+from communities.models import CommunityMembership
+from contents.models import Post
+from discussion.models import DiscussionPanel
+from notifications.models import Notification
+
+User = get_user_model()
+
+
+"""
+    In-process benchmark of the hot endpoints, run through APIClient against a seeded database
+    (`manage.py seed_scale`) by `manage.py benchmark`. Requests carry real JWTs, so authentication
+    is measured too. Per endpoint and viewer role it records:
+        p50_ms / p95_ms   server time from RequestMetricsMiddleware (utils/instrumentation.py)
+        queries           SQL statements of one request
+        peak_kib          peak Python allocation of one request, from tracemalloc (a separate run,
+                          since tracing slows everything down)
+    compare() checks a run against a stored baseline: any extra query is a regression, latency
+    and memory get a relative tolerance plus an absolute slack to ride out noise.
+"""
+
+ROLES = ["anonymous", "student", "member", "representative", "community"]
+
+# (URL name, URL kwargs from the resolved targets, query string)
+ENDPOINTS = [
+    ("feed-list", None, {}),
+    ("post-list", None, {}),
+    ("discussion-list", None, {}),
+    ("event-list", None, {}),
+    ("vacancy-list", None, {}),
+    ("community-analytics", lambda targets: {"pk": targets["community"].pk}, {}),
+    ("community-dashboard", lambda targets: {"pk": targets["community"].pk}, {}),
+    ("user-profile-detail", lambda targets: {"pk": targets["member"].pk}, {}),
+    ("global-search", None, {"q": "seed"}),
+    ("notification-list", None, {}),
+]
+
+DEFAULT_TOLERANCE = 0.25
+LATENCY_SLACK_MS = 2.0
+MEMORY_SLACK_KIB = 64
+
+
+def find_viewers():
+    """
+    One account per role, from the busiest community so the lists are as full as they get.
+    Missing roles are None (anonymous always is).
+    """
+    community = User.objects.filter(role="community", status="active").order_by("-member_count", "username").first()
+    members = CommunityMembership.objects.filter(community=community, user__status="active").select_related("user").order_by("user__username")
+    member = members.filter(role="member").first()
+    representative = members.filter(role="representative").first()
+    return {
+        "anonymous": None,
+        "student": User.objects.filter(role="student", status="active", membership__isnull=True).order_by("username").first(),
+        "member": member.user if member else None,
+        "representative": representative.user if representative else None,
+        "community": community,
+    }
+
+
+def client_for(user):
+    client = APIClient()
+    if user is not None:
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {get_tokens_for_user(user).access_token}")
+    return client
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    return ordered[max(math.ceil(pct / 100 * len(ordered)) - 1, 0)]
+
+
+def measure(client, url, params, iterations, warmup):
+    for _ in range(warmup):
+        client.get(url, params)
+
+    timings = []
+    for _ in range(iterations):
+        response = client.get(url, params)
+        metrics = getattr(response, "request_metrics", None)
+        if metrics is None:
+            raise RuntimeError("The benchmark needs utils.instrumentation.RequestMetricsMiddleware in MIDDLEWARE.")
+        timings.append(metrics.total_ms)
+
+    tracemalloc.start()
+    try:
+        client.get(url, params)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "status": response.status_code,
+        "queries": metrics.queries,
+        "p50_ms": round(percentile(timings, 50), 2),
+        "p95_ms": round(percentile(timings, 95), 2),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def run(targets, iterations=20, warmup=3, endpoints=None, roles=None):
+    """{endpoint: {role: measurement}} for the selected endpoints and roles."""
+    results = {}
+    for name, url_kwargs, params in ENDPOINTS:
+        if endpoints and name not in endpoints:
+            continue
+        url = reverse(name, kwargs=url_kwargs(targets) if url_kwargs else None)
+        for role in roles or ROLES:
+            client = client_for(targets[role])
+            results.setdefault(name, {})[role] = measure(client, url, params, iterations, warmup)
+    return results
+
+
+def dataset_summary():
+    """Row counts that identify the dataset; numbers from different datasets do not compare."""
+    return {
+        "users": User.objects.count(),
+        "posts": Post.objects.count(),
+        "discussions": DiscussionPanel.objects.count(),
+        "notifications": Notification.objects.count(),
+    }
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Regressions against the baseline's results, as readable lines. New endpoints or roles are not regressions."""
+    regressions = []
+    for name, roles in results.items():
+        for role, current in roles.items():
+            before = baseline.get(name, {}).get(role)
+            if before is None:
+                continue
+            label = f"{name} [{role}]"
+            if current["status"] != before["status"]:
+                regressions.append(f"{label}: status {before['status']} -> {current['status']}")
+            if current["queries"] > before["queries"]:
+                regressions.append(f"{label}: {before['queries']} -> {current['queries']} queries")
+            if current["p95_ms"] > before["p95_ms"] * (1 + tolerance) + LATENCY_SLACK_MS:
+                regressions.append(f"{label}: p95 {before['p95_ms']}ms -> {current['p95_ms']}ms")
+            if current["peak_kib"] > before["peak_kib"] * (1 + tolerance) + MEMORY_SLACK_KIB:
+                regressions.append(f"{label}: peak memory {before['peak_kib']}KiB -> {current['peak_kib']}KiB")
+    return regressions
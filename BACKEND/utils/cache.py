@@ -0,0 +1,215 @@
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.apps import apps as django_apps
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+
+"""
+    Versioned read-through cache for the hot read endpoints.
+    Every cached value depends on one or more namespaces ("community:<id>", "events:global", ...),
+    each with a version number stored in the cache. The value's key embeds the versions it was
+    built from, so invalidating is bumping a version: old entries are never read again and
+    expire on their own. The post_save/post_delete receivers of INVALIDATIONS bump the namespaces
+    a row belongs to, once right away and once on commit (a reader between the two may have
+    cached the uncommitted state under the new version).
+    A miss is computed by one worker at a time per key (a lock in the cache); the others wait
+    for its result, so an invalidated hot key does not stampede the database.
+    Versions only invalidate across workers when they share the cache, so the read cache is off
+    on a per-process backend (LocMemCache) unless READ_CACHE["ENABLED"] turns it on explicitly,
+    e.g. for a single process.
+    Hits, misses and waits are counted per cache name (cache_stats()) and per request, which
+    RequestMetricsMiddleware logs. Counters moved by F() updates (utils/counters.py) send no
+    signal: cached counts may lag by up to READ_CACHE["TIMEOUT"].
+"""
+
+COMMUNITIES = "communities:global"
+EVENTS = "events:global"
+ANNOUNCEMENTS = "announcements:global"
+
+# Cache backends whose entries live in one process
+PROCESS_LOCAL_CACHES = {"django.core.cache.backends.locmem.LocMemCache"}
+
+# User fields no cached response shows; saving only these does not invalidate anything
+SILENT_USER_FIELDS = {"last_login"}
+
+_MISSING = object()
+_stats_lock = threading.Lock()
+_stats = defaultdict(Counter)
+_request_stats = ContextVar("cache_request_stats", default=None)
+
+
+def is_process_local(alias="default"):
+    return settings.CACHES[alias]["BACKEND"] in PROCESS_LOCAL_CACHES
+
+
+def get_cache_settings():
+    options = {"ENABLED": None, "ALIAS": "default", "TIMEOUT": 300, "LOCK_TIMEOUT": 10, "LOCK_WAIT": 5, **getattr(settings, "READ_CACHE", {})}
+    if options["ENABLED"] is None:
+        # Default: on when every worker sees the same versions
+        options["ENABLED"] = not is_process_local(options["ALIAS"])
+    return options
+
+
+def get_cache():
+    return caches[get_cache_settings()["ALIAS"]]
+
+
+def community_namespace(community_id):
+    return f"community:{community_id}"
+
+
+def _version_key(namespace):
+    return f"cachever:{namespace}"
+
+
+def get_versions(namespaces):
+    """Current version of each namespace, in one round trip. A lost version restarts from the clock, never from an old number."""
+    cache = get_cache()
+    keys = {namespace: _version_key(namespace) for namespace in namespaces}
+    found = cache.get_many(keys.values())
+    versions = {}
+    for namespace, key in keys.items():
+        if key not in found:
+            cache.add(key, time.time_ns(), None)
+            found[key] = cache.get(key)
+        versions[namespace] = found[key]
+    return versions
+
+
+def bump(*namespaces):
+    """Invalidates everything cached under the namespaces, now and again when the transaction commits."""
+    def bump_now():
+        cache = get_cache()
+        for namespace in namespaces:
+            try:
+                cache.incr(_version_key(namespace))
+            except ValueError:
+                cache.set(_version_key(namespace), time.time_ns(), None)
+
+    bump_now()
+    transaction.on_commit(bump_now)
+
+
+def _record(name, event):
+    with _stats_lock:
+        _stats[name][event] += 1
+    request_stats = _request_stats.get()
+    if request_stats is not None:
+        request_stats[event] += 1
+
+
+def cache_stats():
+    """{cache name: {"hits", "misses", "waits"}} since the process started (or the last reset)."""
+    with _stats_lock:
+        return {name: {event: counts[event] for event in ("hits", "misses", "waits")} for name, counts in _stats.items()}
+
+
+def reset_cache_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+@contextmanager
+def recording():
+    """Counts the hits, misses and waits of the code inside, e.g. one request."""
+    counts = Counter()
+    token = _request_stats.set(counts)
+    try:
+        yield counts
+    finally:
+        _request_stats.reset(token)
+
+
+def read_through(name, namespaces, compute, parts=(), timeout=None):
+    """
+    The cached value of `compute()` for this name, namespaces and extra key parts (e.g. the
+    request URL), computing and storing it on a miss. Exceptions are not cached.
+    """
+    options = get_cache_settings()
+    if not options["ENABLED"]:
+        return compute()
+
+    cache = get_cache()
+    versions = get_versions(namespaces)
+    key = ":".join(["cache", name, *(f"{ns}={versions[ns]}" for ns in namespaces), *map(str, parts)])
+    value = cache.get(key, _MISSING)
+    if value is not _MISSING:
+        _record(name, "hits")
+        return value
+
+    _record(name, "misses")
+    lock_key = f"{key}:lock"
+    if not cache.add(lock_key, 1, options["LOCK_TIMEOUT"]):
+        # Another worker is building it: wait for its result rather than running the same queries
+        _record(name, "waits")
+        deadline = time.monotonic() + options["LOCK_WAIT"]
+        while time.monotonic() < deadline:
+            time.sleep(0.02)
+            value = cache.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+            if cache.get(lock_key) is None:
+                break
+        return compute()
+
+    try:
+        value = compute()
+        cache.set(key, value, options["TIMEOUT"] if timeout is None else timeout)
+    finally:
+        cache.delete(lock_key)
+    return value
+
+
+def request_key(request):
+    """Key part for responses that depend on the URL; absolute media URLs depend on the host too."""
+    return f"{request.get_host()}{request.get_full_path()}"
+
+
+# Invalidation: the namespaces a saved or deleted row belongs to
+
+def _user_namespaces(user, update_fields=None):
+    if update_fields and set(update_fields) <= SILENT_USER_FIELDS:
+        return []
+    if user.role == "community":
+        return [community_namespace(user.pk), COMMUNITIES]
+    # A member's profile shows in their community's member list
+    CommunityMembership = django_apps.get_model("communities.CommunityMembership")
+    community_id = CommunityMembership.objects.filter(user_id=user.pk).values_list("community_id", flat=True).first()
+    return [community_namespace(community_id)] if community_id else []
+
+
+# (model, function(instance, update_fields) -> namespaces to bump)
+INVALIDATIONS = [
+    ("accounts.User", _user_namespaces),
+    ("communities.CommunityMembership", lambda membership, _: [community_namespace(membership.community_id), COMMUNITIES]),
+    ("contents.Announcement", lambda announcement, _: [community_namespace(announcement.community_id), ANNOUNCEMENTS]),
+    ("contents.Resource", lambda resource, _: [community_namespace(resource.community_id)]),
+    ("events.Event", lambda event, _: [community_namespace(event.community_id), EVENTS]),
+    ("discussion.DiscussionPanel", lambda panel, _: [community_namespace(panel.community_id)] if panel.community_id else []),
+]
+
+
+def _make_receiver(namespaces_for):
+    def invalidate(sender, instance, update_fields=None, **kwargs):
+        namespaces = namespaces_for(instance, update_fields)
+        if namespaces:
+            bump(*namespaces)
+    return invalidate
+
+
+def connect_cache_invalidation():
+    for label, namespaces_for in INVALIDATIONS:
+        concrete = django_apps.get_model(label)
+        receiver = _make_receiver(namespaces_for)
+        # Proxies send model signals under their own class (the admin saves communities as CommunityUser)
+        for model in django_apps.get_models():
+            if model._meta.concrete_model is concrete:
+                uid = f"read_cache:{model._meta.label}"
+                post_save.connect(receiver, sender=model, weak=False, dispatch_uid=uid)
+                post_delete.connect(receiver, sender=model, weak=False, dispatch_uid=uid)
@@ -0,0 +1,80 @@
+from django.apps import apps as django_apps
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+from django.db.models.signals import post_save, post_delete
+
+
+"""
+    Denormalized engagement counters.
+    Each counter column is kept in step by an atomic F() update when a child row is
+    created or deleted (which includes the like/unlike toggles), and `manage.py recount`
+    recomputes them from the child tables to repair drift.
+"""
+
+# (model with the counter, counter field, child model, child FK pointing at the counted row)
+COUNTERS = [
+    ("discussion.DiscussionPanel", "reply_count", "discussion.DiscussionReply", "topic"),
+    ("discussion.DiscussionPanel", "reaction_count", "discussion.Reaction", "topic"),
+    ("contents.Post", "comment_count", "contents.PostComment", "post"),
+    ("contents.Post", "reaction_count", "contents.PostReaction", "post"),
+    ("contents.PostComment", "reaction_count", "contents.PostReaction", "comment"),
+    ("events.Event", "registered_count", "events.EventRegistration", "event"),
+    ("communities.CommunityVacancy", "applicant_count", "communities.VacancyApplication", "vacancy"),
+    ("accounts.User", "member_count", "communities.CommunityMembership", "community"),
+]
+BATCH_SIZE = 1000
+
+
+def adjust_counter(model, pk, field, delta):
+    """Atomically moves a counter column by delta, never below zero."""
+    if pk is None:
+        return
+    model.objects.filter(pk=pk).update(**{field: Greatest(F(field) + delta, 0)})
+
+
+def _make_receivers(model, field, fk):
+    attname = f"{fk}_id"
+
+    def on_save(sender, instance, created, **kwargs):
+        if created:
+            adjust_counter(model, getattr(instance, attname), field, 1)
+
+    def on_delete(sender, instance, **kwargs):
+        adjust_counter(model, getattr(instance, attname), field, -1)
+
+    return on_save, on_delete
+
+
+def connect_counters():
+    for model_label, field, child_label, fk in COUNTERS:
+        model = django_apps.get_model(model_label)
+        child = django_apps.get_model(child_label)
+        on_save, on_delete = _make_receivers(model, field, fk)
+        uid = f"counter:{model_label}.{field}"
+        post_save.connect(on_save, sender=child, weak=False, dispatch_uid=uid)
+        post_delete.connect(on_delete, sender=child, weak=False, dispatch_uid=uid)
+
+
+def recount(apps=django_apps, models=None, fix=True):
+    """
+    Recomputes counters from the child tables.
+    Returns {"model.field": number of rows that had drifted}; with fix=True they are corrected.
+    `apps` can be a migration's historical registry, `models` limits which counter models run.
+    """
+    drift = {}
+    for model_label, field, child_label, fk in COUNTERS:
+        if models and model_label not in models:
+            continue
+        model = apps.get_model(model_label)
+        child = apps.get_model(child_label)
+
+        actual = child.objects.filter(**{fk: OuterRef("pk")}).order_by().values(fk).annotate(total=Count("pk")).values("total")
+        actual = Coalesce(Subquery(actual, output_field=IntegerField()), 0)
+
+        drifted = model.objects.annotate(actual_count=actual).exclude(**{field: F("actual_count")})
+        drifted_ids = list(drifted.values_list("pk", flat=True))
+        drift[f"{model_label}.{field}"] = len(drifted_ids)
+        if fix:
+            for start in range(0, len(drifted_ids), BATCH_SIZE):
+                model.objects.filter(pk__in=drifted_ids[start:start + BATCH_SIZE]).update(**{field: actual})
+    return drift
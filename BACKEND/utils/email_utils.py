@@ -1,12 +1,18 @@
-from django.core.mail import EmailMultiAlternatives
 from django.template.loader import render_to_string
 from django.utils.html import strip_tags
-from django.conf import settings
 
-def send_branded_email(subject, to_email, context):
+
+def render_branded_email(context):
+    """Renders the HCKonnect email template. Returns (html, plain text fallback)."""
+    html_content = render_to_string('emails/branded_email.html', context)
+    return html_content, strip_tags(html_content)
+
+
+def queue_branded_email(subject, to_email, context, priority=None, sensitive=False):
     """
-    Sends a branded HTML email using the HCKonnect template.
-    
+    Queues a branded HTML email in the outbox; `manage.py send_outbox` delivers it.
+    Call it inside the transaction of the change the email is about.
+
     Args:
         subject (str): Email subject.
         to_email (str or list): Recipient email or list of emails.
@@ -15,27 +21,15 @@ def send_branded_email(subject, to_email, context):
                         - message: The main body text (HTML safe)
                         - button_text: Text for the CTA button (optional)
                         - button_url: URL for the CTA button (optional)
+        priority (int): EmailOutbox.PRIORITY_*; lower is sent first.
+        sensitive (bool): The email carries credentials; its body is blanked once sent.
     """
-    
-    # Ensure to_email is a list
-    if isinstance(to_email, str):
-        to_email = [to_email]
-
-    html_content = render_to_string('emails/branded_email.html', context)
-    text_content = strip_tags(html_content)  # Fallback for plain text clients
+    from notifications.models import EmailOutbox
+    from notifications.outbox import queue_email
 
-    email = EmailMultiAlternatives(
-        subject=subject,
-        body=text_content,
-        from_email=settings.DEFAULT_FROM_EMAIL,
-        to=to_email
+    html_content, text_content = render_branded_email(context)
+    return queue_email(
+        to_email, subject, text_content, html_content,
+        priority=EmailOutbox.PRIORITY_NORMAL if priority is None else priority,
+        sensitive=sensitive
     )
-    email.attach_alternative(html_content, "text/html")
-    
-    try:
-        email.send()
-        print(f"Email '{subject}' sent successfully to {to_email}")
-        return True
-    except Exception as e:
-        print(f"Failed to send email: {e}")
-        return False
@@ -0,0 +1,39 @@
+import hashlib
+import mimetypes
+import os
+
+
+"""
+    Metadata of uploaded files, read once while the upload is still in memory (or in its
+    temporary file) so that listing pages never have to ask the remote storage for it.
+"""
+
+
+def file_extension(name):
+    """Lower-case extension without the dot; "file" for names whose suffix is not a real extension."""
+    ext = os.path.splitext(name or "")[1][1:].lower()
+    if len(ext) > 10:
+        return "file"
+    return ext
+
+
+def file_metadata(file, content_type=None):
+    """
+    size_bytes, extension, mime_type and a sha256 content_hash of a Django File
+    (an UploadedFile, or a stored file opened for a backfill). Reads the content once.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    file.seek(0)
+    for chunk in file.chunks():
+        digest.update(chunk)
+        size += len(chunk)
+    file.seek(0)
+
+    mime_type = mimetypes.guess_type(file.name or "")[0] or content_type or "application/octet-stream"
+    return {
+        "size_bytes": size,
+        "extension": file_extension(file.name),
+        "mime_type": mime_type,
+        "content_hash": digest.hexdigest(),
+    }
@@ -0,0 +1,208 @@
+import io
+import logging
+import os
+from django.apps import apps as django_apps
+from django.core.files.base import ContentFile
+from django.db.models.signals import pre_save
+from django.dispatch import Signal
+from PIL import Image, ImageOps, UnidentifiedImageError
+from rest_framework.serializers import Field
+
+logger = logging.getLogger(__name__)
+
+
+"""
+    Resized derivatives of uploaded images (feed images, avatars, logos).
+    Each image field in IMAGE_FIELDS has a JSON sibling `<field>_variants`. Uploading a new file
+    clears it (pre_save), and `manage.py generate_image_derivatives` later fills it off the
+    request path: for every size in IMAGE_SIZES a WebP and a JPEG/PNG fallback are written next
+    to the original through the field's storage, and their URLs recorded as
+        {"source": <file name>, "width": w, "height": h,
+         "sizes": {"thumb": {"width": 160, "height": 160, "webp": url, "fallback": url}, ...}}
+    Read serializers pick the smallest variant wide enough for where the image is shown
+    (ResponsiveImageField) and fall back to the original until the variants exist.
+"""
+
+# (model label, image field)
+IMAGE_FIELDS = [
+    ("contents.Post", "image"),
+    ("contents.Announcement", "image"),
+    ("events.Event", "image"),
+    ("accounts.User", "profile_image"),
+    ("accounts.User", "community_logo"),
+]
+
+# name: (width, square crop). Sizes wider than the original are skipped, except the thumb
+IMAGE_SIZES = {
+    "thumb": (160, True),
+    "small": (640, False),
+    "large": (1280, False),
+}
+
+# Display widths the read serializers ask for
+AVATAR_WIDTH = 96
+CARD_WIDTH = 640
+
+WEBP_QUALITY = 80
+JPEG_QUALITY = 82
+
+# Sent (sender=model, instance, field) once variants are recorded, for caches of rendered
+# cards; the variants are written with a queryset update, so post_save does not fire.
+image_variants_ready = Signal()
+
+
+def variants_field(field):
+    return f"{field}_variants"
+
+
+def _clear_stale_variants(sender, instance, **kwargs):
+    """A new upload makes the recorded variants stale; the worker regenerates them."""
+    for label, field in IMAGE_FIELDS:
+        if sender._meta.label != label:
+            continue
+        variants = getattr(instance, variants_field(field))
+        file = getattr(instance, field)
+        if variants and variants.get("source") != (file.name if file else None):
+            setattr(instance, variants_field(field), {})
+
+
+def connect_image_derivatives():
+    for model in {django_apps.get_model(label) for label, _ in IMAGE_FIELDS}:
+        pre_save.connect(_clear_stale_variants, sender=model, dispatch_uid=f"image_variants_{model._meta.label}")
+
+
+def pending_images(label, field):
+    """Rows of a registered model whose image has no variants recorded yet."""
+    model = django_apps.get_model(label)
+    return model.objects.exclude(**{field: ""}).exclude(**{f"{field}__isnull": True}).filter(**{variants_field(field): {}})
+
+
+def _encode(image, fmt):
+    buffer = io.BytesIO()
+    if fmt == "webp":
+        image.save(buffer, "WEBP", quality=WEBP_QUALITY, method=4)
+    elif fmt == "png":
+        image.save(buffer, "PNG", optimize=True)
+    else:
+        image.convert("RGB").save(buffer, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+    return buffer.getvalue()
+
+
+def render_variants(source):
+    """Resizes an open image file. Returns (original (width, height), {size name: resized image})."""
+    with Image.open(source) as opened:
+        image = ImageOps.exif_transpose(opened)
+        image.load()
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if image.mode in ("LA", "PA") or "transparency" in image.info else "RGB")
+
+    resized = {}
+    for name, (width, square) in IMAGE_SIZES.items():
+        if square:
+            variant = ImageOps.fit(image, (width, width), Image.Resampling.LANCZOS)
+        elif width < image.width:
+            variant = image.copy()
+            variant.thumbnail((width, image.height), Image.Resampling.LANCZOS)
+        else:
+            continue
+        resized[name] = variant
+    return image.size, resized
+
+
+def generate_derivatives(instance, field):
+    """
+    Writes the variants of one instance's image and records them, unless the image was replaced
+    meanwhile. Returns False when the file is not a readable image (recorded, so not retried).
+    Storage errors propagate, leaving the row pending for the next run.
+    """
+    file = getattr(instance, field)
+    source_name = file.name
+    storage = file.storage
+    stem, _ = os.path.splitext(source_name)
+    folder, base = os.path.split(stem)
+
+    try:
+        with file.open("rb") as source:
+            (width, height), resized = render_variants(io.BytesIO(source.read()))
+    except (UnidentifiedImageError, OSError, ValueError) as e:
+        variants = {"source": source_name, "error": str(e)[:200], "sizes": {}}
+        ok = False
+    else:
+        sizes = {}
+        for name, image in resized.items():
+            fallback = "png" if image.mode == "RGBA" else "jpeg"
+            urls = {}
+            for key, fmt in (("webp", "webp"), ("fallback", fallback)):
+                extension = "jpg" if fmt == "jpeg" else fmt
+                saved = storage.save(os.path.join(folder, "derivatives", f"{base}_{name}.{extension}"), ContentFile(_encode(image, fmt)))
+                urls[key] = storage.url(saved)
+            sizes[name] = {"width": image.width, "height": image.height, **urls}
+        variants = {"source": source_name, "width": width, "height": height, "sizes": sizes}
+        ok = True
+
+    # Conditional on the file name: a newer upload's (empty) variants are never overwritten
+    recorded = type(instance).objects.filter(pk=instance.pk, **{field: source_name}).update(**{variants_field(field): variants})
+    setattr(instance, variants_field(field), variants)
+    if recorded and ok:
+        image_variants_ready.send(sender=type(instance), instance=instance, field=field)
+    return ok
+
+
+def generate_pending(limit=None):
+    """Generates variants for every image still missing them. Returns (generated, failed)."""
+    generated = failed = 0
+    for label, field in IMAGE_FIELDS:
+        for instance in pending_images(label, field).order_by("pk").iterator(chunk_size=100):
+            if limit is not None and generated + failed >= limit:
+                return generated, failed
+            try:
+                if generate_derivatives(instance, field):
+                    generated += 1
+                else:
+                    failed += 1
+            except Exception:
+                logger.exception("Image variants for %s %s.%s failed", label, instance.pk, field)
+                failed += 1
+    return generated, failed
+
+
+def image_url(instance, field, width, request=None, fmt="webp"):
+    """URL of the smallest variant at least `width` wide, else of the original image."""
+    file = getattr(instance, field, None) if instance is not None else None
+    if not file:
+        return None
+    url = None
+    variants = getattr(instance, variants_field(field), None) or {}
+    if variants.get("source") == file.name:
+        fitting = [size for size in variants["sizes"].values() if size["width"] >= width]
+        if fitting:
+            url = min(fitting, key=lambda size: size["width"])["webp" if fmt == "webp" else "fallback"]
+    if url is None:
+        url = file.url
+    return request.build_absolute_uri(url) if request else url
+
+
+def avatar_url(user, request=None):
+    """A user's avatar thumbnail: the logo for community accounts that have one, else the profile image."""
+    if user is None:
+        return None
+    if getattr(user, "role", "") == "community" and user.community_logo:
+        return image_url(user, "community_logo", AVATAR_WIDTH, request)
+    return image_url(user, "profile_image", AVATAR_WIDTH, request)
+
+
+class ResponsiveImageField(Field):
+    """
+    Read-only serializer field for an image shown `width` pixels wide. `source` is the
+    object holding the image (default: the serialized instance itself).
+    """
+
+    def __init__(self, image_field, width, **kwargs):
+        self.image_field = image_field
+        self.width = width
+        kwargs.setdefault("source", "*")
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return image_url(value, self.image_field, self.width, self.context.get("request"))
@@ -0,0 +1,196 @@
+import json
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from hckonnect.query_budgets import DEFAULT_QUERY_BUDGET, QUERY_BUDGETS
+from . import cache as read_cache
+
+logger = logging.getLogger("hckonnect.requests")
+
+
+"""
+    Per-request query and latency metrics, keyed by the resolved URL name (the route for
+    unnamed URLs). RequestMetricsMiddleware records for every request:
+        queries     SQL statements run, and their total time (db)
+        duplicates  statements run more than once with different parameters: N+1 candidates
+        view        time in the view, serializers included (DRF builds their data there)
+        render      time rendering the response body (DRF's JSON renderer)
+        cache       read-through cache hits, misses and waits (utils/cache.py)
+    and emits them as a Server-Timing header (settings.REQUEST_METRICS["SERVER_TIMING"]) and one
+    JSON log line on the "hckonnect.requests" logger. Requests over their query budget
+    (hckonnect/query_budgets.py) are logged as warnings; tests assert the budgets through
+    utils.testing.QueryBudgetMixin.
+"""
+
+_IN_LIST = re.compile(r"IN \((?:%s, )*%s\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def get_metrics_settings():
+    return {"SERVER_TIMING": settings.DEBUG, "DUPLICATE_THRESHOLD": 3, **getattr(settings, "REQUEST_METRICS", {})}
+
+
+def fingerprint(sql):
+    """The statement with its IN lists collapsed, so batches of different sizes compare equal."""
+    return _WHITESPACE.sub(" ", _IN_LIST.sub("IN (...)", sql)).strip()
+
+
+def endpoint_name(request):
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return None
+    return match.url_name or match.route
+
+
+def query_budget(endpoint):
+    """The endpoint's budget; None for endpoints that are not budgeted (e.g. streams)."""
+    return QUERY_BUDGETS.get(endpoint, DEFAULT_QUERY_BUDGET)
+
+
+class QueryRecorder:
+    """A database execute wrapper counting and timing every statement while `recording()`."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+        self._attached = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self.fingerprints[fingerprint(sql)] += 1
+
+    def recording(self):
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(self))
+        return stack
+
+    def attach(self):
+        """
+        Records the calling thread's connections until detach(). Connections are per thread: under
+        ASGI the sync middleware and views run in the request's worker thread, not the event loop's.
+        """
+        for connection in connections.all():
+            connection.execute_wrappers.append(self)
+            self._attached.append(connection)
+
+    def detach(self):
+        for connection in self._attached:
+            connection.execute_wrappers.remove(self)
+        self._attached = []
+
+    def duplicates(self, threshold=2):
+        return [(sql, count) for sql, count in self.fingerprints.most_common() if count >= threshold]
+
+
+class RequestMetrics:
+    def __init__(self, request, response, recorder, started, finished, cache_stats=None):
+        self.endpoint = endpoint_name(request)
+        self.method = request.method
+        self.status = response.status_code
+        self.queries = recorder.count
+        self.db_ms = recorder.duration * 1000
+        self.duplicates = recorder.duplicates(get_metrics_settings()["DUPLICATE_THRESHOLD"])
+        view_started = getattr(request, "_metrics_view_started", None)
+        render_started = getattr(request, "_metrics_render_started", None)
+        view_finished = render_started or finished
+        self.view_ms = (view_finished - view_started) * 1000 if view_started else 0.0
+        self.render_ms = (finished - render_started) * 1000 if render_started else 0.0
+        self.total_ms = (finished - started) * 1000
+        self.cache = dict(cache_stats or {})
+        self.budget = query_budget(self.endpoint)
+
+    @property
+    def over_budget(self):
+        return self.budget is not None and self.queries > self.budget
+
+    def server_timing(self):
+        return ", ".join([
+            f'db;dur={self.db_ms:.1f};desc="{self.queries} queries"',
+            f"view;dur={self.view_ms:.1f}",
+            f"render;dur={self.render_ms:.1f}",
+            f"total;dur={self.total_ms:.1f}",
+            f'cache;desc="{self.cache.get("hits", 0)} hits, {self.cache.get("misses", 0)} misses"',
+        ])
+
+    def as_log(self):
+        return {
+            "endpoint": self.endpoint,
+            "method": self.method,
+            "status": self.status,
+            "queries": self.queries,
+            "query_budget": self.budget,
+            "db_ms": round(self.db_ms, 1),
+            "view_ms": round(self.view_ms, 1),
+            "render_ms": round(self.render_ms, 1),
+            "total_ms": round(self.total_ms, 1),
+            "cache_hits": self.cache.get("hits", 0),
+            "cache_misses": self.cache.get("misses", 0),
+            "cache_waits": self.cache.get("waits", 0),
+            "duplicate_queries": [{"sql": sql[:300], "count": count} for sql, count in self.duplicates],
+        }
+
+
+class RequestMetricsMiddleware:
+    """Goes first in MIDDLEWARE, so the other middleware's queries count too. Streams are not measured."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        with recorder.recording(), read_cache.recording() as cache_stats:
+            response = self.get_response(request)
+        return self.record(request, response, recorder, started, cache_stats)
+
+    async def __acall__(self, request):
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        # Thread-sensitive calls of one request share a thread: the one its sync views run in
+        await sync_to_async(recorder.attach)()
+        try:
+            with read_cache.recording() as cache_stats:
+                response = await self.get_response(request)
+        finally:
+            await sync_to_async(recorder.detach)()
+        return self.record(request, response, recorder, started, cache_stats)
+
+    def record(self, request, response, recorder, started, cache_stats):
+        if response.streaming:
+            return response
+        metrics = RequestMetrics(request, response, recorder, started, time.perf_counter(), cache_stats)
+        response.request_metrics = metrics
+
+        if get_metrics_settings()["SERVER_TIMING"]:
+            response["Server-Timing"] = metrics.server_timing()
+        if metrics.over_budget or metrics.duplicates:
+            logger.warning(json.dumps(metrics.as_log()))
+        else:
+            logger.info(json.dumps(metrics.as_log()))
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._metrics_view_started = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        request._metrics_render_started = time.perf_counter()
+        return response
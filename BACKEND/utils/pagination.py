@@ -1,5 +1,12 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 class StandardPagination(PageNumberPagination):
     page_size = 12
@@ -30,3 +37,70 @@ class CommentPagination(PageNumberPagination):
             'previous': self.get_previous_link(),
             'results': data
         })
+
+
+# -----------------------
+# KEYSET (CURSOR) PAGINATION
+# -----------------------
+# Newest-first lists walked by a (created_at, id) cursor: every page is an index range
+# scan, so it costs the same on page 1 and page 1000 and never skips or repeats rows.
+
+def encode_cursor(created_at, id):
+    raw = json.dumps({"t": created_at.isoformat(), "id": str(id)})
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(value):
+    """Returns (created_at, id) or None; a malformed cursor is a 400."""
+    if not value:
+        return None
+    try:
+        data = json.loads(base64.urlsafe_b64decode(value.encode()).decode())
+        return datetime.fromisoformat(data["t"]), uuid.UUID(data["id"])
+    except (ValueError, TypeError, KeyError, AttributeError):
+        raise ValidationError({"cursor": "Invalid cursor."})
+
+
+def uuid_param(request, name):
+    """The query parameter as a UUID, None when absent; anything else is a 400."""
+    value = request.query_params.get(name)
+    if not value:
+        return None
+    try:
+        return uuid.UUID(value)
+    except ValueError:
+        raise ValidationError({name: "Must be a valid UUID."})
+
+
+def after_cursor(cursor, id_field="id"):
+    """Filter for the rows that come after the cursor in (-created_at, -id) order."""
+    created_at, id = cursor
+    return Q(created_at__lt=created_at) | Q(created_at=created_at, **{f"{id_field}__lt": id})
+
+
+def before_cursor(cursor, id_field="id"):
+    """Filter for the rows newer than the cursor, e.g. to catch up from a last seen item."""
+    created_at, id = cursor
+    return Q(created_at__gt=created_at) | Q(created_at=created_at, **{f"{id_field}__gt": id})
+
+
+def get_cursor_page_size(request, default=20, maximum=100):
+    try:
+        page_size = int(request.query_params.get("page_size", default))
+    except (TypeError, ValueError):
+        return default
+    if page_size < 1:
+        return default
+    return min(page_size, maximum)
+
+
+def cursor_page(request, items, next_cursor):
+    """The response body shared by the cursor-paginated endpoints."""
+    next_link = None
+    if next_cursor:
+        next_link = replace_query_param(request.build_absolute_uri(), "cursor", next_cursor)
+    return {
+        "next_cursor": next_cursor,
+        "next": next_link,
+        "results": items,
+    }
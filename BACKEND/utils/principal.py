@@ -0,0 +1,70 @@
+"""
+    The requesting user's role and community, resolved once per request.
+    Permission classes and queryset filters ask the principal instead of walking
+    user.membership.community themselves. PrincipalJWTAuthentication loads the user with its
+    membership in the same query, so building the principal costs nothing afterwards; in claims
+    mode (accounts/tokens.py) read-only requests build it from the token without any query.
+"""
+
+
+class Principal:
+    def __init__(self, user, role, status="active", membership_role=None, membership_community_id=None):
+        self.user = user
+        self.user_id = user.pk
+        self.role = role
+        self.status = status
+        self.membership_role = membership_role
+        self.membership_community_id = membership_community_id
+
+    @classmethod
+    def for_user(cls, user):
+        membership = getattr(user, "membership", None)
+        return cls(
+            user, user.role, user.status,
+            membership_role=membership.role if membership else None,
+            membership_community_id=membership.community_id if membership else None,
+        )
+
+    @property
+    def is_community(self):
+        return self.role == "community"
+
+    @property
+    def is_representative(self):
+        return self.membership_role == "representative"
+
+    @property
+    def community_id(self):
+        """The community whose private content this user may see (None for outsiders)."""
+        if self.is_community:
+            return self.user_id
+        if self.role == "student":
+            return self.membership_community_id
+        return None
+
+    @property
+    def managed_community_id(self):
+        """The community this user creates content for: its own account, or the one it represents."""
+        if self.is_community:
+            return self.user_id
+        if self.is_representative:
+            return self.membership_community_id
+        return None
+
+    def belongs_to(self, community_id):
+        return community_id is not None and str(self.community_id) == str(community_id)
+
+    def manages(self, community_id):
+        return community_id is not None and str(self.managed_community_id) == str(community_id)
+
+
+def get_principal(request):
+    """The request's Principal (None for anonymous requests), built on first use."""
+    user = getattr(request, "user", None)
+    if user is None or not user.is_authenticated:
+        return None
+    principal = getattr(request, "principal", None)
+    if principal is None or principal.user is not user:
+        principal = Principal.for_user(user)
+        request.principal = principal
+    return principal
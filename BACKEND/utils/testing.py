@@ -0,0 +1,49 @@
+import uuid
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+from django.urls.converters import UUIDConverter
+from django.views.static import serve
+from .instrumentation import query_budget
+
+
+"""
+    Test helpers for the query budgets of hckonnect/query_budgets.py.
+"""
+
+
+def iter_endpoints(patterns=None):
+    """(URL name, URLPattern) of every endpoint in the apps' urls.py (not the admin nor DEBUG media serving)."""
+    for pattern in get_resolver().url_patterns if patterns is None else patterns:
+        if isinstance(pattern, URLResolver):
+            if pattern.app_name != "admin":
+                yield from iter_endpoints(pattern.url_patterns)
+        elif isinstance(pattern, URLPattern) and pattern.callback is not serve:
+            yield pattern.name, pattern
+
+
+class QueryBudgetMixin:
+    """For TestCase classes using self.client with the RequestMetricsMiddleware installed."""
+
+    def assertWithinQueryBudget(self, response):
+        metrics = response.request_metrics
+        if metrics.over_budget:
+            duplicates = "\n".join(f"  {count}x {sql[:200]}" for sql, count in metrics.duplicates)
+            self.fail(f"{metrics.endpoint} ran {metrics.queries} queries, budget {metrics.budget}\n{duplicates}")
+
+    def assertEndpointsWithinBudget(self, kwargs=None, params=None):
+        """
+        GETs every budgeted endpoint and asserts its query count. `kwargs` gives URL kwargs by
+        URL name (random ids otherwise, which exercise the not-found paths); `params` query strings.
+        """
+        kwargs, params = kwargs or {}, params or {}
+        for name, pattern in iter_endpoints():
+            self.assertIsNotNone(name, f"{pattern.pattern} needs a URL name to be budgeted")
+            if query_budget(name) is None:
+                continue
+            url_kwargs = kwargs.get(name) or {
+                key: uuid.uuid4() if isinstance(converter, UUIDConverter) else 1
+                for key, converter in pattern.pattern.converters.items()
+            }
+            with self.subTest(endpoint=name):
+                response = self.client.get(reverse(name, kwargs=url_kwargs), params.get(name, {}))
+                self.assertLess(response.status_code, 500)
+                self.assertWithinQueryBudget(response)
@@ -0,0 +1,73 @@
+from django.db import models
+from rest_framework.serializers import ListSerializer
+from contents.models import PostReaction
+from discussion.models import Reaction as DiscussionReaction
+from events.models import EventRegistration
+from communities.models import VacancyApplication
+
+
+"""
+    Viewer flags (user_has_liked, is_registered, has_applied) for a whole page at once.
+    Every flag kind is loaded by "scope": the ids the page is made of. Comment and reply
+    likes are scoped by their post/topic, so one query covers every nested comment too.
+"""
+
+# kind: (model holding the viewer's rows, field with the flagged id, field to load by)
+FLAG_KINDS = {
+    "post_like": (PostReaction, "post_id", "post_id"),
+    "comment_like": (PostReaction, "comment_id", "comment__post_id"),
+    "topic_like": (DiscussionReaction, "topic_id", "topic_id"),
+    "reply_like": (DiscussionReaction, "reply_id", "reply__topic_id"),
+    "event_registration": (EventRegistration, "event_id", "event_id"),
+    "vacancy_application": (VacancyApplication, "vacancy_id", "vacancy_id"),
+}
+
+
+class ViewerContext:
+    def __init__(self, user):
+        self.user = user if user is not None and user.is_authenticated else None
+        self._loaded_scopes = {kind: set() for kind in FLAG_KINDS}
+        self._flagged = {kind: set() for kind in FLAG_KINDS}
+
+    def prime(self, kind, scope_ids):
+        """Loads the viewer's flags of `kind` for every scope not loaded yet, in one query."""
+        if self.user is None:
+            return
+        missing = {str(scope_id) for scope_id in scope_ids if scope_id} - self._loaded_scopes[kind]
+        if not missing:
+            return
+        model, field, scope_field = FLAG_KINDS[kind]
+        flagged = model.objects.filter(user=self.user, **{f"{scope_field}__in": missing}).values_list(field, flat=True)
+        self._flagged[kind].update(str(value) for value in flagged)
+        self._loaded_scopes[kind].update(missing)
+
+    def has(self, kind, object_id, scope_id=None):
+        if self.user is None:
+            return False
+        # Anything not primed by a list serializer is loaded on demand for its scope
+        self.prime(kind, [scope_id or object_id])
+        return str(object_id) in self._flagged[kind]
+
+
+def get_viewer_context(context):
+    """The ViewerContext shared by a serializer and everything nested under it."""
+    viewer = context.get("viewer")
+    if viewer is None:
+        request = context.get("request")
+        viewer = ViewerContext(getattr(request, "user", None))
+        context["viewer"] = viewer
+    return viewer
+
+
+class ViewerFlagsListSerializer(ListSerializer):
+    """
+    Primes the viewer's flags for the whole list before any item is serialized.
+    The child serializer declares `viewer_flags = {kind: attribute giving the scope id}`.
+    """
+    def to_representation(self, data):
+        items = data.all() if isinstance(data, models.manager.BaseManager) else data
+        items = list(items)
+        viewer = get_viewer_context(self.context)
+        for kind, scope_attr in self.child.viewer_flags.items():
+            viewer.prime(kind, [getattr(obj, scope_attr) for obj in items])
+        return super().to_representation(items)
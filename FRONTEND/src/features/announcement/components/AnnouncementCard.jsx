@@ -79,7 +79,7 @@ export default function AnnouncementCard({ item, onDelete }) {
           {itemState.image && (
             <div className="mt-4 rounded-xl overflow-hidden bg-zinc-50 border border-surface-border/50 flex items-center justify-center max-h-80">
               <img
-                src={itemState.image}
+                src={itemState.image_preview || itemState.image}
                 alt="Announcement content"
                 className="w-full h-auto max-h-80 object-contain"
               />
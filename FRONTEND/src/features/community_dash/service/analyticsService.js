@@ -1,9 +1,9 @@
 import apiClient from '../../../shared/services/apiClient';
 
 const analyticsService = {
-  getCommunityAnalytics: async (communityId) => {
+  getCommunityAnalytics: async (communityId, window = 7) => {
     try {
-      const response = await apiClient.get(`/communities/analytics/${communityId}/`);
+      const response = await apiClient.get(`/communities/analytics/${communityId}/`, { params: { window } });
       return response.data;
     } catch (error) {
       console.error('Error fetching community analytics:', error);
@@ -0,0 +1,26 @@
+import apiClient from '../../../shared/services/apiClient';
+
+// Emails to every member are queued by the API and sent in the background; poll getProgress for delivery
+const emailBroadcastService = {
+  sendBroadcast: async (subject, message) => {
+    try {
+      const response = await apiClient.post('/communities/email-broadcasts/', { subject, message });
+      return response.data;
+    } catch (error) {
+      console.error('Error sending community email:', error);
+      throw error;
+    }
+  },
+
+  getBroadcasts: async () => {
+    const response = await apiClient.get('/communities/email-broadcasts/');
+    return response.data;
+  },
+
+  getProgress: async (broadcastId) => {
+    const response = await apiClient.get(`/communities/email-broadcasts/${broadcastId}/`);
+    return response.data;
+  }
+};
+
+export default emailBroadcastService;
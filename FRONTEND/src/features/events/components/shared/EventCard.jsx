@@ -84,7 +84,7 @@ export default function EventCard({ item, onDelete }) {
             {item.image && (
               <div className="rounded-xl overflow-hidden bg-zinc-50 border border-surface-border/50 flex items-center justify-center max-h-80">
                 <img
-                  src={item.image}
+                  src={item.image_preview || item.image}
                   alt={item.title}
                   className="w-full h-auto max-h-80 object-contain"
                 />
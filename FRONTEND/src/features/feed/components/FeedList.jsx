@@ -20,7 +20,7 @@ export default function FeedList({
 }) {
   const PAGE_SIZE = 20
   const [items, setItems] = useState([])
-  const [page, setPage] = useState(1)
+  const [nextCursor, setNextCursor] = useState(null)
   const [hasMore, setHasMore] = useState(true)
   const [isFetching, setIsFetching] = useState(true)
   const [isFetchingNext, setIsFetchingNext] = useState(false)
@@ -38,7 +38,7 @@ export default function FeedList({
     })
   }, [items, hiddenTypes, hiddenCommunities])
 
-  const fetchPage = useCallback(async (targetPage, isNextPage = false) => {
+  const fetchPage = useCallback(async (cursor, isNextPage = false) => {
     if (isNextPage) {
       setIsFetchingNext(true)
     } else {
@@ -48,15 +48,15 @@ export default function FeedList({
 
     try {
       const data = await fetchFeed({
-        page: targetPage,
+        cursor,
         pageSize: PAGE_SIZE,
         filter,
       })
       const fetchedItems = data.results || []
 
       setItems((prev) => (isNextPage ? [...prev, ...fetchedItems] : fetchedItems))
-      setHasMore(data.next !== null)
-      setPage(targetPage)
+      setHasMore(Boolean(data.next_cursor))
+      setNextCursor(data.next_cursor || null)
     } catch (error) {
       console.error('Failed to fetch feed', error)
       setFetchError('Failed to load more.')
@@ -71,15 +71,15 @@ export default function FeedList({
 
   useEffect(() => {
     setItems([])
-    setPage(1)
+    setNextCursor(null)
     setHasMore(true)
-    fetchPage(1, false)
+    fetchPage(null, false)
   }, [filter, fetchPage])
 
   useEffect(() => {
     if (!inView || !hasMore || isFetching || isFetchingNext || fetchError) return
-    fetchPage(page + 1, true)
-  }, [inView, hasMore, isFetching, isFetchingNext, fetchError, page, fetchPage])
+    fetchPage(nextCursor, true)
+  }, [inView, hasMore, isFetching, isFetchingNext, fetchError, nextCursor, fetchPage])
 
   if (isFetching && items.length === 0) {
     return (
@@ -134,7 +134,7 @@ export default function FeedList({
       {fetchError && (
         <div className="flex justify-center py-4">
           <button
-            onClick={() => fetchPage(page + 1, true)}
+            onClick={() => fetchPage(nextCursor, true)}
             className="text-sm font-semibold text-primary hover:underline"
           >
             Failed to load more - Retry
@@ -1,11 +1,14 @@
 import apiClient from '../../../shared/services/apiClient';
 
-export async function fetchFeed({ page = 1, pageSize = 20, filter = 'all' } = {}) {
+export async function fetchFeed({ cursor = null, pageSize = 20, filter = 'all' } = {}) {
   const params = new URLSearchParams({
-    page: String(page),
     page_size: String(pageSize),
   });
 
+  if (cursor) {
+    params.set('cursor', cursor);
+  }
+
   if (filter && filter !== 'all') {
     params.set('type', filter);
   }
@@ -8,14 +8,20 @@ const NotificationPopover = ({ isOpen, onClose }) => {
     const [notifications, setNotifications] = useState([]);
     const [loading, setLoading] = useState(true);
     const [unreadCount, setUnreadCount] = useState(0);
+    const [nextCursor, setNextCursor] = useState(null);
+    const [loadingMore, setLoadingMore] = useState(false);
     const popoverRef = useRef(null);
     const navigate = useNavigate();
 
     const fetchNotifications = async () => {
         try {
-            const data = await notificationService.getNotifications();
-            setNotifications(data);
-            setUnreadCount(data.filter(n => !n.is_read).length);
+            const [data, count] = await Promise.all([
+                notificationService.getNotifications(),
+                notificationService.getUnreadCount()
+            ]);
+            setNotifications(data.results);
+            setNextCursor(data.next_cursor);
+            setUnreadCount(count);
         } catch (error) {
             console.error('Failed to fetch notifications');
         } finally {
@@ -23,6 +29,20 @@ const NotificationPopover = ({ isOpen, onClose }) => {
         }
     };
 
+    const fetchMore = async () => {
+        if (!nextCursor || loadingMore) return;
+        setLoadingMore(true);
+        try {
+            const data = await notificationService.getNotifications(nextCursor);
+            setNotifications(prev => [...prev, ...data.results]);
+            setNextCursor(data.next_cursor);
+        } catch (error) {
+            console.error('Failed to fetch more notifications');
+        } finally {
+            setLoadingMore(false);
+        }
+    };
+
     useEffect(() => {
         if (isOpen) {
             fetchNotifications();
@@ -142,9 +162,20 @@ const NotificationPopover = ({ isOpen, onClose }) => {
                         <p className="text-[10px] font-bold uppercase tracking-widest text-surface-body/40">Syncing...</p>
                     </div>
                 ) : notifications.length > 0 ? (
-                    notifications.map(n => (
-                        <NotificationItem key={n.id} notification={n} onMarkRead={handleMarkRead} onDelete={handleDelete} onNavigate={handleNavigate} />
-                    ))
+                    <>
+                        {notifications.map(n => (
+                            <NotificationItem key={n.id} notification={n} onMarkRead={handleMarkRead} onDelete={handleDelete} onNavigate={handleNavigate} />
+                        ))}
+                        {nextCursor && (
+                            <button
+                                onClick={fetchMore}
+                                disabled={loadingMore}
+                                className="w-full py-3 text-[11px] font-bold text-primary hover:opacity-70 transition-opacity"
+                            >
+                                {loadingMore ? 'Loading...' : 'Load older notifications'}
+                            </button>
+                        )}
+                    </>
                 ) : (
                     <div className="py-20 px-10 text-center">
                         <div className="inline-flex h-12 w-12 items-center justify-center rounded-full bg-secondary text-surface-body/30 mb-4">
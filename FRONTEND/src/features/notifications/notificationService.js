@@ -2,11 +2,12 @@ import apiClient from '../../shared/services/apiClient';
 
 const notificationService = {
     /**
-     * Fetch all notifications for the current user
+     * Fetch a page of notifications for the current user.
+     * Returns { results, next_cursor }; pass next_cursor back in to load the next page.
      */
-    getNotifications: async () => {
+    getNotifications: async (cursor = null) => {
         try {
-            const response = await apiClient.get('/notifications/');
+            const response = await apiClient.get('/notifications/', { params: cursor ? { cursor } : {} });
             return response.data;
         } catch (error) {
             console.error('Error fetching notifications:', error);
@@ -14,6 +15,77 @@ const notificationService = {
         }
     },
 
+    /**
+     * Unread badge count, cheap enough to poll
+     */
+    getUnreadCount: async () => {
+        try {
+            const response = await apiClient.get('/notifications/unread-count/');
+            return response.data.unread_count;
+        } catch (error) {
+            console.error('Error fetching unread count:', error);
+            throw error;
+        }
+    },
+
+    /**
+     * Open the push channel (Server-Sent Events). Calls onNotification with each new
+     * notification. The stream is opened with a single-use ticket rather than the JWT, which
+     * would end up in access logs; when it ends (e.g. the access token expired) a new ticket
+     * is fetched and the stream resumes from the last event.
+     * Returns a handle, close() it to stop listening.
+     */
+    openStream: (onNotification) => {
+        if (!localStorage.getItem('access_token') || typeof EventSource === 'undefined') return null;
+        let source = null;
+        let retryTimer = null;
+        let lastEventId = null;
+        let closed = false;
+
+        const reconnect = (delay) => {
+            if (!closed) retryTimer = setTimeout(connect, delay);
+        };
+
+        const connect = async () => {
+            let ticket;
+            try {
+                const response = await apiClient.post('/notifications/stream/ticket/');
+                ticket = response.data.ticket;
+            } catch (error) {
+                console.error('Error opening notification stream:', error);
+                reconnect(30000);
+                return;
+            }
+            if (closed) return;
+            const url = new URL('notifications/stream/', apiClient.defaults.baseURL);
+            url.searchParams.set('ticket', ticket);
+            if (lastEventId) url.searchParams.set('last_event_id', lastEventId);
+            source = new EventSource(url.toString());
+            source.addEventListener('notification', (event) => {
+                lastEventId = event.lastEventId || lastEventId;
+                try {
+                    onNotification(JSON.parse(event.data));
+                } catch (error) {
+                    console.error('Error reading notification event:', error);
+                }
+            });
+            // The browser would retry with the same, already used ticket
+            source.onerror = () => {
+                source.close();
+                reconnect(5000);
+            };
+        };
+
+        connect();
+        return {
+            close: () => {
+                closed = true;
+                clearTimeout(retryTimer);
+                if (source) source.close();
+            },
+        };
+    },
+
     /**
      * Mark a single notification as read
      */
@@ -102,7 +102,7 @@ export default function PostCard({ post, onDelete, isDetailView = false }) {
                 {itemState.image && (
                     <div className={`mt-4 rounded-xl overflow-hidden bg-zinc-50 border border-surface-border/50 flex items-center justify-center ${isDetailView ? '-mx-6 rounded-none max-h-[32rem]' : 'max-h-80'}`}>
                         <img
-                            src={itemState.image}
+                            src={itemState.image_preview || itemState.image}
                             alt="Post content"
                             className="w-full h-auto max-h-[32rem] object-contain"
                         />
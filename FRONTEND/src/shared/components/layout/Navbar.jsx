@@ -62,15 +62,19 @@ function Navbar({ menuOpen = false, toggleMenu = () => { }, closeMenu = () => {
     if (!user) return
     const fetchUnreadCount = async () => {
       try {
-        const data = await notificationService.getNotifications()
-        setUnreadCount(data.filter(n => !n.is_read).length)
+        setUnreadCount(await notificationService.getUnreadCount())
       } catch (error) {
         console.error('Error fetching unread count')
       }
     }
     fetchUnreadCount()
-    const interval = setInterval(fetchUnreadCount, 15000)
-    return () => clearInterval(interval)
+    // New notifications are pushed; the slow poll only resyncs reads made elsewhere
+    const stream = notificationService.openStream(() => setUnreadCount(count => count + 1))
+    const interval = setInterval(fetchUnreadCount, stream ? 60000 : 15000)
+    return () => {
+      clearInterval(interval)
+      if (stream) stream.close()
+    }
   }, [user])
 
   useEffect(() => {
@@ -263,7 +267,7 @@ function Navbar({ menuOpen = false, toggleMenu = () => { }, closeMenu = () => {
                   <Bell size={20} />
                   {unreadCount > 0 && (
                     <span className="absolute top-2 right-2 h-3.5 w-3.5 bg-primary text-white text-[8px] font-black rounded-full flex items-center justify-center border-2 border-white">
-                      {unreadCount}
+                      {unreadCount > 99 ? '99+' : unreadCount}
                     </span>
                   )}
                 </button>